@@ -0,0 +1,93 @@
+# anomaly_detection.py
+"""
+Unsupervised anomaly detection for exposure and financial columns.
+Scores each row by its Mahalanobis distance from the other facilities in the
+same industry, so rows that pass every rule but look unusual still get flagged.
+Must run on the raw input, before the validation rules overwrite the columns.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+ANOMALY_COLUMNS = ["Utilized_Exposure", "Interest_Rate_Spread", "Probability_of_Default"]
+ANOMALY_GROUP_COLUMN = "Industry_Code"
+
+# Distance above which a row is treated as anomalous (~99.9th percentile of a
+# chi distribution with 3 degrees of freedom).
+ANOMALY_THRESHOLD = 4.0
+
+# Groups smaller than this are scored against the whole portfolio instead.
+MIN_GROUP_SIZE = 30
+
+# Added to the covariance diagonal so constant columns don't make it singular.
+RIDGE = 1e-6
+
+
+def numeric_matrix(df, columns=ANOMALY_COLUMNS):
+    """Coerce the given columns to a float64 matrix; 'NA' and junk become NaN."""
+    return np.column_stack([
+        pd.to_numeric(df[col], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+        for col in columns
+    ])
+
+
+def _fit(X):
+    mu = np.nanmean(X, axis=0)
+    mu = np.where(np.isnan(mu), 0.0, mu)
+    X = np.where(np.isnan(X), mu, X)
+    cov = np.atleast_2d(np.cov(X, rowvar=False)) + RIDGE * np.eye(X.shape[1])
+    return mu, np.linalg.pinv(cov)
+
+
+def _score(X, mu, inv_cov):
+    diff = np.where(np.isnan(X), mu, X) - mu
+    d2 = np.einsum("ij,jk,ik->i", diff, inv_cov, diff)
+    return np.sqrt(np.maximum(d2, 0.0))
+
+
+def mahalanobis_scores(X, groups=None, n_jobs=None):
+    """
+    Mahalanobis distance of every row of X from its group's centre.
+    Groups are scored in parallel threads (numpy releases the GIL in the
+    matrix maths), so large portfolios use all cores.
+    """
+    n_rows = X.shape[0]
+    scores = np.zeros(n_rows)
+    if n_rows == 0:
+        return scores
+
+    # Standardise so the ridge term is comparable across columns
+    scale = np.nanstd(X, axis=0)
+    scale = np.where((scale > 0) & ~np.isnan(scale), scale, 1.0)
+    X = (X - np.nanmean(X, axis=0)) / scale
+
+    global_fit = _fit(X)
+    if groups is None:
+        return _score(X, *global_fit)
+
+    codes, _ = pd.factorize(groups, use_na_sentinel=True)
+    order = np.argsort(codes, kind="stable")
+    bounds = np.flatnonzero(np.diff(codes[order])) + 1
+    batches = np.split(order, bounds)
+
+    def score_batch(idx):
+        sub = X[idx]
+        fit = _fit(sub) if len(idx) >= MIN_GROUP_SIZE and codes[idx[0]] >= 0 else global_fit
+        scores[idx] = _score(sub, *fit)
+
+    with ThreadPoolExecutor(max_workers=n_jobs or os.cpu_count()) as pool:
+        list(pool.map(score_batch, batches))
+    return scores
+
+
+def score_anomalies(df, columns=ANOMALY_COLUMNS, group_col=ANOMALY_GROUP_COLUMN, n_jobs=None):
+    """Add an Anomaly_Score column; missing columns are skipped."""
+    columns = [c for c in columns if c in df.columns]
+    if not columns:
+        df["Anomaly_Score"] = 0.0
+        return df
+    groups = df[group_col].astype(str).to_numpy() if group_col in df.columns else None
+    df["Anomaly_Score"] = mahalanobis_scores(numeric_matrix(df, columns), groups, n_jobs=n_jobs)
+    return df
@@ -0,0 +1,148 @@
+# auto_fix.py
+"""
+Deterministic bulk fixes for mechanically correctable errors (lower-case codes,
+MM-DD-YYYY dates, padded IDs, mixed-up 9999 sentinel dates, numbers written
+with thousands separators), applied before validation so those rows never
+need GPT remediation.
+
+A fix is a vectorized str Series -> Series function registered with @fix and
+the pattern of the values it applies to. Work is done once per distinct value
+of a column: only values matching some fix's pattern are checked against the
+column's rules, and a fix is kept only where the original value failed and the
+fixed value passes, so only the affected cells are ever re-validated.
+Clean-ups such as trimming whitespace are registered with failing_only=False
+and apply to any matching value that still passes afterwards. Every change is
+listed in a before/after diff, which revert() applies backwards.
+"""
+import numpy as np
+import pandas as pd
+
+from rule_engine import apply_rules, has_required_columns
+
+DIFF_COLUMNS = ["Row", "Field", "Fix", "Before", "After"]
+
+# Registered fixes, tried in this order
+FIXES = []
+
+
+def fix(name, pattern, columns=None, failing_only=True):
+    """
+    Register a fix for text values fully matching `pattern`. `columns` limits
+    it to those fields; by default it is tried on every rule-checked column.
+    """
+    def decorator(func):
+        func.fix_name = name
+        func.pattern = pattern
+        func.columns = tuple(columns) if columns else None
+        func.failing_only = failing_only
+        FIXES.append(func)
+        return func
+    return decorator
+
+
+# Padded IDs pass the ID rules but break key matching, so they are trimmed anyway
+@fix("Trim whitespace", r"(?s)\s.*|.*\s", failing_only=False)
+def trim_whitespace(values):
+    return values.str.strip()
+
+
+@fix("Upper-case code", r"\s*[A-Za-z]{2,3}\s*")
+def upper_case_code(values):
+    return values.str.strip().str.upper()
+
+
+@fix("Date to yyyy-mm-dd", r"\s*\d{1,2}[-/]\d{1,2}[-/]\d{4}\s*")
+def iso_date(values):
+    parts = values.str.strip().str.split(r"[-/]", regex=True, expand=True)
+    return parts[2] + "-" + parts[0].str.zfill(2) + "-" + parts[1].str.zfill(2)
+
+
+@fix("Swap 9999 sentinel date", r"\s*9999-(?:01-01|12-31)\s*")
+def swap_sentinel_date(values):
+    # Maturity Date uses 9999-01-01, Non-Accrual and Renewal Date 9999-12-31
+    return values.str.strip().map({"9999-01-01": "9999-12-31", "9999-12-31": "9999-01-01"})
+
+
+@fix("Number from text", r"\s*-?(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?\s*")
+def number_from_text(values):
+    text = values.str.strip().str.replace(",", "", regex=False)
+    whole = ~text.str.contains(".", regex=False)
+    numbers = pd.Series(index=values.index, dtype=object)
+    numbers[whole] = pd.to_numeric(text[whole]).astype(object)
+    numbers[~whole] = pd.to_numeric(text[~whole]).astype(object)
+    return numbers
+
+
+def _passes(column, values, rules):
+    # Positional pass mask of values under every rule checking `column`
+    frame = pd.DataFrame({column: np.asarray(values, dtype=object)})
+    ok = np.ones(len(frame), dtype=bool)
+    for rule_func in rules:
+        # Each rule gets the values afresh, since a rule may overwrite its input column
+        ok &= apply_rules(frame.copy(), [rule_func])[rule_func.output].to_numpy(dtype=bool, na_value=False)
+    return ok
+
+
+def _is_text(series):
+    return (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)
+            or isinstance(series.dtype, pd.CategoricalDtype))
+
+
+def apply_fixes(df, rules, fixes=None):
+    """
+    Apply `fixes` (default: every registered fix) to the cells of df failing
+    the single-column `rules`. Returns (df, diff) with one diff row per changed
+    cell: Row (index label), Field, Fix, Before, After.
+    """
+    fixes = FIXES if fixes is None else fixes
+    by_column = {}
+    for rule_func in rules:
+        if len(rule_func.columns) == 1 and has_required_columns(rule_func, df.columns):
+            by_column.setdefault(rule_func.columns[0], []).append(rule_func)
+
+    changes = []
+    for column, column_rules in by_column.items():
+        column_fixes = [f for f in fixes if f.columns is None or column in f.columns]
+        if not column_fixes or not _is_text(df[column]):
+            continue
+        # Everything below runs once per distinct value, and is broadcast to rows through the codes
+        codes, uniques = pd.factorize(df[column], use_na_sentinel=False)
+        text = pd.Series(np.asarray(uniques, dtype=object)).astype(str)
+        patterns = [text.str.fullmatch(f.pattern).to_numpy(dtype=bool, na_value=False) for f in column_fixes]
+        if not any(matched.any() for matched in patterns):
+            continue
+        # Only values some fix could change are validated here
+        failing = np.zeros(len(text), dtype=bool)
+        checked = np.flatnonzero(np.logical_or.reduce(patterns))
+        failing[checked] = ~_passes(column, np.asarray(uniques, dtype=object)[checked], column_rules)
+        replacements = np.empty(len(text), dtype=object)
+        applied = np.full(len(text), None, dtype=object)
+        for f, matched in zip(column_fixes, patterns):
+            candidates = np.flatnonzero(matched & pd.isna(applied) & (failing if f.failing_only else True))
+            if not len(candidates):
+                continue
+            fixed = f(text.iloc[candidates]).to_numpy(dtype=object)
+            ok = _passes(column, fixed, column_rules)
+            replacements[candidates[ok]] = fixed[ok]
+            applied[candidates[ok]] = f.fix_name
+
+        rows = np.flatnonzero(pd.notna(applied)[codes])
+        if not len(rows):
+            continue
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype(object)
+        after = replacements[codes[rows]]
+        changes.append(pd.DataFrame({"Row": df.index[rows], "Field": column, "Fix": applied[codes[rows]],
+                                     "Before": df[column].iloc[rows].to_numpy(dtype=object), "After": after}))
+        df.iloc[rows, df.columns.get_loc(column)] = after
+
+    diff = pd.concat(changes, ignore_index=True) if changes else pd.DataFrame(columns=DIFF_COLUMNS)
+    return df, diff
+
+
+def revert(df, diff):
+    """Undo the changes listed in an apply_fixes() diff."""
+    for column, changes in diff.groupby("Field", sort=False):
+        df[column] = df[column].astype(object)
+        df.loc[changes["Row"].to_numpy(), column] = changes["Before"].to_numpy(dtype=object)
+    return df
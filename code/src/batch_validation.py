@@ -0,0 +1,427 @@
+# batch_validation.py
+"""
+Validates many submission files (one per legal entity / business line) in one run.
+Each file is first parsed once into a memory-mapped column store (see
+column_store.py). Large files are then split into row ranges so that every
+worker has a share; the workers validating parts of one file read its store
+without copying, instead of each parsing the CSV. Parts are handed to a worker
+pool largest first, so the big ones start early and the small ones fill the
+gaps; total time is bounded by the number of cores rather than the number of
+files. Each worker process imports the rules once and keeps its rule memos and
+remediation cache across every part it validates.
+
+Besides one validated CSV per file, the run produces a consolidated summary:
+per-file row and failure counts, failures per field across all files, and
+duplicate loan keys within a file and across files.
+
+Unless chunk_size and max_workers are given, both are sized at runtime to
+stay under a memory ceiling (see resource_governor.py): whenever a worker had
+to shrink its chunks for memory, one fewer part runs at a time from then on,
+and the rest get its share of the ceiling. The decisions are written to
+decisions.csv. The run's metrics (see metrics.py), added up over
+the workers, are written to metrics.prom and metrics.json.
+
+Files may be gzip or zstd compressed, or zip bundles; each CSV in a bundle is
+validated as a file of its own, in parallel with the rest.
+
+Run with: python batch_validation.py OUTPUT_DIR FILE [FILE ...]
+"""
+import argparse
+import itertools
+import multiprocessing
+import os
+import shutil
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+
+import pandas as pd
+
+from ingestion import ARCHIVE_SEPARATOR, expand_sources, source_size
+from metrics import REGISTRY, diff_states, merge_states, stage, write_metrics
+
+KEY_COLUMNS = ["Customer_ID", "Internal_Credit_Facility_ID"]
+# A file is split across workers only into parts of at least this many rows
+MIN_PART_ROWS = int(os.environ.get("VALIDATION_MIN_PART_ROWS", 50_000))
+# Parts per worker for a large file, so the pool can balance and scale down between parts
+PARTS_PER_WORKER = 4
+
+
+def _stem(name):
+    # loans.csv.gz -> loans
+    name = os.path.basename(name)
+    while os.path.splitext(name)[1].lower() in (".csv", ".gz", ".zst", ".zip"):
+        name = os.path.splitext(name)[0]
+    return name
+
+
+def _output_name(path):
+    # bundle.zip::east.csv -> bundle_east
+    return "_".join(_stem(part) for part in path.split(ARCHIVE_SEPARATOR))
+
+
+def _output_paths(paths, output_dir):
+    """A distinct <name>_validated.csv in output_dir for each path."""
+    names = [_output_name(path) for path in paths]
+    outputs, used = {}, set()
+    for path, name in zip(paths, names):
+        if names.count(name) > 1:
+            # Same file name in different directories: east/loans.csv -> east_loans
+            parent = os.path.basename(os.path.dirname(os.path.abspath(path.split(ARCHIVE_SEPARATOR)[0])))
+            name = f"{parent}_{name}" if parent else name
+        unique, n = name, 2
+        while unique in used:
+            unique, n = f"{name}_{n}", n + 1
+        used.add(unique)
+        outputs[path] = os.path.join(output_dir, f"{unique}_validated.csv")
+    return outputs
+
+
+def _fixes_path(output_path):
+    return f"{os.path.splitext(output_path)[0]}_fixes.csv"
+
+
+def _keys(chunk, key_columns):
+    # Raw key tuples of the rows with every key column present
+    if not all(c in chunk.columns for c in key_columns):
+        return []
+    keys = chunk[key_columns].dropna()
+    return list(zip(*[keys[c].astype(str).str.strip() for c in key_columns]))
+
+
+def ingest_file(path, store):
+    """Parse one file into the column store at `store`; returns its row count and this process's metrics."""
+    from ingestion import write_store
+
+    return write_store(path, store).rows, (os.getpid(), REGISTRY.state())
+
+
+def validate_file(path, output_path, key_columns=KEY_COLUMNS, use_llm=False, chunk_size=None, auto_fix=False,
+                  excel=False, memory_limit=None, bytes_per_row=None, sharing=1, store=None, rows=None):
+    """
+    Validate one file chunk by chunk into output_path. Returns its summary:
+    rows, failing rows, failures per result column and its distinct loan keys.
+    The chunks are read from the column store at `store`, written first when
+    not given; rows=(start, stop) validates only that range of the file, and
+    its output has a header only if it starts at the first row.
+    Without a fixed chunk_size, a ResourceGovernor sizes the chunks to stay
+    within memory_limit bytes of process RSS, shared by `sharing` workers
+    (bytes_per_row is a measured starting estimate).
+    With auto_fix, mechanical errors are fixed first and the before/after diff
+    is written next to the output as <output name>_fixes.csv. With excel, the
+    raw rows with failing cells highlighted also go to <output name>.xlsx.
+    """
+    from genai_data_profiling import run_pipeline
+    from custom_rules import custom_rule_list
+    from corporate_loan_rules import CORPORATE_LOAN_RULES
+    from column_store import ColumnStore
+    from ingestion import write_store
+    from resource_governor import ResourceGovernor
+    from results_view import result_matrix
+
+    start = time.perf_counter()
+    llm = None
+    if use_llm:
+        from llm_client import get_llm
+        llm = get_llm()
+
+    owned = store is None
+    if owned:
+        store = f"{os.path.splitext(output_path)[0]}.store"
+        data = write_store(path, store)
+    else:
+        data = ColumnStore(store)
+    first, stop = rows or (0, data.rows)
+
+    rows = failing = tokens = fixed = 0
+    cost = 0.0
+    failures, keys = {}, []
+    report = None
+    governor = None
+    if chunk_size:
+        sizes = itertools.repeat(chunk_size)
+    else:
+        governor = ResourceGovernor(memory_limit, bytes_per_row, sharing=sharing,
+                                    name=path if (first, stop) == (0, data.rows) else f"{path}[{first}:{stop}]")
+        sizes = governor.chunk_sizes()
+    tick = time.perf_counter()
+    for i, chunk in enumerate(data.chunks(sizes, first, stop)):
+        header = i == 0 and first == 0
+        if auto_fix:
+            from auto_fix import apply_fixes
+
+            with stage("auto_fix", len(chunk)):
+                chunk, fixes = apply_fixes(chunk, CORPORATE_LOAN_RULES + custom_rule_list(chunk.columns))
+            fixes.to_csv(_fixes_path(output_path), mode="w" if i == 0 else "a", header=header, index=False)
+            fixed += len(fixes)
+        keys.extend(_keys(chunk, key_columns))
+        raw = None
+        if excel:
+            # Unfixed rows are read again from the store rather than copied
+            raw = chunk.copy() if auto_fix else data.read(start=chunk.index[0], stop=chunk.index[-1] + 1)
+        chunk = run_pipeline(chunk, llm)
+        usage = chunk.attrs.get("llm_usage", {})
+        tokens += usage.get("prompt_tokens", 0) + usage.get("completion_tokens", 0)
+        cost += usage.get("estimated_cost_usd", 0.0)
+        rules = CORPORATE_LOAN_RULES + custom_rule_list(chunk.columns)
+        results = result_matrix(chunk, rules)
+        if excel:
+            from excel_report import ExcelReport
+
+            report = report or ExcelReport(f"{os.path.splitext(output_path)[0]}.xlsx", rules)
+            with stage("excel", len(chunk)):
+                report.write(raw, results, extra=chunk[["Risk_Score", "Remediation"]])
+        rows += len(chunk)
+        failing += int((~results.all(axis=1)).sum())
+        for col, n in (~results).sum().items():
+            failures[col] = failures.get(col, 0) + int(n)
+        with stage("write", len(chunk)):
+            chunk.to_csv(output_path, mode="w" if i == 0 else "a", header=header, index=False)
+        if governor:
+            governor.record(len(chunk), time.perf_counter() - tick)
+        tick = time.perf_counter()
+    if report:
+        report.close()
+    if owned:
+        shutil.rmtree(store, ignore_errors=True)
+
+    distinct = set(keys)
+    return {"file": path, "output_path": output_path, "rows": rows, "failing_rows": failing,
+            "failures": failures, "keys": distinct, "duplicate_keys": len(keys) - len(distinct),
+            "auto_fixed": fixed, "llm_tokens": tokens, "llm_cost": cost, "seconds": time.perf_counter() - start,
+            "chunk_size": governor.chunk_size if governor else chunk_size,
+            "decisions": governor.decisions if governor else [],
+            # Everything this process has recorded so far, which the last of its files reports in full
+            "metrics": (os.getpid(), REGISTRY.state())}
+
+
+def _failed(path, output_path, error):
+    return {"file": path, "output_path": output_path, "rows": 0, "failing_rows": 0, "failures": {},
+            "keys": set(), "duplicate_keys": 0, "seconds": 0.0, "error": error}
+
+
+def _parts(rows, workers, excel):
+    """
+    Row ranges to validate for each file: a file gets a share of
+    PARTS_PER_WORKER parts per worker in proportion to its rows, each of at
+    least MIN_PART_ROWS. An Excel report is written by one worker, so with
+    excel files are not split.
+    """
+    total = sum(rows.values())
+    ranges = {}
+    for path, n in rows.items():
+        count = 1 if excel or not total else max(1, min(round(n * workers * PARTS_PER_WORKER / total),
+                                                        n // MIN_PART_ROWS))
+        bounds = [n * k // count for k in range(count + 1)]
+        ranges[path] = list(zip(bounds[:-1], bounds[1:]))
+    return ranges
+
+
+def _part_path(output_path, k, count):
+    return output_path if count == 1 else f"{os.path.splitext(output_path)[0]}.part{k}.csv"
+
+
+def _concat(paths, target):
+    # Parts after the first were written without a header
+    with open(target, "wb") as out:
+        for path in paths:
+            with open(path, "rb") as f:
+                shutil.copyfileobj(f, out)
+            os.remove(path)
+
+
+def _merge_parts(path, output_path, parts):
+    """One file's result from the results of its parts, in row order; their outputs are joined."""
+    errors = [p["error"] for p in parts if p.get("error")]
+    if errors:
+        return _failed(path, output_path, errors[0])
+    if len(parts) > 1:
+        _concat([p["output_path"] for p in parts], output_path)
+        if os.path.exists(_fixes_path(parts[0]["output_path"])):
+            _concat([_fixes_path(p["output_path"]) for p in parts], _fixes_path(output_path))
+    keys = set().union(*(p["keys"] for p in parts))
+    listed = sum(len(p["keys"]) + p["duplicate_keys"] for p in parts)
+    failures = {}
+    for p in parts:
+        for col, n in p["failures"].items():
+            failures[col] = failures.get(col, 0) + n
+    return {"file": path, "output_path": output_path, "rows": sum(p["rows"] for p in parts),
+            "failing_rows": sum(p["failing_rows"] for p in parts), "failures": failures,
+            "keys": keys, "duplicate_keys": listed - len(keys),
+            "auto_fixed": sum(p["auto_fixed"] for p in parts), "llm_tokens": sum(p["llm_tokens"] for p in parts),
+            "llm_cost": sum(p["llm_cost"] for p in parts), "seconds": max(p["seconds"] for p in parts),
+            "chunk_size": parts[-1]["chunk_size"], "decisions": [d for p in parts for d in p["decisions"]]}
+
+
+def consolidate(results, key_columns=KEY_COLUMNS):
+    """
+    Merge per-file results into {"files", "failures", "duplicates", "decisions"}
+    frames. Files are named by their full source path. `duplicates` lists
+    every key that appears in more than one file; `decisions` is the resource
+    governor's log.
+    """
+    from resource_governor import decision_log
+
+    owners = {}
+    for result in results:
+        for key in result["keys"]:
+            owners.setdefault(key, []).append(result["file"])
+    shared = {key: files for key, files in owners.items() if len(files) > 1}
+
+    files = pd.DataFrame([{
+        "File": r["file"],
+        "Rows": r["rows"],
+        "Failing_Rows": r["failing_rows"],
+        "Failures": sum(r["failures"].values()),
+        "Duplicate_Keys": r["duplicate_keys"],
+        "Cross_File_Duplicates": sum(1 for key in r["keys"] if key in shared),
+        "Auto_Fixed": r.get("auto_fixed", 0),
+        "LLM_Tokens": r.get("llm_tokens", 0),
+        "LLM_Cost_USD": round(r.get("llm_cost", 0.0), 4),
+        "Chunk_Size": r.get("chunk_size"),
+        "Seconds": round(r["seconds"], 2),
+        "Output": r["output_path"],
+        "Error": r.get("error"),
+    } for r in results])
+
+    totals = {}
+    for r in results:
+        for col, n in r["failures"].items():
+            totals[col] = totals.get(col, 0) + n
+    failures = pd.DataFrame(sorted(totals.items(), key=lambda item: -item[1]), columns=["Field", "Failures"])
+    failures = failures[failures["Failures"] > 0].reset_index(drop=True)
+
+    duplicates = pd.DataFrame([(*key, ", ".join(sorted(names))) for key, names in sorted(shared.items())],
+                              columns=key_columns + ["Files"])
+    decisions = decision_log([d for r in results for d in r.get("decisions", [])])
+    return {"files": files, "failures": failures, "duplicates": duplicates, "decisions": decisions}
+
+
+def validate_files(paths, output_dir, max_workers=None, use_processes=True, key_columns=KEY_COLUMNS,
+                   use_llm=False, chunk_size=None, auto_fix=False, excel=False, memory_limit=None):
+    """
+    Validate every file in `paths` (each CSV of a zip bundle as a file of its
+    own) on a pool of max_workers and write the per-file outputs plus
+    summary.csv, failures.csv, duplicates.csv, decisions.csv and
+    metrics.prom/.json to output_dir. Returns the consolidate() frames.
+    The column stores are written under output_dir/.stores and removed at
+    the end.
+    Without max_workers, as many workers run as fit under memory_limit bytes
+    (default: see resource_governor), at most one per core, scaled down while
+    the run goes on if they still run out of memory; an explicit max_workers
+    is kept as given.
+    """
+    from resource_governor import decision_log, memory_limit_bytes, plan_workers
+
+    os.makedirs(output_dir, exist_ok=True)
+    adaptive = max_workers is None
+    sources = expand_sources(paths)
+    outputs = _output_paths(sources, output_dir)
+    # Largest first: a big file picked up last would otherwise set the total time
+    ordered = sorted(sources, key=source_size, reverse=True)
+    memory_limit = memory_limit or memory_limit_bytes()
+    plan, bytes_per_row = [], None
+    if max_workers is None or chunk_size is None:
+        from genai_data_profiling import run_pipeline
+
+        try:
+            workers, budget, bytes_per_row, decision = plan_workers(ordered, run_pipeline, memory_limit, max_workers)
+            if max_workers is None:
+                max_workers = workers
+            else:
+                # Only probed for bytes per row; the caller chose the worker count
+                decision.update(Workers=max_workers,
+                                Reason=f"{max_workers} workers requested; {decision['Reason']}")
+            plan.append(decision)
+        except Exception as e:
+            # An unreadable largest file fails on its own below; size the run without the probe
+            plan.append({"File": "(plan)", "Decision": "workers", "Reason": f"probe failed: {e}"})
+    max_workers = max_workers or os.cpu_count() or 1
+    if use_processes:
+        # Spawned workers each import the rules once and keep them for every part they get
+        executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+    else:
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    store_dir = os.path.join(output_dir, ".stores")
+    stores = {path: os.path.join(store_dir, _stem(outputs[path])) for path in ordered}
+    results, rows, parts, worker_metrics = {}, {}, {}, {}
+    before, start = REGISTRY.state(), time.time()
+    with executor:
+        futures = {executor.submit(ingest_file, path, stores[path]): path for path in ordered}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                rows[path], (pid, state) = future.result()
+                worker_metrics[pid] = state
+            except Exception as e:
+                results[path] = _failed(path, outputs[path], str(e))
+
+        ranges = _parts(rows, max_workers, excel)
+        # Both pools start workers on demand, so no more run than there are parts
+        workers = max(1, min(max_workers, sum(map(len, ranges.values()))))
+        # Largest part first, as for the files
+        tasks = sorted(((path, k, part) for path in ranges for k, part in enumerate(ranges[path])),
+                       key=lambda task: task[2][0] - task[2][1])
+        futures = {}
+        while tasks or futures:
+            # Parts are handed out only as workers are free, up to the current worker count
+            while tasks and len(futures) < workers:
+                path, k, part = tasks.pop(0)
+                # Threads share one process, whose RSS is what the governors measure
+                budget, sharing = (memory_limit // workers, 1) if use_processes else (memory_limit, workers)
+                futures[executor.submit(validate_file, path, _part_path(outputs[path], k, len(ranges[path])),
+                                        key_columns, use_llm, chunk_size, auto_fix, excel, budget, bytes_per_row,
+                                        sharing, stores[path], part)] = (path, k)
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                path, k = futures.pop(future)
+                try:
+                    parts[path, k] = future.result()
+                    pid, state = parts[path, k].pop("metrics")
+                    worker_metrics[pid] = state
+                except Exception as e:
+                    parts[path, k] = _failed(path, outputs[path], str(e))
+                    continue
+                shrunk = any(d["Decision"] == "shrink" for d in parts[path, k]["decisions"])
+                if adaptive and shrunk and workers > 1:
+                    workers -= 1
+                    plan.append({"File": path, "Workers": workers, "Decision": "workers",
+                                 "Reason": "a worker went over its memory budget; the rest get its share"})
+    shutil.rmtree(store_dir, ignore_errors=True)
+    for path in ranges:
+        results[path] = _merge_parts(path, outputs[path], [parts[path, k] for k in range(len(ranges[path]))])
+
+    summary = consolidate([results[path] for path in sources], key_columns)
+    summary["decisions"] = decision_log(plan + summary["decisions"].to_dict("records"))
+    for name, frame in summary.items():
+        frame.to_csv(os.path.join(output_dir, f"{'summary' if name == 'files' else name}.csv"), index=False)
+    # Threads share this process's registry, which also holds the work done before the run
+    run_metrics = (diff_states(REGISTRY.state(), before) if not use_processes
+                   else merge_states(worker_metrics.values()))
+    write_metrics(os.path.join(output_dir, "metrics"), run_metrics, seconds=time.time() - start)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate many submission files in parallel")
+    parser.add_argument("output_dir")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--workers", type=int, default=None, help="default: as many as fit in memory")
+    parser.add_argument("--chunk-size", type=int, default=None, help="default: sized at runtime")
+    parser.add_argument("--memory-limit-mb", type=int, default=None, help="default: VALIDATION_MEMORY_LIMIT_MB or 75%% of RAM")
+    parser.add_argument("--llm", action="store_true", help="add GPT remediation (needs OPENAI_API_KEY)")
+    parser.add_argument("--auto-fix", action="store_true", help="fix mechanical errors first, writing a diff per file")
+    parser.add_argument("--excel", action="store_true", help="also write an .xlsx per file with failing cells highlighted")
+    args = parser.parse_args()
+
+    memory_limit = args.memory_limit_mb * 1024 * 1024 if args.memory_limit_mb else None
+    summary = validate_files(args.files, args.output_dir, max_workers=args.workers, use_llm=args.llm,
+                             chunk_size=args.chunk_size, auto_fix=args.auto_fix, excel=args.excel,
+                             memory_limit=memory_limit)
+    print(summary["files"].to_string(index=False))
+    if len(summary["duplicates"]):
+        print(f"\n{len(summary['duplicates'])} loan keys appear in more than one file")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# checksums.py
+"""
+Check-digit validation for identifier fields.
+    LEI    ISO 17442: letters become 10-35, and the resulting digit string mod 97 must be 1
+    CUSIP  the ninth character is the modulus-10 "double add double" check digit
+The *_mask functions check a whole column at once: the distinct values are
+packed into a fixed-width array of code points, and the format and check digits
+are computed one character position at a time across all of them with NumPy.
+The scalar forms are used for single records.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+LEI_PATTERN = r"[A-Z0-9]{18}[0-9]{2}"
+CUSIP_PATTERN = r"[A-Z0-9*@#]{8}[0-9]"
+
+_LEI_RE = re.compile(LEI_PATTERN)
+_CUSIP_RE = re.compile(CUSIP_PATTERN)
+# Character values: 0-9 for digits, 10-35 for A-Z, then CUSIP's * @ #; -1 for anything
+# else (code points past ASCII are looked up as DEL, which is invalid)
+_VALUES = np.full(128, -1, dtype=np.int8)
+_VALUES[np.frombuffer(b"0123456789", dtype=np.uint8)] = np.arange(10)
+_VALUES[np.frombuffer(b"ABCDEFGHIJKLMNOPQRSTUVWXYZ", dtype=np.uint8)] = np.arange(10, 36)
+_VALUES[np.frombuffer(b"*@#", dtype=np.uint8)] = [36, 37, 38]
+# 10**n mod 97, for the up to 40 digits of an LEI with its letters expanded
+_POWERS_OF_TEN = np.array([pow(10, n, 97) for n in range(40)], dtype=np.int32)
+
+
+def _char_values(strings, width, max_value, check_digits):
+    """
+    (mask of well-formed strings, character values with one row per character
+    position) for an array of str. Well-formed: exactly `width` characters, each
+    worth at most max_value, and the last check_digits characters digits.
+    """
+    # One extra slot shows whether a string is longer than width
+    codepoints = strings.astype(f"U{width + 1}").view(np.uint32).reshape(-1, width + 1)
+    ok = codepoints[:, width] == 0
+    # Position-major, so each step of the checksum reads one contiguous row
+    values = _VALUES[np.minimum(codepoints[:, :width].T, 127)]
+    # As unsigned, the invalid -1 is 255 and fails the range check too
+    ok &= (values.view(np.uint8) <= max_value).all(axis=0)
+    ok &= (values[width - check_digits:].view(np.uint8) < 10).all(axis=0)
+    return ok, values
+
+
+def _per_distinct(values, check):
+    # Identifiers repeat across a portfolio's loans, so check each distinct one once
+    codes, uniques = pd.factorize(pd.Series(values).astype(str))
+    return check(np.asarray(uniques, dtype=str))[codes]
+
+
+def _lei_check(strings):
+    ok, chars = _char_values(strings, 20, 35, 2)
+    # Letters stand for two digits; each character adds value * 10**(digits after it), mod 97
+    widths = (chars >= 10).view(np.int8) + 1
+    digits_after = np.cumsum(widths[::-1], axis=0, dtype=np.int8)[::-1] - widths
+    remainder = (chars * _POWERS_OF_TEN[digits_after]).sum(axis=0) % 97
+    return ok & (remainder == 1)
+
+
+def _cusip_check(strings):
+    ok, chars = _char_values(strings, 9, 38, 1)
+    weighted = chars[:8] * np.array([1, 2] * 4, dtype=np.int8)[:, None]
+    total = (weighted // 10 + weighted % 10).sum(axis=0)
+    return ok & ((10 - total % 10) % 10 == chars[8])
+
+
+def lei_mask(values):
+    """True where the value is a 20-character LEI with valid check digits."""
+    return _per_distinct(values, _lei_check)
+
+
+def cusip_mask(values):
+    """True where the value is a 9-character CUSIP with a valid check digit."""
+    return _per_distinct(values, _cusip_check)
+
+
+def is_valid_lei(value):
+    value = str(value)
+    if not _LEI_RE.fullmatch(value):
+        return False
+    return int("".join(str(int(c, 36)) for c in value)) % 97 == 1
+
+
+def is_valid_cusip(value):
+    value = str(value)
+    if not _CUSIP_RE.fullmatch(value):
+        return False
+    total = 0
+    for position, c in enumerate(value[:8]):
+        v = int(_VALUES[ord(c)]) * (2 if position % 2 else 1)
+        total += v // 10 + v % 10
+    return (10 - total % 10) % 10 == int(value[8])
@@ -0,0 +1,232 @@
+# column_store.py
+"""
+Memory-mapped column store, written once per submission and read by every
+worker that validates part of it (see ingestion.write_store and
+batch_validation.validate_files).
+
+Numeric columns are kept as raw arrays. Repetitive text columns are kept
+dictionary-encoded: the categories once, in <column>.categories.json, and an
+integer code per row, in the width pandas itself uses for that many
+categories. Other text is kept as UTF-8 bytes with row offsets.
+
+read() maps only the rows asked for. Numeric columns and dictionary codes
+become the frame's arrays as they are, without a copy; only the text of the
+rows read is decoded. Every read gets a private copy-on-write mapping, so a
+stage may modify its frame without touching the file or any other read.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+MANIFEST = "manifest.json"
+
+
+def _safe_name(name):
+    return "".join(c if c.isalnum() or c in "-_" else "_" for c in name)
+
+
+def _code_dtype(n):
+    # The codes dtype pandas uses for n categories, so Categorical.from_codes keeps the mapped array
+    for dtype in (np.int8, np.int16, np.int32):
+        if n < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def _is_numeric(series):
+    return isinstance(series.dtype, np.dtype) and series.dtype.kind in "biuf"
+
+
+def _text(series):
+    # Object array of str, None where missing
+    values = series.to_numpy(dtype=object, na_value=None)
+    if series.dtype != object:
+        present = np.fromiter((v is not None for v in values), bool, len(values))
+        values[present] = [str(v) for v in values[present]]
+    return values
+
+
+class _NumericColumn:
+    kind = "numeric"
+
+    def __init__(self, path, file, dtype):
+        self.path, self.file, self.dtype = path, file, dtype
+
+    def append(self, series):
+        dtype = np.result_type(self.dtype, series.dtype)
+        if dtype != self.dtype:
+            # int then float (or bool then int): widen what is already written
+            values = np.fromfile(os.path.join(self.path, self.file), dtype=self.dtype)
+            values.astype(dtype).tofile(os.path.join(self.path, self.file))
+            self.dtype = dtype
+        with open(os.path.join(self.path, self.file), "ab") as f:
+            series.to_numpy(dtype=self.dtype).tofile(f)
+
+    def written(self):
+        # What is already written, as text, for a column that turned out not to be numeric
+        values = np.fromfile(os.path.join(self.path, self.file), dtype=self.dtype)
+        os.remove(os.path.join(self.path, self.file))
+        return pd.Series(values)
+
+    def entry(self):
+        return {"file": self.file, "kind": self.kind, "dtype": self.dtype.str}
+
+
+class _DictionaryColumn:
+    kind = "dictionary"
+
+    def __init__(self, path, file):
+        self.path, self.file = path, file
+        self.categories, self.index = [], {}
+
+    def _code(self, value):
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.categories)
+            self.categories.append(value)
+        return code
+
+    def append(self, series):
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes, uniques = series.cat.codes.to_numpy(), series.cat.categories
+        else:
+            codes, uniques = pd.factorize(_text(series))
+        # Chunk codes to store codes; the trailing -1 keeps missing values (code -1) missing
+        mapping = np.array([self._code(str(u)) for u in uniques] + [-1], dtype=np.int32)
+        with open(os.path.join(self.path, f"{self.file}.codes"), "ab") as f:
+            mapping[codes].tofile(f)
+
+    def entry(self):
+        path = os.path.join(self.path, f"{self.file}.codes")
+        dtype = _code_dtype(len(self.categories))
+        if dtype != np.int32:
+            np.fromfile(path, dtype=np.int32).astype(dtype).tofile(path)
+        with open(os.path.join(self.path, f"{self.file}.categories.json"), "w", encoding="utf-8") as f:
+            json.dump(self.categories, f)
+        return {"file": self.file, "kind": self.kind, "dtype": dtype.str}
+
+
+class _TextColumn:
+    kind = "text"
+
+    def __init__(self, path, file):
+        self.path, self.file, self.end = path, file, 0
+        with open(os.path.join(path, f"{file}.offsets"), "wb") as f:
+            np.zeros(1, dtype=np.int64).tofile(f)
+
+    def append(self, series):
+        values = _text(series)
+        encoded = [b"" if v is None else v.encode("utf-8") for v in values]
+        ends = self.end + np.cumsum(np.fromiter(map(len, encoded), np.int64, len(encoded)))
+        for suffix, data in (("data", b"".join(encoded)), ("offsets", ends.tobytes()),
+                             ("nulls", np.fromiter((v is None for v in values), bool, len(values)).tobytes())):
+            with open(os.path.join(self.path, f"{self.file}.{suffix}"), "ab") as f:
+                f.write(data)
+        self.end = int(ends[-1]) if len(ends) else self.end
+
+    def entry(self):
+        return {"file": self.file, "kind": self.kind}
+
+
+class ColumnStore:
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, MANIFEST), encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        self._dtypes = {}
+
+    @classmethod
+    def write(cls, path, chunks, dictionary_columns=(), max_distinct_ratio=0.5):
+        """
+        Write `chunks`, the frames of one file in order, to `path` and return
+        the opened store. Categorical columns, dictionary_columns and text
+        columns whose first chunk has at most max_distinct_ratio distinct
+        values per row are dictionary-encoded.
+        """
+        os.makedirs(path, exist_ok=True)
+        columns, rows = {}, 0
+        for chunk in chunks:
+            for name in chunk.columns:
+                series = chunk[name]
+                column = columns.get(name)
+                if column is None:
+                    file = f"{len(columns)}_{_safe_name(str(name))}"
+                    if _is_numeric(series):
+                        column = _NumericColumn(path, file, series.dtype)
+                    elif (isinstance(series.dtype, pd.CategoricalDtype) or name in dictionary_columns
+                          or len(series) and series.nunique(dropna=False) <= max_distinct_ratio * len(series)):
+                        column = _DictionaryColumn(path, file)
+                    else:
+                        column = _TextColumn(path, file)
+                    columns[name] = column
+                elif column.kind == "numeric" and not _is_numeric(series):
+                    # A column that parsed as numbers until now holds text after all
+                    written = column.written()
+                    column = columns[name] = _TextColumn(path, column.file)
+                    column.append(written)
+                column.append(series)
+            rows += len(chunk)
+        manifest = {"rows": rows, "columns": {name: column.entry() for name, column in columns.items()}}
+        with open(os.path.join(path, MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        return cls(path)
+
+    @property
+    def columns(self):
+        return list(self.manifest["columns"])
+
+    @property
+    def rows(self):
+        return self.manifest["rows"]
+
+    def _map(self, file, dtype, start, count):
+        # A private copy-on-write mapping of items start..start+count of a file
+        dtype = np.dtype(dtype)
+        if count == 0:
+            return np.empty(0, dtype)
+        return np.memmap(os.path.join(self.path, file), dtype=dtype, mode="c", offset=start * dtype.itemsize,
+                         shape=(count,))
+
+    def _categories(self, entry):
+        if entry["file"] not in self._dtypes:
+            with open(os.path.join(self.path, f"{entry['file']}.categories.json"), encoding="utf-8") as f:
+                self._dtypes[entry["file"]] = pd.CategoricalDtype(json.load(f))
+        return self._dtypes[entry["file"]]
+
+    def read_column(self, name, start=0, stop=None):
+        """Rows start..stop of one column as an array, Categorical for dictionary columns."""
+        entry = self.manifest["columns"][name]
+        stop = self.rows if stop is None else min(stop, self.rows)
+        count = max(stop - start, 0)
+        if entry["kind"] == "numeric":
+            return self._map(entry["file"], entry["dtype"], start, count)
+        if entry["kind"] == "dictionary":
+            codes = self._map(f"{entry['file']}.codes", entry["dtype"], start, count)
+            return pd.Categorical.from_codes(codes, dtype=self._categories(entry), validate=False)
+        offsets = self._map(f"{entry['file']}.offsets", np.int64, start, count + 1)
+        first = int(offsets[0]) if count else 0
+        data = self._map(f"{entry['file']}.data", np.uint8, first, int(offsets[-1]) - first if count else 0).tobytes()
+        ends = (offsets - first).tolist()
+        values = np.empty(count, dtype=object)
+        values[:] = [data[a:b].decode("utf-8") for a, b in zip(ends[:-1], ends[1:])]
+        values[self._map(f"{entry['file']}.nulls", np.bool_, start, count)] = np.nan
+        return values
+
+    def read(self, columns=None, start=0, stop=None):
+        """Rows start..stop as a frame indexed by row number in the file."""
+        stop = self.rows if stop is None else min(stop, self.rows)
+        index = pd.RangeIndex(start, max(stop, start))
+        return pd.DataFrame({name: self.read_column(name, start, stop) for name in columns or self.columns},
+                            index=index, copy=False)
+
+    def chunks(self, sizes, start=0, stop=None):
+        """Successive frames of rows start..stop, the next value of `sizes` rows each."""
+        stop = self.rows if stop is None else min(stop, self.rows)
+        for size in sizes:
+            if start >= stop:
+                break
+            chunk = self.read(start=start, stop=min(start + size, stop))
+            start += len(chunk)
+            yield chunk
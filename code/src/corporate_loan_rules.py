@@ -7,6 +7,9 @@ and allowable values using MDRM documentation.
 import pandas as pd
 import re
 from datetime import datetime
+from rule_engine import rule
+from reference_data import COUNTRY_CODES, CURRENCY_CODES, NAICS_CODES
+from checksums import cusip_mask, is_valid_cusip, is_valid_lei, lei_mask
 
 CORPORATE_LOAN_RULES = []
 
@@ -15,42 +18,47 @@ CORPORATE_LOAN_RULES = []
 # MDRM Code: CLCOM047
 # Description: Must be unique; no carriage return, line feed, comma, or unprintable characters
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Customer_ID'], mdrm='CLCOM047', tier='structural', kernel=('match', r'^[^\r\n,\x00-\x1F\x7F]+$'))
 def validate_customer_id(df):
     pattern = r'^[^\r\n,\x00-\x1F\x7F]+$'
-    df['Customer_ID'] = df['Customer_ID'].astype(str).str.match(pattern)
+    df['Customer_ID'] = df['Customer_ID'].astype(str).str.fullmatch(pattern)
     return df
 
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 2: Internal ID
 # MDRM Code: CLCOM300
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Internal_ID'], mdrm='CLCOM300', tier='structural', kernel=('match', r'^[^\r\n,\x00-\x1F\x7F]+$'))
 def validate_internal_id(df):
     pattern = r'^[^\r\n,\x00-\x1F\x7F]+$'
-    df['Internal_ID'] = df['Internal_ID'].astype(str).str.match(pattern)
+    df['Internal_ID'] = df['Internal_ID'].astype(str).str.fullmatch(pattern)
     return df
 
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 3: Original Internal ID
 # MDRM Code: CLCOG064
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Original_Internal_ID'], mdrm='CLCOG064', kernel=('match', r'^[^\r\n,\x00-\x1F\x7F]+$'))
 def validate_original_internal_id(df):
     pattern = r'^[^\r\n,\x00-\x1F\x7F]+$'
-    df['Original_Internal_ID'] = df['Original_Internal_ID'].astype(str).str.match(pattern)
+    df['Original_Internal_ID'] = df['Original_Internal_ID'].astype(str).str.fullmatch(pattern)
     return df
 
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 4: Obligor Name
 # MDRM Code: CLCO9017
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Obligor_Name'], mdrm='CLCO9017', kernel=('match', r'^[^\r\n,\x00-\x1F\x7F]+$'))
 def validate_obligor_name(df):
     pattern = r'^[^\r\n,\x00-\x1F\x7F]+$'
-    df['Obligor_Name'] = df['Obligor_Name'].astype(str).str.match(pattern)
+    df['Obligor_Name'] = df['Obligor_Name'].astype(str).str.fullmatch(pattern)
     return df
 
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 5: City
 # MDRM Code: CLCO9130
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['City'], mdrm='CLCO9130', kernel=('not_empty',))
 def validate_city(df):
     df['City'] = df['City'].astype(str).str.strip().ne("")
     return df
@@ -59,33 +67,46 @@ def validate_city(df):
 # Field 6: Country
 # MDRM Code: CLCO9031
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Country'], mdrm='CLCO9031', expected='ISO 3166 alpha-2 country code', kernel=('isin', COUNTRY_CODES))
 def validate_country(df):
-    pattern = r'^[A-Z]{2}$'
-    df['Country'] = df['Country'].astype(str).str.match(pattern)
+    df['Country'] = df['Country'].astype(str).isin(COUNTRY_CODES)
     return df
 
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 7: Zip Code
 # MDRM Code: CLCO9220
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Zip_Code'], mdrm='CLCO9220', kernel=('match', r'^\d{5}$'))
 def validate_zip_code(df):
     pattern = r'^\d{5}$'
-    df['Zip_Code'] = df['Zip_Code'].astype(str).str.match(pattern)
+    df['Zip_Code'] = df['Zip_Code'].astype(str).str.fullmatch(pattern)
     return df
 
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 8: Industry Code
 # MDRM Code: CLCO4537
 # ────────────────────────────────────────────────────────────────────────────────
+def _is_industry_code_of_type(code, code_type):
+    # Type 1 is NAICS, checked against the code list; SIC (2) and GICS (3) codes only by format
+    if str(code_type).strip() == '1':
+        return str(code) in NAICS_CODES
+    return bool(re.match(r'^\d{4,6}$', str(code)))
+
+# Format tier, so it still sees the raw Industry_Code_Type before Field 9 overwrites it
+@rule(['Industry_Code', 'Industry_Code_Type'], mdrm='CLCO4537', tier='format',
+      expected='2022 NAICS code when Industry_Code_Type is 1, else a 4 to 6 digit SIC or GICS code',
+      scalar=_is_industry_code_of_type)
 def validate_industry_code(df):
-    pattern = r'^\d{4,6}$'
-    df['Industry_Code'] = df['Industry_Code'].astype(str).str.match(pattern)
+    code = df['Industry_Code'].astype(str)
+    naics = df['Industry_Code_Type'].astype(str).str.strip().eq('1')
+    df['Industry_Code'] = code.isin(NAICS_CODES).where(naics, code.str.match(r'^\d{4,6}$'))
     return df
 
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 9: Industry Code Type
 # MDRM Code: CLCOM297
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Industry_Code_Type'], mdrm='CLCOM297', kernel=('isin', ['1','2','3']))
 def validate_industry_code_type(df):
     df['Industry_Code_Type'] = df['Industry_Code_Type'].astype(str).isin(['1','2','3'])
     return df
@@ -94,6 +115,7 @@ def validate_industry_code_type(df):
 # Field 10: Obligor Internal Risk Rating
 # MDRM Code: CLCOG080
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Internal_Risk_Rating'], mdrm='CLCOG080', kernel=('not_empty',))
 def validate_internal_risk_rating(df):
     df['Internal_Risk_Rating'] = df['Internal_Risk_Rating'].astype(str).str.strip().ne("")
     return df
@@ -105,9 +127,10 @@ def validate_internal_risk_rating(df):
 # Description: Taxpayer Identification Number; format must be #########, ##-#######, or 'NA'
 # Rule: Accept valid TIN formats or 'NA'
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['TIN'], mdrm='CLCO6191', kernel=('match', r'^(\d{9}|\d{2}-\d{7}|NA)$'))
 def validate_tin(df):
     pattern = r'^(\d{9}|\d{2}-\d{7}|NA)$'
-    df['TIN'] = df['TIN'].astype(str).str.match(pattern)
+    df['TIN'] = df['TIN'].astype(str).str.fullmatch(pattern)
     return df
 
 # ────────────────────────────────────────────────────────────────────────────────
@@ -115,6 +138,7 @@ def validate_tin(df):
 # MDRM Code: CLCO4534
 # Description: Free-text stock exchange name or 'NA'
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Stock_Exchange'], mdrm='CLCO4534', kernel=('not_empty',))
 def validate_stock_exchange(df):
     df['Stock_Exchange'] = df['Stock_Exchange'].astype(str).str.strip().ne("")
     return df
@@ -124,6 +148,7 @@ def validate_stock_exchange(df):
 # MDRM Code: CLCO4539
 # Description: Free-text or 'NA'
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Ticker_Symbol'], mdrm='CLCO4539', kernel=('not_empty',))
 def validate_ticker_symbol(df):
     df['Ticker_Symbol'] = df['Ticker_Symbol'].astype(str).str.strip().ne("")
     return df
@@ -131,11 +156,17 @@ def validate_ticker_symbol(df):
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 14: CUSIP
 # MDRM Code: CLCO9161
-# Description: First 6 chars of CUSIP or 'NA'
+# Description: First 6 chars of CUSIP, a full CUSIP with a valid check digit, or 'NA'
 # ────────────────────────────────────────────────────────────────────────────────
+def _is_cusip_or_na(x):
+    return bool(re.match(r'^[A-Za-z0-9]{6}$|^NA$', str(x))) or is_valid_cusip(x)
+
+# memoize=False: frames go through the vectorized check digit in the rule body
+@rule(['CUSIP'], mdrm='CLCO9161', expected='6-character CUSIP issuer code, full CUSIP with valid check digit, or NA',
+      scalar=_is_cusip_or_na, memoize=False)
 def validate_cusip(df):
-    pattern = r'^[A-Za-z0-9]{6}$|^NA$'
-    df['CUSIP'] = df['CUSIP'].astype(str).str.match(pattern)
+    values = df['CUSIP'].astype(str)
+    df['CUSIP'] = values.str.match(r'^[A-Za-z0-9]{6}$|^NA$') | cusip_mask(values)
     return df
 
 # ────────────────────────────────────────────────────────────────────────────────
@@ -143,9 +174,10 @@ def validate_cusip(df):
 # MDRM Code: CLCOM142
 # Description: Unique identifier; must not contain unprintables, carriage return, or comma
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Internal_Credit_Facility_ID'], mdrm='CLCOM142', tier='structural', kernel=('match', r'^[^\r\n,\x00-\x1F\x7F]+$'))
 def validate_internal_credit_facility_id(df):
     pattern = r'^[^\r\n,\x00-\x1F\x7F]+$'
-    df['Internal_Credit_Facility_ID'] = df['Internal_Credit_Facility_ID'].astype(str).str.match(pattern)
+    df['Internal_Credit_Facility_ID'] = df['Internal_Credit_Facility_ID'].astype(str).str.fullmatch(pattern)
     return df
 
 # ────────────────────────────────────────────────────────────────────────────────
@@ -153,9 +185,10 @@ def validate_internal_credit_facility_id(df):
 # MDRM Code: CLCOM296
 # Description: Same rules as Field 15. Multiple IDs allowed separated by comma
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Original_Credit_Facility_ID'], mdrm='CLCOM296', kernel=('match', r'^[^\r\n\x00-\x1F\x7F]+$'))
 def validate_original_credit_facility_id(df):
     pattern = r'^[^\r\n\x00-\x1F\x7F]+$'
-    df['Original_Credit_Facility_ID'] = df['Original_Credit_Facility_ID'].astype(str).str.match(pattern)
+    df['Original_Credit_Facility_ID'] = df['Original_Credit_Facility_ID'].astype(str).str.fullmatch(pattern)
     return df
 
 # ────────────────────────────────────────────────────────────────────────────────
@@ -164,14 +197,16 @@ def validate_original_credit_facility_id(df):
 # Description: Date of credit agreement origination
 # Rule: Must be in yyyy-mm-dd format and before or equal to today
 # ────────────────────────────────────────────────────────────────────────────────
+def _is_past_date(date_str):
+    try:
+        d = datetime.strptime(date_str, "%Y-%m-%d")
+        return d <= datetime.today()
+    except:
+        return False
+
+@rule(['Origination_Date'], mdrm='CLCO9912', tier='business', memoize=False, expected='yyyy-mm-dd date, not in the future', scalar=lambda x: _is_past_date(str(x)))
 def validate_origination_date(df):
-    def is_valid_date(date_str):
-        try:
-            d = datetime.strptime(date_str, "%Y-%m-%d")
-            return d <= datetime.today()
-        except:
-            return False
-    df['Origination_Date'] = df['Origination_Date'].astype(str).apply(is_valid_date)
+    df['Origination_Date'] = df['Origination_Date'].astype(str).apply(_is_past_date)
     return df
 
 # ────────────────────────────────────────────────────────────────────────────────
@@ -179,13 +214,21 @@ def validate_origination_date(df):
 # MDRM Code: CLCO9914
 # Description: Maturity date or '9999-01-01' for demand loans
 # ────────────────────────────────────────────────────────────────────────────────
+def _is_date_or_sentinel(date_str, sentinel):
+    # Year 9999 only appears as the field's placeholder, so the other field's sentinel is an error
+    if date_str.startswith("9999"):
+        return date_str == sentinel
+    try:
+        return bool(datetime.strptime(date_str, "%Y-%m-%d"))
+    except ValueError:
+        return False
+
+def _is_valid_maturity(date_str):
+    return _is_date_or_sentinel(date_str, "9999-01-01")
+
+@rule(['Maturity_Date'], mdrm='CLCO9914', expected='yyyy-mm-dd date or 9999-01-01', scalar=lambda x: _is_valid_maturity(str(x)))
 def validate_maturity_date(df):
-    def is_valid_maturity(date_str):
-        try:
-            return bool(datetime.strptime(date_str, "%Y-%m-%d"))
-        except:
-            return date_str == "9999-01-01"
-    df['Maturity_Date'] = df['Maturity_Date'].astype(str).apply(is_valid_maturity)
+    df['Maturity_Date'] = df['Maturity_Date'].astype(str).apply(_is_valid_maturity)
     return df
 
 # ────────────────────────────────────────────────────────────────────────────────
@@ -193,6 +236,7 @@ def validate_maturity_date(df):
 # MDRM Code: CLCOG072
 # Description: Number from 0 to 19
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Credit_Facility_Type'], mdrm='CLCOG072', kernel=('isin', [str(i) for i in range(20)]))
 def validate_credit_facility_type(df):
     df['Credit_Facility_Type'] = df['Credit_Facility_Type'].astype(str).isin([str(i) for i in range(20)])
     return df
@@ -200,9 +244,15 @@ def validate_credit_facility_type(df):
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 21: Other Credit Facility Type Description
 # ────────────────────────────────────────────────────────────────────────────────
+def _has_other_description(code, description):
+    # A code of '0' ("other") needs a non-blank description
+    return True if code != '0' or (code == '0' and description.strip() != '') else False
+
+@rule(['Credit_Facility_Type', 'Other_Credit_Facility_Type_Description'], output='Other_Credit_Facility_Desc',
+      expected='a description when Credit_Facility_Type is 0', scalar=_has_other_description)
 def validate_other_credit_facility_type_desc(df):
     df['Other_Credit_Facility_Desc'] = df.apply(
-        lambda x: True if x['Credit_Facility_Type'] != '0' or (x['Credit_Facility_Type'] == '0' and x['Other_Credit_Facility_Type_Description'].strip() != '') else False,
+        lambda x: _has_other_description(x['Credit_Facility_Type'], x['Other_Credit_Facility_Type_Description']),
         axis=1
     )
     return df
@@ -210,6 +260,7 @@ def validate_other_credit_facility_type_desc(df):
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 22: Credit Facility Purpose
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Credit_Facility_Purpose'], kernel=('isin', [str(i) for i in list(range(0, 31)) + [33]]))
 def validate_credit_facility_purpose(df):
     df['Credit_Facility_Purpose'] = df['Credit_Facility_Purpose'].astype(str).isin([str(i) for i in list(range(0, 31)) + [33]])
     return df
@@ -217,9 +268,11 @@ def validate_credit_facility_purpose(df):
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 23: Other Credit Facility Purpose Description
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Credit_Facility_Purpose', 'Other_Credit_Facility_Purpose_Description'], output='Other_Credit_Facility_Purpose_Desc',
+      expected='a description when Credit_Facility_Purpose is 0', scalar=_has_other_description)
 def validate_other_credit_facility_purpose_desc(df):
     df['Other_Credit_Facility_Purpose_Desc'] = df.apply(
-        lambda x: True if x['Credit_Facility_Purpose'] != '0' or (x['Credit_Facility_Purpose'] == '0' and x['Other_Credit_Facility_Purpose_Description'].strip() != '') else False,
+        lambda x: _has_other_description(x['Credit_Facility_Purpose'], x['Other_Credit_Facility_Purpose_Description']),
         axis=1
     )
     return df
@@ -227,20 +280,26 @@ def validate_other_credit_facility_purpose_desc(df):
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 24: Committed Exposure Global
 # ────────────────────────────────────────────────────────────────────────────────
+def _is_non_negative_number(x):
+    return isinstance(x, (int, float)) and x >= 0
+
+@rule(['Committed_Exposure'], tier='business', expected='non-negative number', scalar=_is_non_negative_number)
 def validate_committed_exposure(df):
-    df['Committed_Exposure'] = df['Committed_Exposure'].apply(lambda x: isinstance(x, (int, float)) and x >= 0)
+    df['Committed_Exposure'] = df['Committed_Exposure'].apply(_is_non_negative_number)
     return df
 
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 25: Utilized Exposure Global
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Utilized_Exposure'], tier='business', expected='non-negative number', scalar=_is_non_negative_number)
 def validate_utilized_exposure(df):
-    df['Utilized_Exposure'] = df['Utilized_Exposure'].apply(lambda x: isinstance(x, (int, float)) and x >= 0)
+    df['Utilized_Exposure'] = df['Utilized_Exposure'].apply(_is_non_negative_number)
     return df
 
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 26: Line Reported on FR Y-9C
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Line_Reported_on_FR_Y9C'], kernel=('isin', [str(i) for i in range(1, 12)]))
 def validate_line_reported_on_fry9c(df):
     df['Line_Reported_on_FR_Y9C'] = df['Line_Reported_on_FR_Y9C'].astype(str).isin([str(i) for i in range(1, 12)])
     return df
@@ -248,6 +307,7 @@ def validate_line_reported_on_fry9c(df):
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 27: Line of Business
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Line_of_Business'], kernel=('not_empty',))
 def validate_line_of_business(df):
     df['Line_of_Business'] = df['Line_of_Business'].astype(str).str.strip().ne("")
     return df
@@ -255,17 +315,23 @@ def validate_line_of_business(df):
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 28: Cumulative Charge-offs
 # ────────────────────────────────────────────────────────────────────────────────
+def _is_valid_chargeoffs(val):
+    return val == 'NA' or (isinstance(val, (int, float)) and val >= 0)
+
+@rule(['Cumulative_Chargeoffs'], tier='business', expected='non-negative number or NA', scalar=_is_valid_chargeoffs)
 def validate_cumulative_chargeoffs(df):
-    def is_valid(val):
-        return val == 'NA' or (isinstance(val, (int, float)) and val >= 0)
-    df['Cumulative_Chargeoffs'] = df['Cumulative_Chargeoffs'].apply(is_valid)
+    df['Cumulative_Chargeoffs'] = df['Cumulative_Chargeoffs'].apply(_is_valid_chargeoffs)
     return df
 
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 32: # Days Principal or Interest Past Due
 # ────────────────────────────────────────────────────────────────────────────────
+def _is_non_negative_int(x):
+    return isinstance(x, int) and x >= 0
+
+@rule(['Days_Past_Due'], tier='business', expected='non-negative integer', scalar=_is_non_negative_int)
 def validate_days_past_due(df):
-    df['Days_Past_Due'] = df['Days_Past_Due'].apply(lambda x: isinstance(x, int) and x >= 0)
+    df['Days_Past_Due'] = df['Days_Past_Due'].apply(_is_non_negative_int)
     return df
 
 # ────────────────────────────────────────────────────────────────────────────────
@@ -274,19 +340,19 @@ def validate_days_past_due(df):
 # Description: Date the credit facility was placed on non-accrual or '9999-12-31' if not applicable
 # Rule: Must be a valid yyyy-mm-dd date format or '9999-12-31'
 # ────────────────────────────────────────────────────────────────────────────────
+def _is_valid_non_accrual(date_str):
+    return _is_date_or_sentinel(date_str, "9999-12-31")
+
+@rule(['Non_Accrual_Date'], mdrm='CLCOG078', expected='yyyy-mm-dd date or 9999-12-31', scalar=lambda x: _is_valid_non_accrual(str(x)))
 def validate_non_accrual_date(df):
-    def is_valid_non_accrual(date_str):
-        try:
-            return bool(datetime.strptime(date_str, "%Y-%m-%d"))
-        except:
-            return date_str == "9999-12-31"
-    df['Non_Accrual_Date'] = df['Non_Accrual_Date'].astype(str).apply(is_valid_non_accrual)
+    df['Non_Accrual_Date'] = df['Non_Accrual_Date'].astype(str).apply(_is_valid_non_accrual)
     return df
     
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 34: Participation Flag
 # MDRM Code: CLCO6135
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Participation_Flag'], mdrm='CLCO6135', kernel=('isin', ['1', '2', '3', '4', '5']))
 def validate_participation_flag(df):
     df['Participation_Flag'] = df['Participation_Flag'].astype(str).isin(['1', '2', '3', '4', '5'])
     return df
@@ -302,6 +368,7 @@ def validate_participation_flag(df):
 #   3 = Senior Unsecured
 #   4 = Contractually Subordinated
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Lien_Position'], mdrm='CLCOK450', kernel=('isin', ['1', '2', '3', '4']))
 def validate_lien_position(df):
     allowed_values = ['1', '2', '3', '4']
     df['Lien_Position'] = df['Lien_Position'].astype(str).isin(allowed_values)
@@ -321,6 +388,7 @@ def validate_lien_position(df):
 #   5 = Other
 #   6 = Unsecured
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Security_Type'], mdrm='CLCOM298', kernel=('isin', ['0', '1', '2', '3', '4', '5', '6']))
 def validate_security_type(df):
     allowed_values = ['0', '1', '2', '3', '4', '5', '6']
     df['Security_Type'] = df['Security_Type'].astype(str).isin(allowed_values)
@@ -337,123 +405,143 @@ def validate_security_type(df):
 #   3 = Mixed
 #   4 = Entirely fee based
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Interest_Rate_Variability'], mdrm='CLCOK461', kernel=('isin', ['1', '2', '3', '4']))
 def validate_interest_rate_variability(df):
     allowed_values = ['1', '2', '3', '4']
     df['Interest_Rate_Variability'] = df['Interest_Rate_Variability'].astype(str).isin(allowed_values)
     return df
 
 
-def validate_interest_rate(df):
-    def is_valid_rate(val):
-        if str(val).strip().upper() == 'NA':
-            return True
-        try:
-            val = float(val)
-            return 0 <= val <= 1  # Assuming 0% to 100% in decimal form
-        except:
-            return False
+def _is_valid_rate(val):
+    if str(val).strip().upper() == 'NA':
+        return True
+    try:
+        val = float(val)
+        return 0 <= val <= 1  # Assuming 0% to 100% in decimal form
+    except:
+        return False
 
-    df['Interest_Rate'] = df['Interest_Rate'].apply(is_valid_rate)
+@rule(['Interest_Rate'], tier='business', expected='decimal between 0 and 1, or NA', scalar=_is_valid_rate)
+def validate_interest_rate(df):
+    df['Interest_Rate'] = df['Interest_Rate'].apply(_is_valid_rate)
     return df
 
 
+@rule(['Interest_Rate_Index'], kernel=('isin', ['1', '2', '3', '4', '5', '6', '7']))
 def validate_interest_rate_index(df):
     allowed_values = ['1', '2', '3', '4', '5', '6', '7']
     df['Interest_Rate_Index'] = df['Interest_Rate_Index'].astype(str).isin(allowed_values)
     return df
 
 
-def validate_interest_rate_spread(df):
-    def is_valid_spread(val):
-        if str(val).strip().upper() == 'NA':
-            return True
-        try:
-            float(val)  # Allow negative spreads too
-            return True
-        except:
-            return False
+def _is_valid_spread(val):
+    if str(val).strip().upper() == 'NA':
+        return True
+    try:
+        float(val)  # Allow negative spreads too
+        return True
+    except:
+        return False
 
-    df['Interest_Rate_Spread'] = df['Interest_Rate_Spread'].apply(is_valid_spread)
+@rule(['Interest_Rate_Spread'], expected='number or NA', scalar=_is_valid_spread)
+def validate_interest_rate_spread(df):
+    df['Interest_Rate_Spread'] = df['Interest_Rate_Spread'].apply(_is_valid_spread)
     return df
 
-def validate_interest_rate_ceiling(df):
-    def is_valid_ceiling(val):
-        val = str(val).strip().upper()
-        if val in ['NA', 'NONE']:
-            return True
-        try:
-            float(val)
-            return True
-        except:
-            return False
+def _is_valid_ceiling(val):
+    val = str(val).strip().upper()
+    if val in ['NA', 'NONE']:
+        return True
+    try:
+        float(val)
+        return True
+    except:
+        return False
 
-    df['Interest_Rate_Ceiling'] = df['Interest_Rate_Ceiling'].apply(is_valid_ceiling)
+@rule(['Interest_Rate_Ceiling'], expected='number, NA or NONE', scalar=_is_valid_ceiling)
+def validate_interest_rate_ceiling(df):
+    df['Interest_Rate_Ceiling'] = df['Interest_Rate_Ceiling'].apply(_is_valid_ceiling)
     return df
 
 
-def validate_interest_rate_floor(df):
-    def is_valid_floor(val):
-        val = str(val).strip().upper()
-        if val in ['NA', 'NONE']:
-            return True
-        try:
-            float(val)
-            return True
-        except:
-            return False
+def _is_valid_floor(val):
+    val = str(val).strip().upper()
+    if val in ['NA', 'NONE']:
+        return True
+    try:
+        float(val)
+        return True
+    except:
+        return False
 
-    df['Interest_Rate_Floor'] = df['Interest_Rate_Floor'].apply(is_valid_floor)
+@rule(['Interest_Rate_Floor'], expected='number, NA or NONE', scalar=_is_valid_floor)
+def validate_interest_rate_floor(df):
+    df['Interest_Rate_Floor'] = df['Interest_Rate_Floor'].apply(_is_valid_floor)
     return df
 
 
+@rule(['Tax_Status'], kernel=('isin', ['1', '2']))
 def validate_tax_status(df):
     df['Tax_Status'] = df['Tax_Status'].astype(str).isin(['1', '2'])
     return df
 
 
+@rule(['Tax_Status'], kernel=('isin', ['1', '2']))
 def validate_tax_status(df):
     df['Tax_Status'] = df['Tax_Status'].astype(str).isin(['1', '2'])
     return df
 
 
-def validate_guarantor_internal_id(df):
+def _is_na_or_printable(x):
     pattern = r'^[^\r\n,\x00-\x1F\x7F]+$'
-    df['Guarantor_Internal_ID'] = df['Guarantor_Internal_ID'].astype(str).apply(lambda x: True if x.strip().upper() == 'NA' else bool(re.match(pattern, x)))
+    return True if x.strip().upper() == 'NA' else bool(re.match(pattern, x))
+
+@rule(['Guarantor_Internal_ID'], expected='NA or text without commas, line breaks or control characters', scalar=lambda x: _is_na_or_printable(str(x)))
+def validate_guarantor_internal_id(df):
+    df['Guarantor_Internal_ID'] = df['Guarantor_Internal_ID'].astype(str).apply(_is_na_or_printable)
     return df
 
 
+@rule(['Guarantor_Name'], expected='NA or text without commas, line breaks or control characters', scalar=lambda x: _is_na_or_printable(str(x)))
 def validate_guarantor_name(df):
-    pattern = r'^[^\r\n,\x00-\x1F\x7F]+$'
-    df['Guarantor_Name'] = df['Guarantor_Name'].astype(str).apply(lambda x: True if x.strip().upper() == 'NA' else bool(re.match(pattern, x)))
+    df['Guarantor_Name'] = df['Guarantor_Name'].astype(str).apply(_is_na_or_printable)
     return df
 
 
+@rule(['Guarantor_TIN'], expected='NNN-NN-NNNN, 9 digits or NA', scalar=lambda x: bool(re.match(r'^(\d{3}-\d{2}-\d{4}|\d{9}|NA)$', str(x).upper())))
 def validate_guarantor_tin(df):
     pattern = r'^(\d{3}-\d{2}-\d{4}|\d{9}|NA)$'
     df['Guarantor_TIN'] = df['Guarantor_TIN'].astype(str).str.upper().str.match(pattern)
     return df
 
 
+def _is_na_or_nonblank(x):
+    return True if x.strip().upper() == 'NA' else bool(x.strip())
+
+@rule(['Guarantor_Internal_Risk_Rating'], expected='not empty', scalar=lambda x: _is_na_or_nonblank(str(x)))
 def validate_guarantor_internal_risk_rating(df):
-    df['Guarantor_Internal_Risk_Rating'] = df['Guarantor_Internal_Risk_Rating'].astype(str).apply(lambda x: True if x.strip().upper() == 'NA' else bool(x.strip()))
+    df['Guarantor_Internal_Risk_Rating'] = df['Guarantor_Internal_Risk_Rating'].astype(str).apply(_is_na_or_nonblank)
     return df
 
 
+@rule(['Entity_Internal_ID'], kernel=('match', r'^[^\r\n,\x00-\x1F\x7F]*$'))
 def validate_entity_internal_id(df):
     pattern = r'^[^\r\n,\x00-\x1F\x7F]*$'
-    df['Entity_Internal_ID'] = df['Entity_Internal_ID'].astype(str).str.match(pattern)
+    df['Entity_Internal_ID'] = df['Entity_Internal_ID'].astype(str).str.fullmatch(pattern)
     return df
 
 
+@rule(['Entity_Name'], kernel=('match', r'^[^\r\n,\x00-\x1F\x7F]*$'))
 def validate_entity_name(df):
     pattern = r'^[^\r\n,\x00-\x1F\x7F]*$'
-    df['Entity_Name'] = df['Entity_Name'].astype(str).str.match(pattern)
+    df['Entity_Name'] = df['Entity_Name'].astype(str).str.fullmatch(pattern)
     return df
     
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 51: Entity Internal Risk Rating
 # MDRM Code: CLCEG080
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Entity_Internal_Risk_Rating'], mdrm='CLCEG080', kernel=('not_empty',))
 def validate_entity_internal_risk_rating(df):
     df['Entity_Internal_Risk_Rating'] = df['Entity_Internal_Risk_Rating'].astype(str).str.strip().ne("")
     return df
@@ -462,22 +550,45 @@ def validate_entity_internal_risk_rating(df):
 # Field 52: Date of Financials
 # MDRM Code: CLCE9999
 # ────────────────────────────────────────────────────────────────────────────────
+DATE_FORMAT = "%Y-%m-%d"
+
+def parse_date(x):
+    """
+    x as a datetime if it is a DATE_FORMAT date within pandas' Timestamp range,
+    else None. Matches pd.to_datetime(format=DATE_FORMAT, errors='coerce'),
+    whose per-value path is much slower.
+    """
+    # pd.Timestamp is a datetime subclass
+    if isinstance(x, datetime):
+        return x if pd.notna(x) else None
+    try:
+        d = datetime.strptime(x, DATE_FORMAT)
+    except (ValueError, TypeError):
+        return None
+    return d if pd.Timestamp.min <= d <= pd.Timestamp.max else None
+
+def _is_parseable_date(x):
+    return parse_date(x) is not None
+
+@rule(['Date_Financials'], mdrm='CLCE9999', expected='a valid yyyy-mm-dd date', scalar=_is_parseable_date)
 def validate_date_financials(df):
-    df['Date_Financials'] = pd.to_datetime(df['Date_Financials'], errors='coerce').notna()
+    df['Date_Financials'] = pd.to_datetime(df['Date_Financials'], format=DATE_FORMAT, errors='coerce').notna()
     return df
 
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 53: Date of Last Audit
 # MDRM Code: CLCE4929
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Date_Last_Audit'], mdrm='CLCE4929', expected='a valid yyyy-mm-dd date', scalar=_is_parseable_date)
 def validate_date_last_audit(df):
-    df['Date_Last_Audit'] = pd.to_datetime(df['Date_Last_Audit'], errors='coerce').notna()
+    df['Date_Last_Audit'] = pd.to_datetime(df['Date_Last_Audit'], format=DATE_FORMAT, errors='coerce').notna()
     return df
 
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 54: Net Sales Current
 # MDRM Code: CLCEM301
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Net_Sales_Current'], mdrm='CLCEM301', kernel=('digits',))
 def validate_net_sales_current(df):
     df['Net_Sales_Current'] = df['Net_Sales_Current'].apply(lambda x: str(x).isdigit())
     return df
@@ -486,6 +597,7 @@ def validate_net_sales_current(df):
 # Field 55: Net Sales Prior Year
 # MDRM Code: CLCEM302
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Net_Sales_Prior_Year'], mdrm='CLCEM302', kernel=('digits',))
 def validate_net_sales_prior_year(df):
     df['Net_Sales_Prior_Year'] = df['Net_Sales_Prior_Year'].apply(lambda x: str(x).isdigit())
     return df
@@ -493,6 +605,7 @@ def validate_net_sales_prior_year(df):
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 56: Operating Income
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Operating_Income'], kernel=('digits',))
 def validate_operating_income(df):
     df['Operating_Income'] = df['Operating_Income'].apply(lambda x: str(x).isdigit())
     return df
@@ -500,6 +613,7 @@ def validate_operating_income(df):
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 57: Depreciation & Amortization
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Depreciation_Amortization'], kernel=('digits',))
 def validate_depreciation_amortization(df):
     df['Depreciation_Amortization'] = df['Depreciation_Amortization'].apply(lambda x: str(x).isdigit())
     return df
@@ -508,6 +622,7 @@ def validate_depreciation_amortization(df):
 # Field 58: Interest Expense
 # MDRM Code: CLCEM305
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Interest_Expense'], mdrm='CLCEM305', kernel=('digits',))
 def validate_interest_expense(df):
     df['Interest_Expense'] = df['Interest_Expense'].apply(lambda x: str(x).isdigit())
     return df
@@ -516,6 +631,7 @@ def validate_interest_expense(df):
 # Field 59: Net Income Current
 # MDRM Code: CLCEM306
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Net_Income_Current'], mdrm='CLCEM306', kernel=('digits',))
 def validate_net_income_current(df):
     df['Net_Income_Current'] = df['Net_Income_Current'].apply(lambda x: str(x).isdigit())
     return df
@@ -524,6 +640,7 @@ def validate_net_income_current(df):
 # Field 60: Net Income Prior Year
 # MDRM Code: CLCEM307
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Net_Income_Prior_Year'], mdrm='CLCEM307', kernel=('digits',))
 def validate_net_income_prior_year(df):
     df['Net_Income_Prior_Year'] = df['Net_Income_Prior_Year'].apply(lambda x: str(x).isdigit())
     return df
@@ -533,6 +650,7 @@ def validate_net_income_prior_year(df):
 # Field 61: Cash & Marketable Securities
 # MDRM Code: CLCEM308
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Cash_Marketable_Securities'], mdrm='CLCEM308', kernel=('digits',))
 def validate_cash_marketable_securities(df):
     df['Cash_Marketable_Securities'] = df['Cash_Marketable_Securities'].apply(lambda x: str(x).isdigit())
     return df
@@ -541,6 +659,7 @@ def validate_cash_marketable_securities(df):
 # Field 62: Accounts Receivable (A/R) Current
 # MDRM Code: CLCEM309
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Accounts_Receivable_Current'], mdrm='CLCEM309', output='AR_Current', kernel=('digits',))
 def validate_accounts_receivable_current(df):
     df['AR_Current'] = df['Accounts_Receivable_Current'].apply(lambda x: str(x).isdigit())
     return df
@@ -549,6 +668,7 @@ def validate_accounts_receivable_current(df):
 # Field 63: Accounts Receivable (A/R) Prior Year
 # MDRM Code: CLCEM310
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Accounts_Receivable_Prior_Year'], mdrm='CLCEM310', output='AR_Prior_Year', kernel=('digits',))
 def validate_accounts_receivable_prior_year(df):
     df['AR_Prior_Year'] = df['Accounts_Receivable_Prior_Year'].apply(lambda x: str(x).isdigit())
     return df
@@ -557,6 +677,7 @@ def validate_accounts_receivable_prior_year(df):
 # Field 64: Inventory Current
 # MDRM Code: CLCEM311
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Inventory_Current'], mdrm='CLCEM311', kernel=('digits',))
 def validate_inventory_current(df):
     df['Inventory_Current'] = df['Inventory_Current'].apply(lambda x: str(x).isdigit())
     return df
@@ -565,6 +686,7 @@ def validate_inventory_current(df):
 # Field 65: Inventory Prior Year
 # MDRM Code: CLCEM312
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Inventory_Prior_Year'], mdrm='CLCEM312', kernel=('digits',))
 def validate_inventory_prior_year(df):
     df['Inventory_Prior_Year'] = df['Inventory_Prior_Year'].apply(lambda x: str(x).isdigit())
     return df
@@ -573,6 +695,7 @@ def validate_inventory_prior_year(df):
 # Field 66: Current Assets Current
 # MDRM Code: CLCEM313
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Current_Assets_Current'], mdrm='CLCEM313', kernel=('digits',))
 def validate_current_assets_current(df):
     df['Current_Assets_Current'] = df['Current_Assets_Current'].apply(lambda x: str(x).isdigit())
     return df
@@ -581,6 +704,7 @@ def validate_current_assets_current(df):
 # Field 67: Current Assets Prior Year
 # MDRM Code: CLCEM314
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Current_Assets_Prior_Year'], mdrm='CLCEM314', kernel=('digits',))
 def validate_current_assets_prior_year(df):
     df['Current_Assets_Prior_Year'] = df['Current_Assets_Prior_Year'].apply(lambda x: str(x).isdigit())
     return df
@@ -589,6 +713,7 @@ def validate_current_assets_prior_year(df):
 # Field 68: Tangible Assets
 # MDRM Code: CLCEM315
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Tangible_Assets'], mdrm='CLCEM315', kernel=('digits',))
 def validate_tangible_assets(df):
     df['Tangible_Assets'] = df['Tangible_Assets'].apply(lambda x: str(x).isdigit())
     return df
@@ -597,6 +722,7 @@ def validate_tangible_assets(df):
 # Field 69: Fixed Assets
 # MDRM Code: CLCEM316
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Fixed_Assets'], mdrm='CLCEM316', kernel=('digits',))
 def validate_fixed_assets(df):
     df['Fixed_Assets'] = df['Fixed_Assets'].apply(lambda x: str(x).isdigit())
     return df
@@ -605,6 +731,7 @@ def validate_fixed_assets(df):
 # Field 70: Total Assets Current
 # MDRM Code: CLCE2170
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Total_Assets_Current'], mdrm='CLCE2170', kernel=('digits',))
 def validate_total_assets_current(df):
     df['Total_Assets_Current'] = df['Total_Assets_Current'].apply(lambda x: str(x).isdigit())
     return df
@@ -613,6 +740,7 @@ def validate_total_assets_current(df):
 # Field 71: Total Assets Prior Year
 # MDRM Code: CLCEM317
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Total_Assets_Prior_Year'], mdrm='CLCEM317', kernel=('digits',))
 def validate_total_assets_prior_year(df):
     df['Total_Assets_Prior_Year'] = df['Total_Assets_Prior_Year'].apply(lambda x: str(x).isdigit())
     return df
@@ -621,6 +749,7 @@ def validate_total_assets_prior_year(df):
 # Field 72: Accounts Payable Current
 # MDRM Code: CLCE3066
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Accounts_Payable_Current'], mdrm='CLCE3066', kernel=('digits',))
 def validate_accounts_payable_current(df):
     df['Accounts_Payable_Current'] = df['Accounts_Payable_Current'].apply(lambda x: str(x).isdigit())
     return df
@@ -629,6 +758,7 @@ def validate_accounts_payable_current(df):
 # Field 73: Accounts Payable Prior Year
 # MDRM Code: CLCEM325
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Accounts_Payable_Prior_Year'], mdrm='CLCEM325', kernel=('digits',))
 def validate_accounts_payable_prior_year(df):
     df['Accounts_Payable_Prior_Year'] = df['Accounts_Payable_Prior_Year'].apply(lambda x: str(x).isdigit())
     return df
@@ -637,6 +767,7 @@ def validate_accounts_payable_prior_year(df):
 # Field 74: Short Term Debt
 # MDRM Code: CLCEM319
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Short_Term_Debt'], mdrm='CLCEM319', kernel=('digits',))
 def validate_short_term_debt(df):
     df['Short_Term_Debt'] = df['Short_Term_Debt'].apply(lambda x: str(x).isdigit())
     return df
@@ -645,6 +776,7 @@ def validate_short_term_debt(df):
 # Field 75: Current Maturities of Long Term Debt
 # MDRM Code: CLCEM320
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Current_Maturities_Long_Term_Debt'], mdrm='CLCEM320', kernel=('digits',))
 def validate_current_maturities_long_term_debt(df):
     df['Current_Maturities_Long_Term_Debt'] = df['Current_Maturities_Long_Term_Debt'].apply(lambda x: str(x).isdigit())
     return df
@@ -653,6 +785,7 @@ def validate_current_maturities_long_term_debt(df):
 # Field 76: Current Liabilities Current
 # MDRM Code: CLCEM321
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Current_Liabilities_Current'], mdrm='CLCEM321', kernel=('digits',))
 def validate_current_liabilities_current(df):
     df['Current_Liabilities_Current'] = df['Current_Liabilities_Current'].apply(lambda x: str(x).isdigit())
     return df
@@ -661,6 +794,7 @@ def validate_current_liabilities_current(df):
 # Field 77: Current Liabilities Prior Year
 # MDRM Code: CLCEM322
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Current_Liabilities_Prior_Year'], mdrm='CLCEM322', kernel=('digits',))
 def validate_current_liabilities_prior_year(df):
     df['Current_Liabilities_Prior_Year'] = df['Current_Liabilities_Prior_Year'].apply(lambda x: str(x).isdigit())
     return df
@@ -669,6 +803,7 @@ def validate_current_liabilities_prior_year(df):
 # Field 78: Long Term Debt
 # MDRM Code: CLCEM323
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Long_Term_Debt'], mdrm='CLCEM323', kernel=('digits',))
 def validate_long_term_debt(df):
     df['Long_Term_Debt'] = df['Long_Term_Debt'].apply(lambda x: str(x).isdigit())
     return df
@@ -677,14 +812,19 @@ def validate_long_term_debt(df):
 # Field 79: Minority Interest
 # MDRM Code: CLCE4484
 # ────────────────────────────────────────────────────────────────────────────────
+def _is_digits_or_na(x):
+    return str(x).isdigit() or str(x).strip().upper() == 'NA'
+
+@rule(['Minority_Interest'], mdrm='CLCE4484', expected='digits only or NA', scalar=_is_digits_or_na)
 def validate_minority_interest(df):
-    df['Minority_Interest'] = df['Minority_Interest'].apply(lambda x: str(x).isdigit() or str(x).strip().upper() == 'NA')
+    df['Minority_Interest'] = df['Minority_Interest'].apply(_is_digits_or_na)
     return df
 
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 80: Total Liabilities
 # MDRM Code: CLCE2950
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Total_Liabilities'], mdrm='CLCE2950', kernel=('digits',))
 def validate_total_liabilities(df):
     df['Total_Liabilities'] = df['Total_Liabilities'].apply(lambda x: str(x).isdigit())
     return df
@@ -693,6 +833,7 @@ def validate_total_liabilities(df):
 # Field 81: Retained Earnings
 # MDRM Code: CLCE3247
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Retained_Earnings'], mdrm='CLCE3247', kernel=('digits',))
 def validate_retained_earnings(df):
     df['Retained_Earnings'] = df['Retained_Earnings'].apply(lambda x: str(x).isdigit())
     return df
@@ -701,6 +842,7 @@ def validate_retained_earnings(df):
 # Field 82: Capital Expenditures
 # MDRM Code: CLCEM324
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Capital_Expenditures'], mdrm='CLCEM324', kernel=('digits',))
 def validate_capital_expenditures(df):
     df['Capital_Expenditures'] = df['Capital_Expenditures'].apply(lambda x: str(x).isdigit())
     return df
@@ -708,6 +850,7 @@ def validate_capital_expenditures(df):
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 83: Special Purpose Entity Flag
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Special_Purpose_Entity_Flag'], expected='1 or 2', scalar=lambda x: x in (1, 2))
 def validate_special_purpose_entity_flag(df):
     df['Special_Purpose_Entity_Flag'] = df['Special_Purpose_Entity_Flag'].isin([1, 2])
     return df
@@ -715,6 +858,7 @@ def validate_special_purpose_entity_flag(df):
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 86: Lower of Cost or Market Flag
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['LOCOM'], expected='1, 2 or 3', scalar=lambda x: x in (1, 2, 3))
 def validate_locom_flag(df):
     df['LOCOM'] = df['LOCOM'].isin([1, 2, 3])
     return df
@@ -722,77 +866,95 @@ def validate_locom_flag(df):
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 87: SNC Internal Credit ID
 # ────────────────────────────────────────────────────────────────────────────────
+def _is_valid_snc_id(x):
+    return x == 'NA' or bool(re.match(r'^[^,\r\n\f]+$', str(x)))
+
+@rule(['SNC_Internal_Credit_ID'], expected='NA or text without commas or line breaks', scalar=_is_valid_snc_id)
 def validate_snc_internal_credit_id(df):
-    df['SNC_Internal_Credit_ID'] = df['SNC_Internal_Credit_ID'].apply(lambda x: x == 'NA' or bool(re.match(r'^[^,\r\n\f]+$', str(x))))
+    df['SNC_Internal_Credit_ID'] = df['SNC_Internal_Credit_ID'].apply(_is_valid_snc_id)
     return df
 
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 88: Probability of Default (PD)
 # ────────────────────────────────────────────────────────────────────────────────
+def _is_valid_pd(x):
+    if str(x).upper() == 'NA':
+        return True
+    try:
+        val = float(x)
+        return 0 <= val <= 1
+    except:
+        return False
+
+@rule(['Probability_of_Default'], output='PD', tier='business', expected='decimal between 0 and 1, or NA', scalar=_is_valid_pd)
 def validate_probability_of_default(df):
-    def is_valid_pd(x):
-        if str(x).upper() == 'NA':
-            return True
-        try:
-            val = float(x)
-            return 0 <= val <= 1
-        except:
-            return False
-    df['PD'] = df['Probability_of_Default'].apply(is_valid_pd)
+    df['PD'] = df['Probability_of_Default'].apply(_is_valid_pd)
     return df
 
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 89: Loss Given Default (LGD)
 # MDRM Code: CLCOG081
 # ────────────────────────────────────────────────────────────────────────────────
+def _is_valid_lgd(x):
+    if str(x).upper() == 'NA':
+        return True
+    try:
+        val = float(x)
+        return 0 <= val <= 1
+    except:
+        return False
+
+@rule(['LGD'], mdrm='CLCOG081', tier='business', expected='decimal between 0 and 1, or NA', scalar=_is_valid_lgd)
 def validate_loss_given_default(df):
-    def is_valid_lgd(x):
-        if str(x).upper() == 'NA':
-            return True
-        try:
-            val = float(x)
-            return 0 <= val <= 1
-        except:
-            return False
-    df['LGD'] = df['LGD'].apply(is_valid_lgd)
+    df['LGD'] = df['LGD'].apply(_is_valid_lgd)
     return df
 
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 90: Exposure At Default (EAD)
 # ────────────────────────────────────────────────────────────────────────────────
+def _is_valid_ead(x):
+    return str(x).isdigit() or str(x).strip().upper() == 'NA'
+
+@rule(['EAD'], expected='digits only or NA', scalar=_is_valid_ead)
 def validate_exposure_at_default(df):
-    def is_valid_ead(x):
-        return str(x).isdigit() or str(x).strip().upper() == 'NA'
-    df['EAD'] = df['EAD'].apply(is_valid_ead)
+    df['EAD'] = df['EAD'].apply(_is_valid_ead)
     return df
 
 
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 91: Renewal Date
 # ────────────────────────────────────────────────────────────────────────────────
+def _is_valid_renewal_date(x):
+    return _is_date_or_sentinel(str(x).strip(), "9999-12-31")
+
+@rule(['Renewal_Date'], expected='yyyy-mm-dd date or 9999-12-31', scalar=_is_valid_renewal_date)
 def validate_renewal_date(df):
-    def is_valid_date(x):
-        return str(x).strip() == '9999-12-31' or bool(re.match(r'^\d{2}-\d{2}-\d{4}$', str(x)))
-    df['Renewal_Date'] = df['Renewal_Date'].apply(is_valid_date)
+    df['Renewal_Date'] = df['Renewal_Date'].apply(_is_valid_renewal_date)
     return df
 
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 92: Credit Facility Currency
 # ────────────────────────────────────────────────────────────────────────────────
+def _is_currency_code(x):
+    return str(x).strip() in CURRENCY_CODES
+
+@rule(['Credit_Facility_Currency'], expected='ISO 4217 currency code', scalar=_is_currency_code)
 def validate_credit_facility_currency(df):
-    df['Credit_Facility_Currency'] = df['Credit_Facility_Currency'].apply(lambda x: bool(re.match(r'^[A-Z]{3}$', str(x).strip())))
+    df['Credit_Facility_Currency'] = df['Credit_Facility_Currency'].astype(str).str.strip().isin(CURRENCY_CODES)
     return df
 
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 93: Collateral Market Value
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Collateral_Market_Value'], expected='digits only or NA', scalar=_is_digits_or_na)
 def validate_collateral_market_value(df):
-    df['Collateral_Market_Value'] = df['Collateral_Market_Value'].apply(lambda x: str(x).isdigit() or str(x).strip().upper() == 'NA')
+    df['Collateral_Market_Value'] = df['Collateral_Market_Value'].apply(_is_digits_or_na)
     return df
 
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 94: Prepayment Penalty Flag
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Prepayment_Penalty_Flag'], expected='1, 2 or 3', scalar=lambda x: x in (1, 2, 3))
 def validate_prepayment_penalty_flag(df):
     df['Prepayment_Penalty_Flag'] = df['Prepayment_Penalty_Flag'].isin([1, 2, 3])
     return df
@@ -800,28 +962,36 @@ def validate_prepayment_penalty_flag(df):
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 95: Entity Industry Code
 # ────────────────────────────────────────────────────────────────────────────────
+# NAICS, or SIC or GICS when NAICS is not available; there is no type field to tell them apart
+def _is_industry_code(x):
+    return str(x).isdigit() and 4 <= len(str(x)) <= 6
+
+@rule(['Entity_Industry_Code'], expected='4 to 6 digit NAICS, SIC or GICS code', scalar=_is_industry_code)
 def validate_entity_industry_code(df):
-    df['Entity_Industry_Code'] = df['Entity_Industry_Code'].apply(lambda x: str(x).isdigit() and 4 <= len(str(x)) <= 6)
+    df['Entity_Industry_Code'] = df['Entity_Industry_Code'].apply(_is_industry_code)
     return df
 
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 96: Participation Interest
 # ────────────────────────────────────────────────────────────────────────────────
+def _is_valid_participation(x):
+    if str(x).strip().upper() == 'NA':
+        return True
+    try:
+        val = float(x)
+        return 0 <= val <= 1
+    except:
+        return False
+
+@rule(['Participation_Interest'], tier='business', expected='decimal between 0 and 1, or NA', scalar=_is_valid_participation)
 def validate_participation_interest(df):
-    def is_valid_participation(x):
-        if str(x).strip().upper() == 'NA':
-            return True
-        try:
-            val = float(x)
-            return 0 <= val <= 1
-        except:
-            return False
-    df['Participation_Interest'] = df['Participation_Interest'].apply(is_valid_participation)
+    df['Participation_Interest'] = df['Participation_Interest'].apply(_is_valid_participation)
     return df
 
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 97: Leveraged Loan Flag
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Leveraged_Loan_Flag'], expected='1 or 2', scalar=lambda x: x in (1, 2))
 def validate_leveraged_loan_flag(df):
     df['Leveraged_Loan_Flag'] = df['Leveraged_Loan_Flag'].isin([1, 2])
     return df
@@ -829,6 +999,7 @@ def validate_leveraged_loan_flag(df):
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 98: Disposition Flag
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Disposition_Flag'], expected='integer from 0 to 8', scalar=lambda x: x in range(9))
 def validate_disposition_flag(df):
     df['Disposition_Flag'] = df['Disposition_Flag'].isin(list(range(9)))
     return df
@@ -836,13 +1007,18 @@ def validate_disposition_flag(df):
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 99: Disposition Schedule Shift
 # ────────────────────────────────────────────────────────────────────────────────
+def _is_valid_schedule_shift(x):
+    return bool(re.match(r'^[A-Z]\.[A-Z]\.\d$', str(x).strip())) or str(x).strip().upper() == 'NA'
+
+@rule(['Disposition_Schedule_Shift'], expected='letter.letter.digit (e.g. A.B.1) or NA', scalar=_is_valid_schedule_shift)
 def validate_disposition_schedule_shift(df):
-    df['Disposition_Schedule_Shift'] = df['Disposition_Schedule_Shift'].apply(lambda x: bool(re.match(r'^[A-Z]\.[A-Z]\.\d$', str(x).strip())) or str(x).strip().upper() == 'NA')
+    df['Disposition_Schedule_Shift'] = df['Disposition_Schedule_Shift'].apply(_is_valid_schedule_shift)
     return df
 
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 100: Syndicated Loan Flag
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['Syndicated_Loan_Flag'], expected='integer from 0 to 4', scalar=lambda x: x in (0, 1, 2, 3, 4))
 def validate_syndicated_loan_flag(df):
     df['Syndicated_Loan_Flag'] = df['Syndicated_Loan_Flag'].isin([0, 1, 2, 3, 4])
     return df
@@ -851,15 +1027,18 @@ def validate_syndicated_loan_flag(df):
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 101: Target Hold
 # ────────────────────────────────────────────────────────────────────────────────
+def _is_valid_target_hold(x):
+    return str(x).strip().upper() == 'NA' or bool(re.match(r'^\d+(\.\d{1,4})?$', str(x)))
+
+@rule(['Target_Hold'], expected='number with up to 4 decimals, or NA', scalar=_is_valid_target_hold)
 def validate_target_hold(df):
-    def is_valid_target_hold(x):
-        return str(x).strip().upper() == 'NA' or re.match(r'^\d+(\.\d{1,4})?$', str(x))
-    df['Target_Hold'] = df['Target_Hold'].apply(is_valid_target_hold)
+    df['Target_Hold'] = df['Target_Hold'].apply(_is_valid_target_hold)
     return df
 
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 102: ASC326-20
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['ASC326_20'], kernel=('digits',))
 def validate_asc326_20(df):
     df['ASC326_20'] = df['ASC326_20'].apply(lambda x: str(x).isdigit())
     return df
@@ -867,57 +1046,71 @@ def validate_asc326_20(df):
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 103: Purchased Credit Deteriorated Noncredit Discount
 # ────────────────────────────────────────────────────────────────────────────────
+def _is_blank_or_digits(x):
+    return x == '' or str(x).isdigit()
+
+@rule(['PCD_Noncredit_Discount'], expected='blank or digits only', scalar=_is_blank_or_digits)
 def validate_pcd_noncredit_discount(df):
-    df['PCD_Noncredit_Discount'] = df['PCD_Noncredit_Discount'].apply(lambda x: x == '' or str(x).isdigit())
+    df['PCD_Noncredit_Discount'] = df['PCD_Noncredit_Discount'].apply(_is_blank_or_digits)
     return df
 
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 104: Current Maturity Date
 # ────────────────────────────────────────────────────────────────────────────────
+def _is_valid_current_maturity(x):
+    try:
+        datetime.strptime(x, "%Y-%m-%d")
+        return True
+    except:
+        return x == '9999-01-01'
+
+@rule(['Current_Maturity_Date'], expected='yyyy-mm-dd date or 9999-01-01', scalar=_is_valid_current_maturity)
 def validate_current_maturity_date(df):
-    def is_valid_date(x):
-        try:
-            datetime.strptime(x, "%Y-%m-%d")
-            return True
-        except:
-            return x == '9999-01-01'
-    df['Current_Maturity_Date'] = df['Current_Maturity_Date'].apply(is_valid_date)
+    df['Current_Maturity_Date'] = df['Current_Maturity_Date'].apply(_is_valid_current_maturity)
     return df
 
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 105: Committed Exposure Global Par Value
 # ────────────────────────────────────────────────────────────────────────────────
+def _is_valid_committed_exposure(x):
+    return str(x).upper() == 'NA' or re.match(r'^-?\d+$', str(x))
+
+@rule(['Committed_Exposure_Global_Par'], expected='integer or NA', scalar=_is_valid_committed_exposure)
 def validate_committed_exposure_global_par(df):
-    def is_valid_committed_exposure(x):
-        return str(x).upper() == 'NA' or re.match(r'^-?\d+$', str(x))
-    df['Committed_Exposure_Global_Par'] = df['Committed_Exposure_Global_Par'].apply(is_valid_committed_exposure)
+    df['Committed_Exposure_Global_Par'] = df['Committed_Exposure_Global_Par'].apply(_is_valid_committed_exposure)
     return df
 
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 106: Utilized Exposure Global Par Value
 # ────────────────────────────────────────────────────────────────────────────────
+def _is_valid_utilized_exposure(x):
+    return str(x).upper() == 'NA' or re.match(r'^-?\d+$', str(x))
+
+@rule(['Utilized_Exposure_Global_Par'], expected='integer or NA', scalar=_is_valid_utilized_exposure)
 def validate_utilized_exposure_global_par(df):
-    def is_valid_utilized_exposure(x):
-        return str(x).upper() == 'NA' or re.match(r'^-?\d+$', str(x))
-    df['Utilized_Exposure_Global_Par'] = df['Utilized_Exposure_Global_Par'].apply(is_valid_utilized_exposure)
+    df['Utilized_Exposure_Global_Par'] = df['Utilized_Exposure_Global_Par'].apply(_is_valid_utilized_exposure)
     return df
 
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 107: Committed Exposure Global Fair Value
 # ────────────────────────────────────────────────────────────────────────────────
+def _is_valid_committed_fair(x):
+    return str(x).upper() == 'NA' or re.match(r'^-?\d+$', str(x))
+
+@rule(['Committed_Exposure_Global_Fair'], expected='integer or NA', scalar=_is_valid_committed_fair)
 def validate_committed_exposure_global_fair(df):
-    def is_valid_committed_fair(x):
-        return str(x).upper() == 'NA' or re.match(r'^-?\d+$', str(x))
-    df['Committed_Exposure_Global_Fair'] = df['Committed_Exposure_Global_Fair'].apply(is_valid_committed_fair)
+    df['Committed_Exposure_Global_Fair'] = df['Committed_Exposure_Global_Fair'].apply(_is_valid_committed_fair)
     return df
 
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 108: Utilized Exposure Global Fair Value
 # ────────────────────────────────────────────────────────────────────────────────
+def _is_valid_utilized_fair(x):
+    return str(x).upper() == 'NA' or re.match(r'^-?\d+$', str(x))
+
+@rule(['Utilized_Exposure_Global_Fair'], expected='integer or NA', scalar=_is_valid_utilized_fair)
 def validate_utilized_exposure_global_fair(df):
-    def is_valid_utilized_fair(x):
-        return str(x).upper() == 'NA' or re.match(r'^-?\d+$', str(x))
-    df['Utilized_Exposure_Global_Fair'] = df['Utilized_Exposure_Global_Fair'].apply(is_valid_utilized_fair)
+    df['Utilized_Exposure_Global_Fair'] = df['Utilized_Exposure_Global_Fair'].apply(_is_valid_utilized_fair)
     return df
 
 # ────────────────────────────────────────────────────────────────────────────────
@@ -926,15 +1119,24 @@ def validate_utilized_exposure_global_fair(df):
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 111: Obligor LEI
 # ────────────────────────────────────────────────────────────────────────────────
+def _is_lei_or_na(x):
+    return str(x).upper() == 'NA' or is_valid_lei(x)
+
+def _lei_or_na_mask(values):
+    return lei_mask(values) | values.astype(str).str.upper().eq('NA').to_numpy()
+
+# memoize=False: frames go through the vectorized ISO 17442 check in the rule body
+@rule(['Obligor_LEI'], expected='LEI with valid ISO 17442 check digits, or NA', scalar=_is_lei_or_na, memoize=False)
 def validate_obligor_lei(df):
-    df['Obligor_LEI'] = df['Obligor_LEI'].apply(lambda x: re.match(r'^[A-Z0-9]{20}$', str(x)) or str(x).upper() == 'NA')
+    df['Obligor_LEI'] = _lei_or_na_mask(df['Obligor_LEI'])
     return df
 
 # ────────────────────────────────────────────────────────────────────────────────
 # Field 112: Primary Source of Repayment LEI
 # ────────────────────────────────────────────────────────────────────────────────
+@rule(['PSR_LEI'], expected='LEI with valid ISO 17442 check digits, or NA', scalar=_is_lei_or_na, memoize=False)
 def validate_psr_lei(df):
-    df['PSR_LEI'] = df['PSR_LEI'].apply(lambda x: re.match(r'^[A-Z0-9]{20}$', str(x)) or str(x).upper() == 'NA')
+    df['PSR_LEI'] = _lei_or_na_mask(df['PSR_LEI'])
     return df
 
 
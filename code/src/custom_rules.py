@@ -2,29 +2,60 @@
 """
 Reusable validation rule functions for custom profiling.
 Add or remove rules based on the dataset for the hackathon.
+
+Extra rule packs are picked up from the "gaidp.rule_packs" entry point group and
+from the RULE_PACKS_DIR directory. A pack is a module exposing RULES (a list of
+@rule-decorated functions) and a literal REQUIRED_COLUMNS list; packs are only
+imported when every required column is present in the data being validated.
 """
-import re
+import ast
+import importlib.util
+import os
 from datetime import datetime
+from importlib.metadata import entry_points
 import pandas as pd
+from rule_engine import rule, apply_rules
+from corporate_loan_rules import DATE_FORMAT, parse_date
+from reference_data import CURRENCY_CODES
+
+RULE_PACK_ENTRY_POINT_GROUP = "gaidp.rule_packs"
+RULE_PACKS_DIR = os.getenv("RULE_PACKS_DIR", os.path.join(os.path.dirname(__file__), "rule_packs"))
 
+@rule(["Transaction_Amount", "Reported_Amount"], output="Valid_Transaction",
+      expected="Reported_Amount within 1% of Transaction_Amount",
+      scalar=lambda amount, reported: abs(amount - reported) <= amount * 0.01)
 def validate_transaction_amount(df):
     df["Valid_Transaction"] = (df["Transaction_Amount"] - df["Reported_Amount"]).abs() <= (df["Transaction_Amount"] * 0.01)
     return df
 
+@rule(["Currency"], output="Valid_Currency", expected="ISO 4217 currency code", kernel=("isin", CURRENCY_CODES))
 def validate_currency_format(df):
-    df["Valid_Currency"] = df["Currency"].astype(str).apply(lambda x: bool(re.match(r"^[A-Z]{3}$", x)))
+    df["Valid_Currency"] = df["Currency"].astype(str).isin(CURRENCY_CODES)
     return df
 
+def _is_past_transaction_date(x):
+    d = parse_date(x)
+    return d is not None and d <= pd.Timestamp(datetime.today().date())
+
+@rule(["Transaction_Date"], output="Valid_Transaction_Date", tier="business", memoize=False,
+      expected="a yyyy-mm-dd date not in the future",
+      scalar=_is_past_transaction_date)
 def validate_transaction_date(df):
     today = datetime.today().strftime('%Y-%m-%d')
-    df["Valid_Transaction_Date"] = pd.to_datetime(df["Transaction_Date"], errors='coerce') <= pd.to_datetime(today)
+    dates = pd.to_datetime(df["Transaction_Date"], format=DATE_FORMAT, errors='coerce')
+    df["Valid_Transaction_Date"] = dates <= pd.to_datetime(today)
     return df
 
-def apply_custom_rules(df):
-    # Example: apply one or more validations from corporate_loan_rules.py
-    df = ""
+def custom_rule_list(columns):
+    # Built-in custom rules, GPT-generated rules, then any rule packs that fit the data
+    rules = CUSTOM_RULES + GENERATED_RULES
+    for pack in discover_rule_packs():
+        if pack.applies_to(columns):
+            rules = rules + pack.load()
+    return rules
 
-    return df
+def apply_custom_rules(df):
+    return apply_rules(df, custom_rule_list(df.columns))
 
 # Register the rules to apply them dynamically
 CUSTOM_RULES = [
@@ -32,3 +63,66 @@ CUSTOM_RULES = [
     validate_currency_format,
     validate_transaction_date,
 ]
+
+# Rules compiled from natural-language prompts (see rule_generation.py)
+GENERATED_RULES = []
+
+def register_generated_rule(rule):
+    # Replace an earlier rule with the same name instead of running both
+    GENERATED_RULES[:] = [r for r in GENERATED_RULES if r.__name__ != rule.__name__]
+    GENERATED_RULES.append(rule)
+    return rule
+
+
+class RulePack:
+    """A discovered rule pack; the module is imported on the first load()."""
+
+    def __init__(self, name, spec):
+        self.name = name
+        self.spec = spec
+        self.required_columns = _read_required_columns(spec.origin)
+        self._rules = None
+
+    def applies_to(self, columns):
+        return set(self.required_columns).issubset(columns)
+
+    def load(self):
+        if self._rules is None:
+            module = importlib.util.module_from_spec(self.spec)
+            self.spec.loader.exec_module(module)
+            self._rules = list(getattr(module, "RULES", []))
+        return self._rules
+
+
+def _read_required_columns(path):
+    # Parse REQUIRED_COLUMNS from the source so deciding whether to load is import-free
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(t, "id", None) == "REQUIRED_COLUMNS" for t in node.targets):
+            return tuple(ast.literal_eval(node.value))
+    return ()
+
+
+_RULE_PACKS = None
+
+def discover_rule_packs(refresh=False):
+    global _RULE_PACKS
+    if _RULE_PACKS is not None and not refresh:
+        return _RULE_PACKS
+
+    packs = []
+    for ep in entry_points(group=RULE_PACK_ENTRY_POINT_GROUP):
+        spec = importlib.util.find_spec(ep.module)
+        if spec and spec.origin:
+            packs.append(RulePack(ep.name, spec))
+
+    if os.path.isdir(RULE_PACKS_DIR):
+        for filename in sorted(os.listdir(RULE_PACKS_DIR)):
+            if filename.endswith(".py") and not filename.startswith("_"):
+                name = filename[:-3]
+                path = os.path.join(RULE_PACKS_DIR, filename)
+                packs.append(RulePack(name, importlib.util.spec_from_file_location(f"rule_packs.{name}", path)))
+
+    _RULE_PACKS = packs
+    return packs
@@ -0,0 +1,129 @@
+# excel_report.py
+"""
+Validated-data Excel export with the failing cells highlighted.
+The workbook is written with XlsxWriter in constant_memory mode: each row is
+flushed to a temporary file as soon as the next one starts, so memory stays
+flat however many rows are written, and rows can be fed chunk by chunk from a
+streaming run. Data rows go to "Data", continuing on "Data (2)", ... when a
+sheet reaches Excel's row limit. The "Summary" sheet lists failures per rule
+and per MDRM code for everything written.
+
+Cells are highlighted from the result matrix: a failed rule marks each of its
+input columns in that row, and a Failed_Checks column counts the failed rules.
+"""
+import numpy as np
+import pandas as pd
+
+from results_view import failures_by_mdrm
+
+# Excel's limit is 1,048,576 rows per sheet, one of which is the header
+ROWS_PER_SHEET = 1_048_575
+FAILED_COLUMN = "Failed_Checks"
+
+
+class ExcelReport:
+    """
+    Streams (raw, results) chunks into an .xlsx file (a path or binary file
+    object). Use as a context manager, or call close() to add the summary.
+    """
+
+    def __init__(self, target, rules, rows_per_sheet=ROWS_PER_SHEET):
+        try:
+            import xlsxwriter
+        except ImportError as e:
+            raise ImportError("The Excel report needs XlsxWriter (pip install XlsxWriter)") from e
+
+        # Strings are written as text: no formulas, numbers or links inferred from them
+        self.workbook = xlsxwriter.Workbook(target, {"constant_memory": True, "strings_to_formulas": False,
+                                                    "strings_to_urls": False, "strings_to_numbers": False})
+        self.rules = rules
+        self.rows_per_sheet = rows_per_sheet
+        self.header_format = self.workbook.add_format({"bold": True, "bg_color": "#D9D9D9"})
+        self.failed_format = self.workbook.add_format({"bg_color": "#FFC7CE", "font_color": "#9C0006"})
+        # Created first so it is the first tab, filled in on close()
+        self.summary_sheet = self.workbook.add_worksheet("Summary")
+        self.sheet, self.sheets, self.row = None, 0, 0
+        self.columns, self.failures, self.rows = None, {}, 0
+
+    def _new_sheet(self):
+        self.sheets += 1
+        self.sheet = self.workbook.add_worksheet("Data" if self.sheets == 1 else f"Data ({self.sheets})")
+        self.sheet.write_row(0, 0, self.columns, self.header_format)
+        self.sheet.freeze_panes(1, 0)
+        self.row = 1
+
+    def write(self, raw, results, extra=None):
+        """Append rows: raw values, `extra` columns (same index) and the failure count."""
+        if self.columns is None:
+            self.columns = list(raw.columns) + (list(extra.columns) if extra is not None else []) + [FAILED_COLUMN]
+            self.positions = {c: i for i, c in enumerate(raw.columns)}
+        failed = ~results.to_numpy(dtype=bool)
+        # Which raw columns each failed output marks
+        marks = np.zeros((results.shape[1], raw.shape[1]), dtype=bool)
+        inputs = {r.output: r.columns for r in self.rules}
+        for i, output in enumerate(results.columns):
+            for column in inputs.get(output, (output,)):
+                if column in self.positions:
+                    marks[i, self.positions[column]] = True
+        highlighted = (failed.astype(np.uint8) @ marks.astype(np.uint8)) > 0
+        for output, n in zip(results.columns, failed.sum(axis=0)):
+            self.failures[output] = self.failures.get(output, 0) + int(n)
+        self.rows += len(raw)
+
+        frame = raw if extra is None else pd.concat([raw, extra], axis=1)
+        values = frame.astype(object).where(frame.notna(), None).to_numpy()
+        counts = failed.sum(axis=1)
+        for i, row_values in enumerate(values):
+            if self.sheet is None or self.row > self.rows_per_sheet:
+                self._new_sheet()
+            self.sheet.write_row(self.row, 0, row_values)
+            self.sheet.write_number(self.row, len(row_values), counts[i])
+            # Rewritten while the row is still the current one, which constant_memory allows
+            for column in np.flatnonzero(highlighted[i]):
+                self.sheet.write(self.row, column, row_values[column], self.failed_format)
+            self.row += 1
+
+    def summary(self):
+        """Failures per rule, worst first, for everything written so far."""
+        rules = [r for r in self.rules if r.output in self.failures]
+        rules = list({r.output: r for r in rules}.values())
+        summary = pd.DataFrame({
+            "Rule": [r.__name__ for r in rules],
+            "Field": [r.output for r in rules],
+            "MDRM": [r.mdrm or "" for r in rules],
+            "Severity": [r.severity for r in rules],
+            "Failures": [self.failures[r.output] for r in rules],
+        })
+        summary["Failure_Rate"] = summary["Failures"] / max(self.rows, 1)
+        return summary.sort_values("Failures", ascending=False, kind="stable").reset_index(drop=True)
+
+    def _write_table(self, row, title, table):
+        self.summary_sheet.write(row, 0, title, self.header_format)
+        self.summary_sheet.write_row(row + 1, 0, list(table.columns), self.header_format)
+        for i, values in enumerate(table.itertuples(index=False), row + 2):
+            self.summary_sheet.write_row(i, 0, values)
+        return row + len(table) + 3
+
+    def close(self):
+        if self.sheet is None:
+            self.workbook.add_worksheet("Data")
+        summary = self.summary()
+        row = self._write_table(0, f"{self.rows:,} rows, {int((summary['Failures'] > 0).sum())} rules failing",
+                                summary)
+        self._write_table(row, "Failures per MDRM code", failures_by_mdrm(summary))
+        self.workbook.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_report(target, raw, results, rules, extra=None, chunk_size=100_000, rows_per_sheet=ROWS_PER_SHEET):
+    """Write a whole validated frame as an Excel report, converting it chunk by chunk."""
+    with ExcelReport(target, rules, rows_per_sheet) as report:
+        for start in range(0, len(raw), chunk_size):
+            stop = start + chunk_size
+            report.write(raw.iloc[start:stop], results.iloc[start:stop],
+                         None if extra is None else extra.iloc[start:stop])
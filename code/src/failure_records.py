@@ -0,0 +1,79 @@
+# failure_records.py
+"""
+Long-format table of validation failures, one row per failed check:
+    Row, Field, MDRM, Rule, Severity, Observed, Expected
+Every column except Row is categorical (dictionary-encoded), so the table stays
+small even for millions of failures, and group-bys, filters and joins on field,
+MDRM code or rule work on integer codes instead of rescanning the wide result
+columns. It is also the context handed to GPT for remediation.
+"""
+import numpy as np
+import pandas as pd
+
+from results_view import result_matrix
+from rule_engine import expected_constraint
+
+FAILURE_COLUMNS = ["Row", "Field", "MDRM", "Rule", "Severity", "Observed", "Expected"]
+
+
+def _encoded(per_column, codes):
+    # Factorize the per-output values once, then index by each failure's output code
+    value_codes, uniques = pd.factorize(np.asarray(per_column, dtype=object))
+    return pd.Categorical.from_codes(value_codes[codes], categories=uniques)
+
+
+def failure_table(raw, df, rules, skipped=None):
+    """
+    Failures of `rules` in the validated frame `df`, with observed values taken
+    from the unvalidated `raw` frame (same index). Cells in `skipped` (see
+    results_view.skipped_matrix) are left out.
+    """
+    results = result_matrix(df, rules)
+    failed = ~results.to_numpy()
+    if skipped is not None:
+        failed &= ~skipped.to_numpy()
+    rows, codes = np.nonzero(failed)
+
+    meta = {r.output: r for r in rules}
+    outputs = [meta[col] for col in results.columns]
+    observed = np.empty(len(rows), dtype=object)
+    for code, rule_func in enumerate(outputs):
+        hits = codes == code
+        source = rule_func.columns[0]
+        if hits.any() and source in raw.columns:
+            observed[hits] = raw[source].to_numpy()[rows[hits]]
+    observed = pd.Series(observed).astype(str).where(pd.notna(observed), None)
+
+    return pd.DataFrame({
+        "Row": df.index.to_numpy()[rows],
+        "Field": pd.Categorical.from_codes(codes, categories=results.columns),
+        "MDRM": _encoded([r.mdrm or "" for r in outputs], codes),
+        "Rule": _encoded([r.__name__ for r in outputs], codes),
+        "Severity": _encoded([r.severity for r in outputs], codes),
+        "Observed": pd.Categorical(observed),
+        "Expected": _encoded([expected_constraint(r) for r in outputs], codes),
+    }, columns=FAILURE_COLUMNS)
+
+
+def failure_counts(table, by="Field"):
+    """Number of failures per value of `by` (e.g. Field, MDRM, Rule), largest first."""
+    counts = table[by].value_counts(sort=True)
+    return counts[counts > 0].rename_axis(by).reset_index(name="Failures")
+
+
+def _plain_records(table):
+    return table.astype(object).where(table.notna(), None).to_dict("records")
+
+
+def row_failures(table, row):
+    """The failures of one row as plain dicts (e.g. for an LLM prompt); missing values are None."""
+    return _plain_records(table[table["Row"] == row].drop(columns="Row"))
+
+
+def failures_by_row(table):
+    """{row: [failure dicts]} for every row with at least one failure."""
+    records = _plain_records(table)
+    grouped = {}
+    for record in records:
+        grouped.setdefault(record.pop("Row"), []).append(record)
+    return grouped
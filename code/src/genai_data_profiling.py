@@ -1,52 +1,329 @@
 # genai_data_profiling_streamLiut_integrated_Langchain_GPT.py
 """
 Streamlit UI integrated with LangChain + GPT for Data Profiling
+Streamlit and the LLM client are imported on first use, so importing this module
+(e.g. for run_pipeline in tests or batch jobs) stays cheap.
 """
-import streamlit as st
-import pandas as pd
 import os
+import pandas as pd
 from corporate_loan_rules import CORPORATE_LOAN_RULES
-from custom_rules import apply_custom_rules
-from langchain_community.chat_models import ChatOpenAI
-from langchain_core.prompts import PromptTemplate
-from dotenv import load_dotenv
+from custom_rules import apply_custom_rules, custom_rule_list, GENERATED_RULES
+from rule_engine import apply_rules, SKIPPED_COLUMN
+from risk_scoring import assign_risk_score
+from anomaly_detection import score_anomalies, ANOMALY_COLUMNS, ANOMALY_GROUP_COLUMN
+from metrics import METRICS_PORT, count_rule_results, serve, stage
 
-# Load environment variables
-load_dotenv()
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+# Plain, gzip- and zstd-compressed CSVs and zip bundles of CSVs (see ingestion.open_source)
+UPLOAD_TYPES = ["csv", "gz", "zst", "zip"]
 
-st.set_page_config(page_title="GenAI Data Profiler", layout="wide")
-st.title("📊 GenAI Data Profiler for Corporate Loans")
 
-uploaded_file = st.file_uploader("Upload your CSV file for profiling", type=["csv"])
+def run_pipeline(df, llm=None, short_circuit=False, progress=None):
+    """
+    Anomaly scoring, rules, risk scoring and (with an LLM) GPT remediation.
+    With short_circuit, each rule tier only runs on rows that passed the earlier
+    tiers, and rows skipped that way get no anomaly score or GPT remediation.
+    Each stage's time and rows, and each rule's failures, go to metrics.py;
+    progress, if given, is called with "rules" and then "remediation" as
+    those stages begin.
+    """
+    with stage("pipeline", len(df)):
+        return _run_stages(df, llm, short_circuit, progress or (lambda name: None))
 
-if uploaded_file:
-    df = pd.read_csv(uploaded_file)
-    st.write("### 📄 Preview of Uploaded Data", df.head())
 
-    # Apply corporate loan rules
-    for rule in CORPORATE_LOAN_RULES:
-        df = rule(df)
+def _run_stages(df, llm, short_circuit, progress):
+    progress("rules")
+    rules = CORPORATE_LOAN_RULES + custom_rule_list(df.columns)
+    # GPT gets each row's observed values, which the rules overwrite
+    raw = df.copy() if llm else None
+    rows = len(df)
 
-    # Apply domain-specific rules
-    df = apply_custom_rules(df)
+    if short_circuit:
+        # Keep the raw anomaly inputs; the rules overwrite them
+        anomaly_input = df[[c for c in ANOMALY_COLUMNS + [ANOMALY_GROUP_COLUMN] if c in df.columns]].copy()
+
+        # Corporate loan rules, then domain-specific rules, one tier at a time
+        with stage("rules", rows):
+            df = apply_rules(df, rules, short_circuit=True)
+        eligible = df[SKIPPED_COLUMN].isna()
+        with stage("anomaly", int(eligible.sum())):
+            df['Anomaly_Score'] = score_anomalies(anomaly_input[eligible])['Anomaly_Score']
+    else:
+        # Score unusual rows before the rules overwrite the raw values
+        with stage("anomaly", rows):
+            df = score_anomalies(df)
+
+        with stage("rules", rows):
+            # Apply corporate loan rules
+            df = apply_rules(df, CORPORATE_LOAN_RULES)
+
+            # Apply domain-specific rules
+            df = apply_custom_rules(df)
+        eligible = pd.Series(True, index=df.index)
+    count_rule_results(df, rules)
 
     # Calculate risk score per row
-    df['Risk_Level'] = df.apply(score_risk, axis=1)
+    with stage("risk", rows):
+        df = assign_risk_score(df)
 
     # Generate remediation suggestions using GPT
-    if OPENAI_API_KEY:
-        llm = ChatOpenAI(openai_api_key=OPENAI_API_KEY, temperature=0.2)
-        df['Remediation'] = df.apply(lambda row: suggest_remediation(row, llm), axis=1)
+    progress("remediation")
+    if llm:
+        from failure_records import failure_table, failures_by_row
+        from instructions_index import get_index
+        from prompt_builder import remediate
+
+        with stage("remediation", int(eligible.sum())):
+            failures = failures_by_row(failure_table(raw[eligible], df[eligible], rules))
+            # Only failed fields go to GPT, batched into as few requests as the token budget allows
+            advice, usage = remediate({index: failures.get(index, []) for index in df.index[eligible]}, llm,
+                                      get_index())
+        df['Remediation'] = None
+        if eligible.any():
+            df.loc[eligible, 'Remediation'] = df.index[eligible].map(advice)
+        df.attrs["llm_usage"] = usage.as_dict()
     else:
         df['Remediation'] = "❌ OPENAI_API_KEY not set"
+    if not eligible.all():
+        df.loc[~eligible, 'Remediation'] = "⏭ " + df.loc[~eligible, SKIPPED_COLUMN] + " checks skipped; fix the earlier failures first"
+    return df
+
+
+def validate_submission(df, llm=None, short_circuit=False, auto_fix=True):
+    """
+    Auto-fix (optionally) and run the pipeline on a submission. Returns a dict
+    with the fixed input ("raw"), the validated frame ("df"), the fixes made
+    and a "cache" for anything the UI derives from them.
+    """
+    fixes = None
+    if auto_fix:
+        from auto_fix import apply_fixes
+
+        # Mechanical fixes first, so those rows reach neither the failure list nor GPT
+        df, fixes = apply_fixes(df.copy(), CORPORATE_LOAN_RULES + custom_rule_list(df.columns))
+    return {"raw": df, "df": run_pipeline(df.copy(), llm, short_circuit=short_circuit), "fixes": fixes, "cache": {}}
+
+
+def session_cached(st, name, key, build):
+    """
+    build() once per key, kept in st.session_state[name]. Every widget change
+    reruns main(), so this keeps paging and downloads from redoing the work.
+    """
+    entry = st.session_state.get(name)
+    if entry is None or entry[0] != key:
+        entry = st.session_state[name] = (key, build())
+    return entry[1]
+
+
+def cached(cache, name, build):
+    if name not in cache:
+        cache[name] = build()
+    return cache[name]
+
+
+def show_results(st, raw, df, cache=None):
+    from results_view import (result_matrix, skipped_matrix, failure_summary, failures_by_mdrm,
+                              failures_by_risk, failures_by_sector, failing_rows, page_count, failure_page)
+
+    from failure_records import failure_table
+
+    cache = {} if cache is None else cache
+    # The rules run_pipeline applied, including any rule packs that matched the upload
+    rules = CORPORATE_LOAN_RULES + custom_rule_list(raw.columns)
+    results = cached(cache, "results", lambda: result_matrix(df, rules))
+    skipped = cached(cache, "skipped", lambda: skipped_matrix(df, results))
+    summary = cached(cache, "summary", lambda: failure_summary(results, rules, skipped))
 
-    # Display results
     st.write("### ✅ Validation Results")
-    st.dataframe(df)
+    by_rule, by_mdrm, by_risk = st.columns(3)
+    by_rule.write("Failures per rule")
+    by_rule.dataframe(summary[summary["Failures"] > 0], hide_index=True)
+    by_mdrm.write("Failures per MDRM code")
+    by_mdrm.dataframe(failures_by_mdrm(summary), hide_index=True)
+    by_risk.write("Rows per risk level")
+    by_risk.dataframe(failures_by_risk(results, df["Risk_Score"]), hide_index=True)
+    if "Industry_Code" in raw.columns:
+        st.write("Rows per NAICS sector")
+        st.dataframe(failures_by_sector(raw, results), hide_index=True)
+
+    fields = st.multiselect("Show rows failing", list(summary.loc[summary["Failures"] > 0, "Field"]))
+    positions = failing_rows(results, fields)
+    page_size = st.selectbox("Rows per page", [25, 50, 100], index=1)
+    page = st.number_input("Page", min_value=1, max_value=page_count(len(positions), page_size), value=1)
+    st.caption(f"{len(positions):,} failing rows of {len(df):,}")
+    if SKIPPED_COLUMN in df.columns:
+        st.caption(f"{df[SKIPPED_COLUMN].notna().sum():,} rows skipped later rule tiers after earlier failures")
+    extra = [c for c in ["Risk_Score", "Remediation", SKIPPED_COLUMN] if c in df.columns]
+    st.dataframe(failure_page(raw, results, positions, page, page_size, extra=df[extra], skipped=skipped))
+
+    failures = cached(cache, "failures_csv",
+                      lambda: failure_table(raw, df, rules, skipped).to_csv(index=False).encode('utf-8'))
+    st.download_button("📥 Download Failure Records", failures, "failure_records.csv", "text/csv")
+
+    if st.button("📊 Build Excel report with failing cells highlighted"):
+        import tempfile
+        from excel_report import write_report
+
+        # Streamed to a temporary file, so only the finished .xlsx is ever held in memory
+        with tempfile.NamedTemporaryFile(suffix=".xlsx", delete=False) as f:
+            path = f.name
+        with st.spinner("Writing Excel report..."):
+            write_report(path, raw, results, rules, extra=df[extra])
+        with open(path, "rb") as f:
+            st.download_button("📥 Download Excel Report", f.read(), "validated_report.xlsx",
+                               "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+        os.remove(path)
+
+
+def show_preview(st, uploaded_file):
+    """Estimated failure rates per rule from a stratified sample of the upload."""
+    from preview import preview
+
+    estimates, info = preview(uploaded_file)
+    st.write("### ⚡ Preview: estimated failure rates")
+    st.caption(f"{info['sample_rows']:,} sampled rows of ~{info['estimated_rows']:,} across {info['strata']} "
+               f"strata, {info['seconds']:.1f}s; 95% confidence intervals")
+    st.dataframe(estimates[estimates["Sample_Failures"] > 0], hide_index=True)
+
+
+def show_jobs(st, queue, submitter):
+    st.write("### ⏳ Background Jobs")
+    if st.button("Refresh"):
+        st.rerun()
+    for job in queue.list_jobs(submitter):
+        eta = f", ~{job['eta_seconds']:.0f}s left" if job["eta_seconds"] else ""
+        total = job["rows_total"] or 0
+        st.write(f"**{job['id']}** — {os.path.basename(job['input_path'])}: {job['stage']} "
+                 f"({job['rows_processed']:,}/{total:,} rows{eta})")
+        if total:
+            st.progress(min(job["rows_processed"] / total, 1.0))
+        if job["status"] == "done":
+            with open(job["output_path"], "rb") as f:
+                st.download_button("📥 Download", f, f"{job['id']}_validated.csv", "text/csv", key=job["id"])
+        elif job["status"] == "failed":
+            st.error(job["error"])
+
+
+def show_batch(st, uploaded_files):
+    """Validate several uploads in parallel and show the consolidated summary."""
+    import tempfile
+    from batch_validation import validate_files
+
+    if not uploaded_files:
+        st.info("👈 Upload one or more CSV files to validate them together.")
+        return
+    if not st.button(f"Validate {len(uploaded_files)} files"):
+        return
+
+    workdir = tempfile.mkdtemp(prefix="batch_")
+    paths = []
+    for i, uploaded in enumerate(uploaded_files):
+        # Uploads sharing a name each get a folder of their own
+        path = os.path.join(workdir, f"upload_{i + 1}", os.path.basename(uploaded.name))
+        os.makedirs(os.path.dirname(path))
+        with open(path, "wb") as f:
+            f.write(uploaded.getvalue())
+        paths.append(path)
+    with st.spinner("Validating files..."):
+        summary = validate_files(paths, os.path.join(workdir, "output"))
+
+    def shown(frame, column):
+        # Paths relative to the temporary folder, e.g. upload_2/loans.csv
+        return frame.assign(**{column: frame[column].str.replace(workdir + os.sep, "", regex=False)})
+
+    st.write("### 📚 Files", shown(summary["files"], "File").drop(columns="Output"))
+    st.write("### ❌ Failures per Field (all files)", summary["failures"])
+    if len(summary["duplicates"]):
+        st.write("### 🔁 Loan keys in more than one file", shown(summary["duplicates"], "Files"))
+    with st.expander("⚙️ Chunk size and worker decisions"):
+        st.dataframe(summary["decisions"], hide_index=True)
+    for row in summary["files"].itertuples():
+        if os.path.exists(row.Output):
+            with open(row.Output, "rb") as f:
+                st.download_button(f"📥 {os.path.relpath(row.File, workdir)}", f.read(), os.path.basename(row.Output),
+                                   "text/csv")
+
+
+def main():
+    import streamlit as st
+    from llm_client import get_llm
+    from rule_generation import generate_rule
+    from ingestion import read_submission
+
+    st.set_page_config(page_title="GenAI Data Profiler", layout="wide")
+    if METRICS_PORT:
+        # One metrics endpoint per server process, whatever the number of sessions
+        st.cache_resource(serve)(METRICS_PORT)
+    st.title("📊 GenAI Data Profiler for Corporate Loans")
+
+    batch = st.sidebar.checkbox("📚 Validate several files at once")
+    if batch:
+        show_batch(st, st.file_uploader("Upload the submission files", type=UPLOAD_TYPES, accept_multiple_files=True))
+        return
+
+    uploaded_file = st.file_uploader("Upload your CSV file for profiling", type=UPLOAD_TYPES)
+    background = st.sidebar.checkbox("⏳ Run validation as a background job")
+
+    if background:
+        from job_queue import JobQueue
+
+        queue = st.cache_resource(JobQueue)()
+        submitter = st.sidebar.text_input("Your name", "anonymous")
+        if uploaded_file and st.button("Submit validation job"):
+            queue.submit(uploaded_file.getvalue(), uploaded_file.name, submitter)
+        show_jobs(st, queue, submitter)
+    elif uploaded_file:
+        quick = st.sidebar.checkbox("⚡ Preview a sample before the full run", value=True)
+        if quick and st.session_state.get("full_run") != uploaded_file.name:
+            show_preview(st, uploaded_file)
+            if st.button("▶ Run full validation"):
+                st.session_state["full_run"] = uploaded_file.name
+                st.rerun()
+            return
+
+        upload = (uploaded_file.name, uploaded_file.size)
+        df = session_cached(st, "submission", upload, lambda: read_submission(uploaded_file))
+        st.write("### 📄 Preview of Uploaded Data", df.head())
+
+        llm = get_llm()
+
+        # Generate a new rule from a natural-language prompt
+        rule_request = st.sidebar.text_area("✍️ Describe a new validation rule")
+        if rule_request and llm:
+            try:
+                rule = generate_rule(rule_request, llm, list(df.columns))
+                st.sidebar.json(rule.spec)
+            except ValueError as e:
+                st.sidebar.error(f"Could not build rule: {e}")
+
+        short_circuit = st.sidebar.checkbox("⏭ Skip later rule tiers on rows that fail earlier ones")
+        auto_fix = st.sidebar.checkbox("🔧 Auto-fix mechanical errors before validating", value=True)
+
+        # Rerun only when the upload, the options or the generated rules change
+        options = (short_circuit, auto_fix, tuple(rule.__name__ for rule in GENERATED_RULES))
+        validated = session_cached(st, "validated", upload + options,
+                                   lambda: validate_submission(df, llm, short_circuit, auto_fix))
+        raw, df, fixes, cache = validated["raw"], validated["df"], validated["fixes"], validated["cache"]
+        if fixes is not None and len(fixes):
+            st.write(f"### 🔧 Auto-fixed {len(fixes):,} cells",
+                     fixes.groupby(["Field", "Fix"]).size().rename("Cells").reset_index())
+            st.download_button("📥 Download Auto-fix Diff",
+                               cached(cache, "fixes_csv", lambda: fixes.to_csv(index=False).encode('utf-8')),
+                               "auto_fixes.csv", "text/csv")
+
+        if "llm_usage" in df.attrs:
+            usage = df.attrs["llm_usage"]
+            st.sidebar.caption(f"🤖 GPT: {usage['requests']} requests, {usage['prompt_tokens'] + usage['completion_tokens']:,} "
+                               f"tokens (~${usage['estimated_cost_usd']:.4f})")
+
+        # Display results: aggregates plus one page of failing rows at a time
+        show_results(st, raw, df, cache)
+
+        # Download option
+        csv = cached(cache, "validated_csv", lambda: df.to_csv(index=False).encode('utf-8'))
+        st.download_button("📥 Download Validated CSV", csv, "validated_output.csv", "text/csv")
+    else:
+        st.info("👈 Please upload a CSV file to get started.")
+
 
-    # Download option
-    csv = df.to_csv(index=False).encode('utf-8')
-    st.download_button("📥 Download Validated CSV", csv, "validated_output.csv", "text/csv")
-else:
-    st.info("👈 Please upload a CSV file to get started.")
+if __name__ == "__main__":
+    main()
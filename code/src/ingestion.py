@@ -0,0 +1,309 @@
+# ingestion.py
+"""
+Reads loan submissions with dictionary-encoded string columns.
+Obligor names, cities, lines of business, currencies and exchanges repeat on
+many rows of a portfolio file. Held as pandas categoricals, each distinct
+string is stored once with an integer code per row, and the rule engine checks
+single-column rules once per distinct value instead of once per row.
+
+Submissions may be gzip (.csv.gz), zstd (.csv.zst) or zip compressed; the
+format is recognised from the first bytes, whatever the file name. Compressed
+data is never written to disk: a background thread inflates it block by block
+into a bounded queue that the CSV parser reads from, so decompression overlaps
+with parsing and validation. A zip bundle holding several CSVs is read as
+their concatenation, its members parsed in parallel; expand_sources() lists
+them as separate "bundle.zip::member.csv" sources for batch runs.
+
+write_store() parses a submission once into a memory-mapped column store
+(see column_store.py) that several workers can then read row ranges of.
+"""
+import contextlib
+import functools
+import gzip
+import io
+import itertools
+import os
+import queue
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from metrics import ROWS, STAGE_SECONDS
+
+# Known repetitive text fields, always read as categoricals
+DICTIONARY_COLUMNS = [
+    "Obligor_Name",
+    "City",
+    "Country",
+    "Line_of_Business",
+    "Guarantor_Name",
+    "Entity_Name",
+    "Credit_Facility_Currency",
+    "Stock_Exchange",
+]
+# Other text columns are encoded when distinct values are at most this share of rows
+MAX_DISTINCT_RATIO = 0.5
+# Rows parsed at a time while a submission is written to a column store
+STORE_CHUNK = 100_000
+
+MAGIC_BYTES = {b"\x1f\x8b": "gzip", b"\x28\xb5\x2f\xfd": "zstd", b"PK\x03\x04": "zip"}
+# Separates an archive path from the member to read, as in "bundle.zip::east.csv"
+ARCHIVE_SEPARATOR = "::"
+# Decompressed blocks read ahead of the parser: at most PREFETCH_BLOCKS of PREFETCH_BLOCK bytes
+PREFETCH_BLOCK = 1024 * 1024
+PREFETCH_BLOCKS = 8
+
+
+class PrefetchReader(io.RawIOBase):
+    """
+    Reads a (decompressing) binary stream ahead on a background thread, so
+    the next blocks are inflated while the parser works on the current one.
+    zlib and zstd release the GIL while inflating, as does the C CSV parser.
+    """
+
+    def __init__(self, raw, block_size=PREFETCH_BLOCK, blocks=PREFETCH_BLOCKS):
+        self.raw, self.block_size = raw, block_size
+        self._blocks = queue.Queue(blocks)
+        self._block, self._offset, self._finished = b"", 0, False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._produce, daemon=True)
+        self._thread.start()
+
+    def _produce(self):
+        try:
+            while not self._stop.is_set():
+                block = self.raw.read(self.block_size)
+                self._put(block)
+                if not block:
+                    return
+        except Exception as e:
+            self._put(e)
+
+    def _put(self, item):
+        # Gives up once the reader is closed, e.g. after reading only the first rows
+        while not self._stop.is_set():
+            try:
+                self._blocks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while self._offset == len(self._block):
+            if self._finished:
+                return 0
+            item = self._blocks.get()
+            if isinstance(item, Exception):
+                self._finished = True
+                raise item
+            self._block, self._offset, self._finished = item, 0, not item
+        n = min(len(buffer), len(self._block) - self._offset)
+        buffer[:n] = memoryview(self._block)[self._offset:self._offset + n]
+        self._offset += n
+        return n
+
+    def close(self):
+        if not self.closed:
+            self._stop.set()
+            self._thread.join()
+            self.raw.close()
+        super().close()
+
+
+def _is_path(source):
+    return isinstance(source, (str, os.PathLike))
+
+
+def _split(source):
+    # (path or file object, zip member or None)
+    if isinstance(source, str) and ARCHIVE_SEPARATOR in source:
+        path, _, member = source.partition(ARCHIVE_SEPARATOR)
+        return path, member
+    return source, None
+
+
+def compression_of(source):
+    """"gzip", "zstd" or "zip" from the first bytes of a path or seekable file object, else None."""
+    path, _ = _split(source)
+    if _is_path(path):
+        with open(path, "rb") as f:
+            head = f.read(4)
+    elif getattr(path, "seekable", lambda: False)():
+        position = path.tell()
+        head = path.read(4)
+        path.seek(position)
+    else:
+        return None
+    return next((kind for magic, kind in MAGIC_BYTES.items() if head.startswith(magic)), None)
+
+
+def csv_members(archive):
+    """Names of the CSV files in an open zipfile.ZipFile."""
+    members = [info.filename for info in archive.infolist() if not info.is_dir()
+               and info.filename.lower().endswith(".csv") and not info.filename.startswith("__MACOSX/")]
+    if not members:
+        raise ValueError("The zip archive contains no CSV file")
+    return members
+
+
+def expand_sources(paths):
+    """
+    `paths` with every zip bundle of several CSVs replaced by one
+    "bundle.zip::member.csv" source per member. Unreadable paths are kept as
+    they are, to fail when they are validated.
+    """
+    sources = []
+    for path in paths:
+        try:
+            if compression_of(path) == "zip":
+                with zipfile.ZipFile(path) as archive:
+                    members = csv_members(archive)
+                if len(members) > 1:
+                    sources.extend(f"{path}{ARCHIVE_SEPARATOR}{member}" for member in members)
+                    continue
+        except (OSError, ValueError, zipfile.BadZipFile):
+            pass
+        sources.append(path)
+    return sources
+
+
+def source_size(source):
+    """Bytes on disk of a path, or compressed bytes of a "bundle.zip::member.csv" source."""
+    path, member = _split(source)
+    if member is None:
+        return os.path.getsize(path)
+    with zipfile.ZipFile(path) as archive:
+        return archive.getinfo(member).compress_size
+
+
+def _zstd_reader(f):
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError("Reading .zst files needs zstandard (pip install zstandard)") from e
+    return zstandard.ZstdDecompressor().stream_reader(f, read_across_frames=True, closefd=False)
+
+
+@contextlib.contextmanager
+def _open_member(source, kind, archive=None, member=None):
+    with contextlib.ExitStack() as stack:
+        if archive is not None:
+            raw = stack.enter_context(archive.open(member))
+        else:
+            # File objects belong to the caller and are left open
+            f = stack.enter_context(open(source, "rb")) if _is_path(source) else source
+            if kind is None:
+                yield f
+                return
+            raw = stack.enter_context(gzip.GzipFile(fileobj=f) if kind == "gzip" else _zstd_reader(f))
+        yield stack.enter_context(io.BufferedReader(PrefetchReader(raw), PREFETCH_BLOCK))
+
+
+@contextlib.contextmanager
+def open_source(source):
+    """
+    Open a CSV path, "bundle.zip::member.csv" source or binary file object.
+    Yields one opener per CSV it holds (several for a zip bundle); each opener
+    returns a context manager giving a binary stream of plain CSV.
+    """
+    path, member = _split(source)
+    kind = compression_of(path)
+    if kind != "zip":
+        yield [functools.partial(_open_member, path, kind)]
+        return
+    with zipfile.ZipFile(path) as archive:
+        members = [member] if member else csv_members(archive)
+        yield [functools.partial(_open_member, path, kind, archive, name) for name in members]
+
+
+def dictionary_encode(df, columns=None, max_distinct_ratio=MAX_DISTINCT_RATIO):
+    """
+    Convert repetitive text columns to categoricals. With `columns` unset,
+    every object column whose distinct/rows ratio is at most max_distinct_ratio
+    is converted; numeric columns are never touched.
+    """
+    if columns is None:
+        columns = df.select_dtypes(include="object").columns
+    for col in columns:
+        if col in df.columns and df[col].dtype == object:
+            if len(df) and df[col].nunique(dropna=False) <= max_distinct_ratio * len(df):
+                df[col] = df[col].astype("category")
+    return df
+
+
+def read_submission(source, dictionary_columns=DICTIONARY_COLUMNS, auto_encode=True, **read_csv_kwargs):
+    """
+    pd.read_csv with dictionary encoding. The known repetitive columns are parsed
+    straight into categoricals; with auto_encode, other repetitive text columns
+    are converted afterwards. With chunksize, yields encoded chunks.
+    `source` may be compressed (see open_source).
+    """
+    chunksize = read_csv_kwargs.pop("chunksize", None)
+    if chunksize:
+        return read_chunks(source, itertools.repeat(chunksize), dictionary_columns, auto_encode, **read_csv_kwargs)
+    dtype = {col: "category" for col in dictionary_columns}
+    dtype.update(read_csv_kwargs.pop("dtype", None) or {})
+
+    def read(opener):
+        with opener() as f:
+            return pd.read_csv(f, dtype=dtype, **read_csv_kwargs)
+
+    with open_source(source) as members:
+        if len(members) == 1:
+            data = read(members[0])
+        else:
+            with ThreadPoolExecutor(max_workers=min(len(members), os.cpu_count() or 1)) as pool:
+                parts = list(pool.map(read, members))
+            data = pd.concat(parts, ignore_index=True)
+            # Members with different categories concatenate as object columns
+            data = data.astype({col: "category" for col in dictionary_columns if col in data.columns})
+    return dictionary_encode(data) if auto_encode else data
+
+
+def read_chunks(source, sizes, dictionary_columns=DICTIONARY_COLUMNS, auto_encode=True, **read_csv_kwargs):
+    """
+    Like read_submission with chunksize, but the size of each chunk is the
+    next value of `sizes`, so it can change while the file is read (see
+    resource_governor.ResourceGovernor.chunk_sizes). The members of a zip
+    bundle are read one after the other, numbered on from one another.
+    """
+    dtype = {col: "category" for col in dictionary_columns}
+    dtype.update(read_csv_kwargs.pop("dtype", None) or {})
+    sizes = iter(sizes)
+    offset = 0
+    with open_source(source) as members:
+        for opener in members:
+            rows = 0
+            with opener() as f, pd.read_csv(f, dtype=dtype, iterator=True, **read_csv_kwargs) as reader:
+                for size in sizes:
+                    start = time.perf_counter()
+                    try:
+                        chunk = reader.get_chunk(size)
+                    except StopIteration:
+                        break
+                    if auto_encode:
+                        chunk = dictionary_encode(chunk)
+                    # Each member's parser counts from 0; rows (e.g. auto_fix's Row) stay unique across the bundle
+                    chunk.index += offset
+                    rows += len(chunk)
+                    STAGE_SECONDS.observe(time.perf_counter() - start, stage="read")
+                    ROWS.inc(len(chunk), stage="read")
+                    yield chunk
+            offset += rows
+
+
+def write_store(source, path, dictionary_columns=DICTIONARY_COLUMNS, chunk_size=STORE_CHUNK):
+    """
+    Parse `source` once into a column_store.ColumnStore at `path` and return
+    it, the repetitive text columns dictionary-encoded as by read_submission.
+    """
+    from column_store import ColumnStore
+
+    chunks = read_chunks(source, itertools.repeat(chunk_size), dictionary_columns, auto_encode=False)
+    return ColumnStore.write(path, chunks, dictionary_columns, MAX_DISTINCT_RATIO)
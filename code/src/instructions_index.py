@@ -0,0 +1,243 @@
+# instructions_index.py
+"""
+Local search index over the FR Y-14Q instructions PDF, for remediation prompts.
+The PDF is parsed once into one chunk per field row of the schedule field
+tables (schedule, field number, name, technical name, MDRM code and the
+description / allowable values text) and indexed for BM25 ranking. Chunks and
+term statistics are saved as JSON next to the PDF's SHA-256, so the (slow) PDF
+parse only runs again when the PDF changes.
+
+At remediation time field_context() looks a failed field up by MDRM code, then
+by name, then by BM25 over the field name, and returns just that field's
+instructions instead of the whole document.
+
+Parsing needs pypdf; a saved index loads without it.
+Prebuild with: python instructions_index.py
+"""
+import hashlib
+import json
+import math
+import os
+import re
+from collections import Counter
+
+PDF_PATH = os.path.join(os.path.dirname(__file__), "..", "assets", "FR_Y-14Q20240331_i.pdf")
+INDEX_PATH = os.getenv("INSTRUCTIONS_INDEX_PATH",
+                       os.path.join(os.path.dirname(__file__), ".instructions_index", "fr_y14q.json"))
+DEFAULT_SCHEDULE = "H.1"
+MAX_CONTEXT_CHARS = 1500
+# BM25 parameters
+K1 = 1.5
+B = 0.75
+
+_TABLE_HEADER = re.compile(r"Field\s*\nNo\.\s*\nField Name;\s*\n\(Technical Field\s*\nName\)\s*\n"
+                           r"MDRM\s+Description\s+Allowable Values\s*\n")
+_SCHEDULE = re.compile(r"^\s*([A-N]\.\d{1,2})\s*[-–—]\s*(.*Schedule)\s*$")
+_FIELD_ROW = re.compile(r"^\s*(\d{1,3})(?:\s+\S.*)?\s*$")
+_TECHNICAL_NAME = re.compile(r"\(([A-Z][A-Za-z0-9]+)\)")
+# Four-letter mnemonic plus a four-character item code containing a digit
+_MDRM = re.compile(r"\b([A-Z]{4}(?=[A-Z0-9]{0,3}\d)[A-Z0-9]{4})\b")
+_STOPWORDS = frozenset("a an and are as be by for if in is it of on or the this to with".split())
+
+_INDEX = None
+
+
+def tokenize(text):
+    # CamelCase technical names are split into words first
+    text = re.sub(r"(?<=[a-z])(?=[A-Z])", " ", text)
+    return [t for t in re.findall(r"[a-z0-9]+", text.lower()) if t not in _STOPWORDS]
+
+
+def pdf_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def extract_pages(path):
+    """Text of each PDF page."""
+    try:
+        from pypdf import PdfReader
+    except ImportError as e:
+        raise ImportError("Parsing the instructions PDF needs pypdf (pip install pypdf)") from e
+    return [page.extract_text() or "" for page in PdfReader(path).pages]
+
+
+def field_chunks(pages):
+    """
+    One dict per field row of the schedule field tables. A row starts at a
+    field number (at most 3 past the previous one, since retired fields may be
+    missing) followed by a parenthesised technical name; "DO NOT USE" rows
+    only end the previous field.
+    """
+    chunks, schedule, last = [], None, 0
+    for page_number, page in enumerate(pages, 1):
+        in_table = bool(_TABLE_HEADER.search(page))
+        kept = len(chunks[-1]["lines"]) if chunks else 0
+        lines = _TABLE_HEADER.sub("", page).split("\n")
+        for i, line in enumerate(lines):
+            heading = _SCHEDULE.match(line)
+            if heading:
+                schedule, last = heading.group(1), 0
+                continue
+            row = _FIELD_ROW.match(line)
+            if row and schedule and last < int(row.group(1)) <= last + 3:
+                head = [l.strip() for l in lines[i:i + 7]]
+                # Technical names wrap mid-word, so look for them with the lines glued together
+                technical = _TECHNICAL_NAME.search("".join(head))
+                retired = "DO NOT USE" in " ".join(head)[:40]
+                # A few rows have no technical name; take those only as the next field number with
+                # a mixed-case name, since enumerated codes inside a field ("23 OTHER") are upper case
+                named = int(row.group(1)) == last + 1 and re.match(r"\d+\s+[A-Z][a-z]", " ".join(head))
+                if technical or retired or named:
+                    last, in_table = int(row.group(1)), True
+                    chunks.append({
+                        "schedule": schedule,
+                        "field": last,
+                        "name": _field_name(head, row.group(1)),
+                        "technical_name": technical.group(1) if technical and not retired else None,
+                        "retired": retired,
+                        "page": page_number,
+                        "lines": [line],
+                    })
+                    continue
+            if chunks and last and chunks[-1]["schedule"] == schedule:
+                chunks[-1]["lines"].append(line)
+        if not in_table and chunks:
+            # Neither the table header nor a field row: the field table ended on the previous page
+            del chunks[-1]["lines"][kept:]
+            last = 0
+
+    fields = []
+    for chunk in chunks:
+        text = " ".join(" ".join(line.split()) for line in chunk.pop("lines")).strip()
+        if chunk.pop("retired"):
+            continue
+        mdrm = _MDRM.search(text[:400])
+        chunk["mdrm"] = mdrm.group(1) if mdrm else None
+        chunk["text"] = text
+        fields.append(chunk)
+    return fields
+
+
+class InstructionsIndex:
+    """BM25 index over field chunks, with direct lookup by MDRM code and field name."""
+
+    def __init__(self, chunks, pdf_sha256=None, term_counts=None, idf=None):
+        self.chunks = chunks
+        self.pdf_sha256 = pdf_sha256
+        if term_counts is None:
+            # Names and technical names count alongside the description text
+            term_counts = [tokenize(f"{c['name']} {c['technical_name'] or ''} {c['text']}") for c in chunks]
+        self.term_counts = [Counter(counts) for counts in term_counts]
+        self.lengths = [sum(counts.values()) for counts in self.term_counts]
+        self.average_length = sum(self.lengths) / len(self.lengths) if chunks else 0.0
+        if idf is None:
+            doc_freq = Counter(term for counts in self.term_counts for term in counts)
+            idf = {term: math.log(1 + (len(chunks) - df + 0.5) / (df + 0.5)) for term, df in doc_freq.items()}
+        self.idf = idf
+        self.by_mdrm = {c["mdrm"]: c for c in chunks if c["mdrm"]}
+        self.by_name = {}
+        for c in chunks:
+            for key in filter(None, (c["name"], c["technical_name"])):
+                self.by_name.setdefault((c["schedule"], _normalize(key)), c)
+
+    def search(self, query, k=3, schedule=None):
+        """The k best chunks for a free-text query, best first."""
+        terms = tokenize(query)
+        scored = []
+        for i, chunk in enumerate(self.chunks):
+            if schedule and chunk["schedule"] != schedule:
+                continue
+            counts, norm = self.term_counts[i], K1 * (1 - B + B * self.lengths[i] / self.average_length)
+            score = sum(self.idf[t] * counts[t] * (K1 + 1) / (counts[t] + norm) for t in terms if t in counts)
+            if score > 0:
+                scored.append((score, i))
+        return [self.chunks[i] for _, i in sorted(scored, key=lambda s: -s[0])[:k]]
+
+    def lookup(self, field=None, mdrm=None, schedule=DEFAULT_SCHEDULE):
+        """The chunk for a field: by MDRM code, then exact name, then BM25 over the name."""
+        if mdrm and mdrm in self.by_mdrm:
+            return self.by_mdrm[mdrm]
+        if not field:
+            return None
+        chunk = self.by_name.get((schedule, _normalize(field)))
+        if chunk is None:
+            hits = self.search(field.replace("_", " "), k=1, schedule=schedule)
+            chunk = hits[0] if hits else None
+        return chunk
+
+    def to_json(self):
+        return {"pdf_sha256": self.pdf_sha256, "chunks": self.chunks,
+                "term_counts": self.term_counts, "idf": self.idf}
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data["chunks"], data["pdf_sha256"], data["term_counts"], data["idf"])
+
+
+def _field_name(head, number):
+    # The name column is narrow: its lines come before the technical name or the first wide line
+    words = []
+    for i, line in enumerate(head):
+        if i == 0:
+            line = line[len(number):].strip()
+        elif len(line) > 25:
+            break
+        words.append(line.split("(")[0].strip())
+        if "(" in line:
+            break
+    return " ".join(w for w in words if w)
+
+
+def _normalize(name):
+    return re.sub(r"[^a-z0-9]", "", str(name).lower())
+
+
+def load_index(pdf_path=PDF_PATH, index_path=INDEX_PATH):
+    """The saved index if it was built from this PDF, otherwise a freshly built (and saved) one."""
+    digest = pdf_hash(pdf_path)
+    if os.path.exists(index_path):
+        with open(index_path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("pdf_sha256") == digest:
+            return InstructionsIndex.from_json(data)
+
+    index = InstructionsIndex(field_chunks(extract_pages(pdf_path)), digest)
+    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+    tmp_path = f"{index_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index.to_json(), f)
+    os.replace(tmp_path, index_path)
+    return index
+
+
+def get_index():
+    """Process-wide index, or None when the PDF is missing or can't be parsed here."""
+    global _INDEX
+    if _INDEX is None:
+        try:
+            _INDEX = load_index()
+        except (ImportError, OSError):
+            return None
+    return _INDEX
+
+
+def field_context(index, failures, max_chars=MAX_CONTEXT_CHARS):
+    """Instructions text for each distinct field in `failures` (failure records), one block per field."""
+    blocks, seen = [], set()
+    for failure in failures:
+        chunk = index.lookup(failure.get("Field"), failure.get("MDRM"))
+        if chunk is None or id(chunk) in seen:
+            continue
+        seen.add(id(chunk))
+        text = chunk["text"] if len(chunk["text"]) <= max_chars else chunk["text"][:max_chars].rsplit(" ", 1)[0] + " ..."
+        blocks.append(f"[{failure.get('Field')}] {chunk['schedule']} field {chunk['field']}: {text}")
+    return "\n".join(blocks)
+
+
+if __name__ == "__main__":
+    built = load_index()
+    print(f"{len(built.chunks)} field chunks indexed from {PDF_PATH}")
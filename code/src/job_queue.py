@@ -0,0 +1,216 @@
+# job_queue.py
+"""
+Local background job queue for long validation runs.
+Uploads are saved to disk and validated chunk by chunk in a worker pool, with
+job state and progress (stage, rows processed, ETA) kept in SQLite so results
+survive a closed browser tab or an app restart. The stage follows each chunk
+through read, rules, remediation and write. The file is read once: until it is
+finished, rows_total is estimated from the share of its bytes parsed so far.
+When several analysts submit at once, the next job always goes to the
+submitter with the fewest running jobs.
+"""
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+DEFAULT_JOBS_DIR = os.getenv("JOBS_DIR", os.path.join(os.path.dirname(__file__), ".jobs"))
+CHUNK_SIZE = 50_000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    submitter TEXT NOT NULL,
+    input_path TEXT NOT NULL,
+    output_path TEXT NOT NULL,
+    status TEXT NOT NULL,
+    stage TEXT,
+    rows_total INTEGER,
+    rows_processed INTEGER NOT NULL DEFAULT 0,
+    submitted_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    error TEXT
+)
+"""
+
+
+def _connect(db_path):
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _update(db_path, job_id, **fields):
+    with _connect(db_path) as conn:
+        assignments = ", ".join(f"{key} = ?" for key in fields)
+        conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+
+def run_job(db_path, job_id, chunk_size=CHUNK_SIZE):
+    """Validate one job's file chunk by chunk, appending results and progress as it goes."""
+    from genai_data_profiling import run_pipeline
+    from ingestion import read_submission
+
+    with _connect(db_path) as conn:
+        job = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    try:
+        _update(db_path, job_id, stage="read")
+        size = os.path.getsize(job["input_path"])
+        processed = 0
+        with open(job["input_path"], "rb") as f:
+            for i, chunk in enumerate(read_submission(f, chunksize=chunk_size)):
+                chunk = run_pipeline(chunk, progress=lambda name: _update(db_path, job_id, stage=name))
+                _update(db_path, job_id, stage="write")
+                chunk.to_csv(job["output_path"], mode="w" if i == 0 else "a", header=i == 0, index=False)
+                processed += len(chunk)
+                # The parser reads ahead, so this estimate runs a little low until the end
+                position = f.tell()
+                estimate = round(processed * size / position) if position else None
+                _update(db_path, job_id, stage="read", rows_processed=processed,
+                        rows_total=max(estimate or 0, processed))
+        _update(db_path, job_id, rows_total=processed, status="done", stage="finished", finished_at=time.time())
+    except Exception as e:
+        _update(db_path, job_id, status="failed", stage="failed", error=str(e), finished_at=time.time())
+
+
+class JobQueue:
+    def __init__(self, jobs_dir=DEFAULT_JOBS_DIR, max_workers=2, use_processes=True, poll_interval=0.5,
+                 start=True):
+        os.makedirs(jobs_dir, exist_ok=True)
+        self.jobs_dir = jobs_dir
+        self.db_path = os.path.join(jobs_dir, "jobs.sqlite")
+        self.max_workers = max_workers
+        self.poll_interval = poll_interval
+        with _connect(self.db_path) as conn:
+            conn.execute(SCHEMA)
+            # Jobs interrupted by a restart go back to the queue
+            conn.execute("UPDATE jobs SET status = 'queued', rows_processed = 0 WHERE status = 'running'")
+        self.use_processes = use_processes
+        self._executor = self._new_executor()
+        self._running = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, daemon=True)
+        if start:
+            self._dispatcher.start()
+
+    def submit(self, data, filename, submitter="anonymous"):
+        """Persist an uploaded file (bytes) and queue it; returns the job id."""
+        job_id = uuid.uuid4().hex[:12]
+        input_path = os.path.join(self.jobs_dir, f"{job_id}_{os.path.basename(filename)}")
+        with open(input_path, "wb") as f:
+            f.write(data)
+        output_path = os.path.join(self.jobs_dir, f"{job_id}_validated.csv")
+        with _connect(self.db_path) as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, submitter, input_path, output_path, status, stage, submitted_at) "
+                "VALUES (?, ?, ?, ?, 'queued', 'queued', ?)",
+                (job_id, submitter, input_path, output_path, time.time()),
+            )
+        self._wake.set()
+        return job_id
+
+    def next_job(self):
+        """Oldest queued job of the submitter with the fewest running jobs."""
+        with _connect(self.db_path) as conn:
+            row = conn.execute("""
+                SELECT q.id FROM jobs q
+                LEFT JOIN (SELECT submitter, COUNT(*) AS n FROM jobs WHERE status = 'running' GROUP BY submitter) r
+                    ON r.submitter = q.submitter
+                WHERE q.status = 'queued'
+                ORDER BY COALESCE(r.n, 0), q.submitted_at
+                LIMIT 1
+            """).fetchone()
+        return row["id"] if row else None
+
+    def _new_executor(self):
+        if self.use_processes:
+            # Workers are started from the dispatcher thread; forking a threaded process can deadlock
+            return ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+        return ThreadPoolExecutor(max_workers=self.max_workers)
+
+    def _dispatch_loop(self):
+        while not self._stopped:
+            self.dispatch()
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def dispatch(self):
+        """Reap finished jobs and start queued ones while workers are free."""
+        with self._lock:
+            broken = False
+            for job_id, future in list(self._running.items()):
+                if not future.done():
+                    continue
+                del self._running[job_id]
+                # run_job records its own errors, so this is a worker that died (e.g. killed for memory)
+                error = future.exception()
+                if error is not None:
+                    _update(self.db_path, job_id, status="failed", stage="failed", finished_at=time.time(),
+                            error=f"Worker process died: {error!r}")
+                    broken = broken or isinstance(error, BrokenProcessPool)
+            if broken:
+                self._replace_executor()
+            while len(self._running) < self.max_workers:
+                job_id = self.next_job()
+                if job_id is None:
+                    break
+                _update(self.db_path, job_id, status="running", stage="starting", started_at=time.time())
+                try:
+                    future = self._executor.submit(run_job, self.db_path, job_id)
+                except BrokenProcessPool:
+                    # The pool broke since the last pass; the job never started, so it goes back in the queue
+                    _update(self.db_path, job_id, status="queued", stage="queued", started_at=None)
+                    self._replace_executor()
+                    continue
+                future.add_done_callback(lambda _: self._wake.set())
+                self._running[job_id] = future
+
+    def _replace_executor(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = self._new_executor()
+
+    def status(self, job_id):
+        with _connect(self.db_path) as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _with_eta(dict(row)) if row else None
+
+    def list_jobs(self, submitter=None):
+        query, params = "SELECT * FROM jobs", ()
+        if submitter:
+            query, params = query + " WHERE submitter = ?", (submitter,)
+        with _connect(self.db_path) as conn:
+            rows = conn.execute(query + " ORDER BY submitted_at DESC", params).fetchall()
+        return [_with_eta(dict(r)) for r in rows]
+
+    def wait(self, job_id, timeout=None):
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            job = self.status(job_id)
+            if job["status"] in ("done", "failed"):
+                return job
+            if deadline and time.time() > deadline:
+                raise TimeoutError(f"Job {job_id} still {job['status']} after {timeout}s")
+            time.sleep(self.poll_interval / 5)
+
+    def shutdown(self, wait=True):
+        self._stopped = True
+        self._wake.set()
+        if self._dispatcher.is_alive():
+            self._dispatcher.join()
+        self._executor.shutdown(wait=wait)
+
+
+def _with_eta(job):
+    job["eta_seconds"] = None
+    if job["status"] == "running" and job["rows_total"] and job["rows_processed"]:
+        elapsed = time.time() - job["started_at"]
+        rate = job["rows_processed"] / elapsed
+        job["eta_seconds"] = (job["rows_total"] - job["rows_processed"]) / rate
+    return job
@@ -0,0 +1,37 @@
+# llm_client.py
+"""
+Lazily constructed LangChain/OpenAI client and prompt helpers for GPT remediation
+(batched in prompt_builder.py).
+Nothing heavy is imported until get_llm() is first called, so validation-only
+code paths (tests, batch workers) never pay for langchain or dotenv.
+"""
+import os
+
+_LLM = None
+
+
+def get_openai_api_key():
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    return os.getenv("OPENAI_API_KEY")
+
+
+def get_llm(temperature=0.2):
+    """Return a shared ChatOpenAI client, or None when no API key is configured."""
+    global _LLM
+    if _LLM is None:
+        api_key = get_openai_api_key()
+        if not api_key:
+            return None
+        from langchain_community.chat_models import ChatOpenAI
+
+        _LLM = ChatOpenAI(openai_api_key=api_key, temperature=temperature)
+    return _LLM
+
+
+def describe_failure(failure):
+    """One prompt line for a failure record (see failure_records.failure_table)."""
+    mdrm = f" (MDRM {failure['MDRM']})" if failure.get("MDRM") else ""
+    observed = "no value" if failure["Observed"] is None else repr(failure["Observed"])
+    return f"- {failure['Field']}{mdrm}: got {observed}, expected {failure['Expected']}"
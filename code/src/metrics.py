@@ -0,0 +1,422 @@
+# metrics.py
+"""
+Process-wide counters and histograms for pipeline throughput, stage and rule
+latency, LLM requests, tokens and cost, cache hit rates and rule failures.
+They can be exported in the Prometheus text format (prometheus_text) or as a
+JSON run summary (run_summary).
+
+Instruments are updated once per chunk, rule or request, never per row, and
+an update is a lock plus a few additions, so they stay on all the time.
+Histograms keep counts per bucket; percentiles are interpolated from them as
+Prometheus' histogram_quantile does. Worker processes send their state()
+back to the parent, which adds them up with merge_states().
+
+serve() exposes /metrics (Prometheus text) and /metrics.json on a local port
+from a background thread; the UI starts it when PROFILER_METRICS_PORT is set.
+"""
+import bisect
+import contextlib
+import copy
+import json
+import os
+import threading
+import time
+
+# Seconds; the last bucket is +Inf
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+QUANTILES = (0.5, 0.95, 0.99)
+METRICS_PORT = int(os.getenv("PROFILER_METRICS_PORT", "0"))
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _key(labelnames, labels):
+    return tuple(str(labels[name]) for name in labelnames)
+
+
+class Counter:
+    """Monotonic count per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.samples = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _key(self.labelnames, labels)
+        with self._lock:
+            self.samples[key] = self.samples.get(key, 0) + amount
+
+    def set_total(self, value, **labels):
+        """Set a count kept elsewhere (e.g. lru_cache statistics)."""
+        with self._lock:
+            self.samples[_key(self.labelnames, labels)] = value
+
+    def value(self, **labels):
+        return self.samples.get(_key(self.labelnames, labels), 0)
+
+
+class Gauge(Counter):
+    """Current value per label set."""
+
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        self.set_total(value, **labels)
+
+
+class Histogram:
+    """Counts of observations per bucket, their sum and count, per label set."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # Per label set: [non-cumulative bucket counts, +Inf included; sum]
+        self.samples = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _key(self.labelnames, labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            sample = self.samples.get(key)
+            if sample is None:
+                sample = self.samples[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            sample[0][i] += 1
+            sample[1] += value
+
+    @contextlib.contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels):
+        sample = self.samples.get(_key(self.labelnames, labels))
+        return sum(sample[0]) if sample else 0
+
+    def quantile(self, q, **labels):
+        sample = self.samples.get(_key(self.labelnames, labels))
+        return _quantile(self.buckets, sample[0], q) if sample else None
+
+
+def _quantile(buckets, counts, q):
+    # Linear interpolation inside the bucket holding the q-th observation
+    total = sum(counts)
+    if not total:
+        return None
+    rank, seen = q * total, 0
+    for i, n in enumerate(counts):
+        if n and seen + n >= rank:
+            if i == len(buckets):
+                return buckets[-1]
+            lower = buckets[i - 1] if i else 0.0
+            return lower + (buckets[i] - lower) * (rank - seen) / n
+        seen += n
+    return buckets[-1]
+
+
+class Registry:
+    """Named instruments plus collectors that refresh values kept elsewhere before an export."""
+
+    TYPES = {"counter": Counter, "gauge": Gauge, "histogram": Histogram}
+
+    def __init__(self):
+        self.metrics = {}
+        self.collectors = []
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+
+    def _get(self, kind, name, help, labelnames, **kwargs):
+        with self._lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = self.TYPES[kind](name, help, labelnames, **kwargs)
+            elif metric.kind != kind:
+                raise ValueError(f"Metric {name!r} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self._get("counter", name, help, labelnames)
+
+    def gauge(self, name, help, labelnames=()):
+        return self._get("gauge", name, help, labelnames)
+
+    def histogram(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._get("histogram", name, help, labelnames, buckets=buckets)
+
+    def add_collector(self, collect):
+        """Call `collect()` before every state()/export, e.g. to copy cache statistics into a counter."""
+        self.collectors.append(collect)
+
+    def state(self):
+        """Picklable copy of every metric, for merge_states() and from_state()."""
+        for collect in self.collectors:
+            collect()
+        state = {}
+        for name, metric in list(self.metrics.items()):
+            with metric._lock:
+                samples = copy.deepcopy(metric.samples)
+            state[name] = {"kind": metric.kind, "help": metric.help, "labelnames": metric.labelnames,
+                           "buckets": getattr(metric, "buckets", None), "samples": samples}
+        return state
+
+    @classmethod
+    def from_state(cls, state):
+        registry = cls()
+        for name, metric in state.items():
+            kwargs = {"buckets": metric["buckets"]} if metric["kind"] == "histogram" else {}
+            registry._get(metric["kind"], name, metric["help"], metric["labelnames"], **kwargs).samples = \
+                copy.deepcopy(metric["samples"])
+        return registry
+
+
+def _add(total, state, sign):
+    for name, metric in state.items():
+        target = total.setdefault(name, {**metric, "samples": {}})
+        for key, value in metric["samples"].items():
+            old = target["samples"].get(key)
+            if metric["kind"] == "histogram":
+                old = old or [[0] * len(value[0]), 0.0]
+                target["samples"][key] = [[a + sign * b for a, b in zip(old[0], value[0])], old[1] + sign * value[1]]
+            elif metric["kind"] == "gauge" and sign < 0:
+                # A gauge is a current value: the newer one stands
+                continue
+            else:
+                target["samples"][key] = (old or 0) + sign * value
+    return total
+
+
+def merge_states(states):
+    """Sum of several registries' state(), e.g. one per worker process."""
+    total = {}
+    for state in states:
+        _add(total, copy.deepcopy(state), 1)
+    return total
+
+
+def diff_states(after, before):
+    """What was recorded between two state() calls of the same registry."""
+    return _add(copy.deepcopy(after), before, -1)
+
+
+REGISTRY = Registry()
+
+ROWS = REGISTRY.counter("profiler_rows_total", "Rows processed per pipeline stage", ["stage"])
+STAGE_SECONDS = REGISTRY.histogram("profiler_stage_seconds", "Time per call of a pipeline stage", ["stage"])
+RULE_SECONDS = REGISTRY.histogram("profiler_rule_seconds", "Time per call of a validation rule", ["rule"])
+RULE_CHECKED = REGISTRY.counter("profiler_rule_checked_total", "Rows checked per rule result column", ["field"])
+RULE_FAILURES = REGISTRY.counter("profiler_rule_failures_total", "Rows failing per rule result column", ["field"])
+LLM_SECONDS = REGISTRY.histogram("profiler_llm_request_seconds", "LLM request latency", ["purpose"],
+                                 buckets=LLM_BUCKETS)
+LLM_REQUESTS = REGISTRY.counter("profiler_llm_requests_total", "LLM requests by outcome", ["purpose", "status"])
+LLM_TOKENS = REGISTRY.counter("profiler_llm_tokens_total", "LLM tokens used", ["kind"])
+LLM_COST = REGISTRY.counter("profiler_llm_cost_usd_total", "Estimated LLM cost in USD")
+CACHE_LOOKUPS = REGISTRY.counter("profiler_cache_lookups_total", "Cache lookups by cache and result",
+                                 ["cache", "result"])
+CACHE_ENTRIES = REGISTRY.gauge("profiler_cache_entries", "Entries held per cache", ["cache"])
+
+
+@contextlib.contextmanager
+def stage(name, rows):
+    """Time a pipeline stage over `rows` rows."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage=name)
+        ROWS.inc(rows, stage=name)
+
+
+@contextlib.contextmanager
+def llm_request(purpose):
+    """Time an LLM call, counting it as an error if it raises."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        LLM_REQUESTS.inc(purpose=purpose, status="error")
+        raise
+    LLM_SECONDS.observe(time.perf_counter() - start, purpose=purpose)
+    LLM_REQUESTS.inc(purpose=purpose, status="ok")
+
+
+def count_rule_results(df, rules):
+    """Add the checked and failing rows of each rule result column in df."""
+    for output in dict.fromkeys(r.output for r in rules if r.output in df.columns):
+        values = df[output]
+        if values.dtype == bool:
+            checked, passed = len(values), int(values.sum())
+        else:
+            # Rows a short-circuited run skipped are NA and not counted
+            present = values.dropna()
+            checked, passed = len(present), int(present.astype(bool).sum())
+        RULE_CHECKED.inc(checked, field=output)
+        RULE_FAILURES.inc(checked - passed, field=output)
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labelnames, key, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in (*zip(labelnames, key), *extra)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def prometheus_text(registry=None):
+    """Every metric in the Prometheus text exposition format (version 0.0.4)."""
+    registry = registry or REGISTRY
+    lines = []
+    for name, metric in sorted(registry.state().items()):
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['kind']}")
+        for key, value in sorted(metric["samples"].items()):
+            if metric["kind"] != "histogram":
+                lines.append(f"{name}{_labels(metric['labelnames'], key)} {_number(value)}")
+                continue
+            counts, total = value
+            cumulative = 0
+            for bound, n in zip((*metric["buckets"], "+Inf"), counts):
+                cumulative += n
+                le = bound if bound == "+Inf" else _number(float(bound))
+                lines.append(f"{name}_bucket{_labels(metric['labelnames'], key, [('le', le)])} {cumulative}")
+            lines.append(f"{name}_sum{_labels(metric['labelnames'], key)} {_number(float(total))}")
+            lines.append(f"{name}_count{_labels(metric['labelnames'], key)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+def _by_label(metric):
+    # {label value: sample} for single-label metrics, {joined labels: sample} otherwise
+    return {"/".join(key) or "all": value for key, value in sorted(metric["samples"].items())}
+
+
+def _latency(buckets, counts, total):
+    n = sum(counts)
+    summary = {"count": n, "seconds": round(total, 6), "mean_ms": round(1000 * total / n, 3) if n else None}
+    for q in QUANTILES:
+        value = _quantile(buckets, counts, q)
+        summary[f"p{round(q * 100)}_ms"] = round(1000 * value, 3) if value is not None else None
+    return summary
+
+
+def run_summary(registry=None, state=None, seconds=None):
+    """
+    JSON-ready summary of a registry (or a state() / merge_states() result):
+    rows/sec per stage, latency percentiles, LLM usage, cache hit rates and
+    failure rates per rule, plus every metric by label set.
+    """
+    if state is None:
+        registry = registry or REGISTRY
+        state = registry.state()
+        if seconds is None:
+            seconds = time.time() - registry.started_at
+    empty = {"samples": {}, "buckets": ()}
+    metrics = {name: empty for name in (ROWS.name, STAGE_SECONDS.name, RULE_SECONDS.name, RULE_CHECKED.name,
+                                        RULE_FAILURES.name, LLM_SECONDS.name, LLM_REQUESTS.name, LLM_TOKENS.name,
+                                        LLM_COST.name, CACHE_LOOKUPS.name)}
+    metrics.update(state)
+
+    rows = _by_label(metrics[ROWS.name])
+    stages = {}
+    for stage_name, (counts, total) in _by_label(metrics[STAGE_SECONDS.name]).items():
+        stages[stage_name] = {"rows": rows.get(stage_name, 0), **_latency(metrics[STAGE_SECONDS.name]["buckets"],
+                                                                          counts, total)}
+        stages[stage_name]["rows_per_second"] = round(stages[stage_name]["rows"] / total, 1) if total else None
+
+    checked = _by_label(metrics[RULE_CHECKED.name])
+    failures = _by_label(metrics[RULE_FAILURES.name])
+    rules = {field: {"checked": n, "failures": failures.get(field, 0),
+                     "failure_rate": round(failures.get(field, 0) / n, 6) if n else None}
+             for field, n in checked.items()}
+    rule_latency = {rule: _latency(metrics[RULE_SECONDS.name]["buckets"], counts, total)
+                    for rule, (counts, total) in _by_label(metrics[RULE_SECONDS.name]).items()}
+
+    llm_counts = [0] * (len(LLM_BUCKETS) + 1)
+    llm_total = 0.0
+    for counts, total in metrics[LLM_SECONDS.name]["samples"].values():
+        llm_counts = [a + b for a, b in zip(llm_counts, counts)]
+        llm_total += total
+    requests = {}
+    for (purpose, status), n in metrics[LLM_REQUESTS.name]["samples"].items():
+        requests[status] = requests.get(status, 0) + n
+    tokens = _by_label(metrics[LLM_TOKENS.name])
+    llm = {"requests": requests.get("ok", 0), "errors": requests.get("error", 0),
+           "latency": _latency(LLM_BUCKETS, llm_counts, llm_total),
+           "prompt_tokens": tokens.get("prompt", 0), "completion_tokens": tokens.get("completion", 0),
+           "estimated_cost_usd": round(sum(metrics[LLM_COST.name]["samples"].values()), 6)}
+
+    caches = {}
+    for (cache, result), n in metrics[CACHE_LOOKUPS.name]["samples"].items():
+        caches.setdefault(cache, {"hit": 0, "miss": 0})[result] = n
+    for counts in caches.values():
+        lookups = counts["hit"] + counts["miss"]
+        counts["hit_rate"] = round(counts["hit"] / lookups, 6) if lookups else None
+
+    pipeline_rows = rows.get("pipeline", 0)
+    return {
+        "seconds": round(seconds, 3) if seconds is not None else None,
+        "rows": pipeline_rows,
+        "rows_per_second": stages.get("pipeline", {}).get("rows_per_second"),
+        "stages": stages,
+        "rules": rules,
+        "rule_latency": rule_latency,
+        "llm": llm,
+        "caches": caches,
+        "metrics": {name: {"type": metric["kind"], "values": {
+            label: (_latency(metric["buckets"], *value) if metric["kind"] == "histogram" else value)
+            for label, value in _by_label(metric).items()}} for name, metric in sorted(state.items())},
+    }
+
+
+def write_metrics(prefix, state=None, seconds=None):
+    """
+    Write <prefix>.prom (Prometheus text) and <prefix>.json (run summary) for
+    a state, by default this process's. Returns the two paths.
+    """
+    registry = REGISTRY if state is None else Registry.from_state(state)
+    summary = run_summary(registry, seconds=seconds)
+    prom_path, json_path = f"{prefix}.prom", f"{prefix}.json"
+    with open(prom_path, "w") as f:
+        f.write(prometheus_text(registry))
+    with open(json_path, "w") as f:
+        json.dump(summary, f, indent=2)
+    return prom_path, json_path
+
+
+def serve(port=METRICS_PORT, host="127.0.0.1"):
+    """Serve this process's metrics from a daemon thread; returns the server (its port is server_port)."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split("?")[0]
+            if path == "/metrics":
+                body, content_type = prometheus_text().encode("utf-8"), PROMETHEUS_CONTENT_TYPE
+            elif path == "/metrics.json":
+                body, content_type = json.dumps(run_summary()).encode("utf-8"), "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,196 @@
+# preview.py
+"""
+Quick approximate validation of a sample, to see whether a file is roughly
+clean before the full run. Every rule runs on a few thousand rows and the
+failure rate of each is estimated for the whole file with a confidence
+interval.
+
+Samples are stratified by STRATA (line of business and facility type): each
+stratum's rate is weighted by its share of the file, so small business lines
+are represented and the intervals are narrower than for a plain random
+sample. How the sample is drawn depends on the source:
+    in-memory frame      proportional stratified sample, at least one row per stratum
+    chunk stream         reservoir sample, counting every stratum as it passes
+    large plain file     rows at random byte offsets; reads only the sampled
+                         lines, so it takes the same time whatever the file size
+                         (assumes one row per line, slightly favours rows after
+                         long rows; strata shares are the sample's own)
+"""
+import io
+import os
+import time
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from corporate_loan_rules import CORPORATE_LOAN_RULES
+from custom_rules import custom_rule_list
+from ingestion import compression_of, read_submission
+from results_view import result_matrix
+from rule_engine import apply_rules
+
+STRATA = ["Line_of_Business", "Credit_Facility_Type"]
+SAMPLE_SIZE = int(os.getenv("PREVIEW_SAMPLE_SIZE", "5000"))
+CONFIDENCE = 0.95
+# Files above this size are sampled by byte offset instead of being read whole
+LINE_SAMPLE_MIN_BYTES = 32 * 1024 * 1024
+
+
+def strata_keys(df, strata=STRATA):
+    """One stratum label per row, from the strata columns present in df."""
+    present = [c for c in strata if c in df.columns]
+    if not present:
+        return pd.Series("all", index=df.index)
+    keys = df[present[0]].astype(str)
+    for column in present[1:]:
+        keys = keys + " / " + df[column].astype(str)
+    return keys
+
+
+def stratified_sample(df, size=SAMPLE_SIZE, strata=STRATA, seed=0):
+    """
+    (sample, rows per stratum in df). Strata get rows in proportion to their
+    size, but at least one each.
+    """
+    keys = strata_keys(df, strata)
+    counts = keys.value_counts()
+    if len(df) <= size:
+        return df, counts
+    allocation = np.maximum(np.round(counts * size / len(df)), 1).astype(int)
+    # Random order within each stratum, keeping its first n_h rows
+    order = pd.Series(np.random.default_rng(seed).random(len(df))).groupby(keys.to_numpy()).rank(method="first")
+    return df[order.to_numpy() <= keys.map(allocation).to_numpy()], counts
+
+
+def reservoir_sample(chunks, size=SAMPLE_SIZE, strata=STRATA, seed=0):
+    """
+    (sample, rows per stratum) of a stream of frames, holding at most `size`
+    rows at a time: each row gets a random key and the smallest keys are kept.
+    """
+    rng = np.random.default_rng(seed)
+    sample, priorities, counts = None, np.empty(0), pd.Series(dtype="int64")
+    for chunk in chunks:
+        counts = counts.add(strata_keys(chunk, strata).value_counts(), fill_value=0)
+        chunk = chunk.astype({c: object for c in chunk.columns if isinstance(chunk[c].dtype, pd.CategoricalDtype)})
+        sample = chunk if sample is None else pd.concat([sample, chunk], ignore_index=True)
+        priorities = np.concatenate([priorities, rng.random(len(chunk))])
+        if len(sample) > size:
+            keep = np.sort(np.argpartition(priorities, size)[:size])
+            sample, priorities = sample.iloc[keep].reset_index(drop=True), priorities[keep]
+    return sample, counts.astype("int64")
+
+
+def line_sample(f, size=SAMPLE_SIZE, strata=STRATA, seed=0):
+    """
+    (sample, estimated rows per stratum) from an open binary CSV file, reading
+    the line after each of `size` random byte offsets.
+    """
+    end = f.seek(0, os.SEEK_END)
+    f.seek(0)
+    header = f.readline()
+    starts = {}
+    for offset in np.sort(np.random.default_rng(seed).integers(len(header), end, size)):
+        # The line the offset lands in is partial; the sampled row is the next one
+        f.seek(max(offset - 1, 0))
+        f.readline()
+        start = f.tell()
+        if start not in starts:
+            line = f.readline()
+            if line.strip():
+                starts[start] = line if line.endswith(b"\n") else line + b"\n"
+    f.seek(0)
+    lines = list(starts.values())
+    sample = read_submission(io.BytesIO(header + b"".join(lines)))
+    rows = (end - len(header)) / (sum(map(len, lines)) / len(lines)) if lines else 0
+    counts = strata_keys(sample, strata).value_counts()
+    return sample, (counts * rows / max(len(sample), 1)).round().astype("int64")
+
+
+def sample_file(source, size=SAMPLE_SIZE, strata=STRATA, seed=0):
+    """
+    (sample, rows per stratum) of a CSV path or file object: large seekable
+    uncompressed files are sampled by byte offset, anything else is read in
+    chunks through a reservoir.
+    """
+    # Compressed data has no byte offsets to seek to
+    plain = compression_of(source) is None
+    if plain and isinstance(source, (str, os.PathLike)):
+        if os.path.getsize(source) > LINE_SAMPLE_MIN_BYTES:
+            with open(source, "rb") as f:
+                return line_sample(f, size, strata, seed)
+    elif plain and hasattr(source, "seek"):
+        end = source.seek(0, os.SEEK_END)
+        source.seek(0)
+        if end > LINE_SAMPLE_MIN_BYTES:
+            return line_sample(source, size, strata, seed)
+    sample, counts = reservoir_sample(read_submission(source, chunksize=100_000), size, strata, seed)
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return sample, counts
+
+
+def _wilson(rate, n, z):
+    # Wilson score interval; unlike rate +/- z*se it stays inside [0, 1] and is not empty at rate 0
+    denominator = 1 + z ** 2 / n
+    center = (rate + z ** 2 / (2 * n)) / denominator
+    half = z * np.sqrt(rate * (1 - rate) / n + z ** 2 / (4 * n ** 2)) / denominator
+    return np.clip(center - half, 0, 1), np.clip(center + half, 0, 1)
+
+
+def estimate_failure_rates(sample, counts, rules=None, strata=STRATA, confidence=CONFIDENCE):
+    """
+    Estimated failure rate of each rule over the population whose strata sizes
+    are `counts`, with a `confidence` interval, worst first.
+    """
+    rules = rules if rules is not None else CORPORATE_LOAN_RULES + custom_rule_list(sample.columns)
+    keys = strata_keys(sample, strata).to_numpy()
+    failed = ~result_matrix(apply_rules(sample.copy(), rules), rules)
+    total = int(counts.sum())
+
+    per_stratum = failed.groupby(keys)
+    rates, n = per_stratum.mean(), per_stratum.size()
+    population = counts.reindex(n.index).fillna(n).clip(lower=n)
+    weights = population / population.sum()
+    # Stratified estimate, and its variance with the finite population correction
+    estimate = rates.mul(weights, axis=0).sum()
+    fpc = 1 - n / population
+    variance = (rates * (1 - rates)).mul(weights ** 2 * fpc / n, axis=0).sum()
+
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    if len(sample) >= total:
+        low, high = estimate.to_numpy(), estimate.to_numpy()
+    else:
+        # Wilson interval at the effective sample size of the stratified design
+        effective = np.where(variance > 0, estimate * (1 - estimate) / variance.where(variance > 0, 1), len(sample))
+        low, high = _wilson(estimate.to_numpy(), np.maximum(effective, 1), z)
+
+    meta = {r.output: r for r in rules}
+    summary = pd.DataFrame({
+        "Rule": [meta[col].__name__ for col in failed.columns],
+        "Field": failed.columns,
+        "MDRM": [meta[col].mdrm or "" for col in failed.columns],
+        "Severity": [meta[col].severity for col in failed.columns],
+        "Sample_Failures": failed.sum().to_numpy(),
+        "Estimated_Rate": estimate.to_numpy(),
+        "CI_Low": low,
+        "CI_High": high,
+        "Estimated_Failures": np.round(estimate.to_numpy() * total).astype(int),
+    })
+    return summary.sort_values("Estimated_Rate", ascending=False, kind="stable").reset_index(drop=True)
+
+
+def preview(source, size=SAMPLE_SIZE, strata=STRATA, confidence=CONFIDENCE, seed=0):
+    """
+    Sample a CSV path, file object or frame and estimate every rule's failure
+    rate. Returns (estimates, info) with the sample and estimated file sizes.
+    """
+    start = time.perf_counter()
+    if isinstance(source, pd.DataFrame):
+        sample, counts = stratified_sample(source, size, strata, seed)
+    else:
+        sample, counts = sample_file(source, size, strata, seed)
+    estimates = estimate_failure_rates(sample, counts, strata=strata, confidence=confidence)
+    info = {"sample_rows": len(sample), "estimated_rows": int(counts.sum()), "strata": len(counts),
+            "seconds": time.perf_counter() - start}
+    return estimates, info
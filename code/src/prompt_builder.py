@@ -0,0 +1,188 @@
+# prompt_builder.py
+"""
+Batched, token-budgeted GPT remediation.
+Rows are described only by their failures (field, MDRM, observed value and the
+rule's constraint). Rows with identical failures are asked about once. The
+remaining distinct failure sets are packed into as few requests as fit
+LLM_PROMPT_TOKEN_BUDGET. Each field's FR Y-14Q instructions appear once per
+request however many rows fail it. Tokens are counted locally (with tiktoken
+when installed, else ~4 characters per token) and each run's usage and
+estimated cost are returned in a TokenUsage.
+"""
+import os
+import re
+
+from llm_client import describe_failure
+from metrics import CACHE_LOOKUPS, LLM_COST, LLM_TOKENS, llm_request
+
+TOKEN_BUDGET = int(os.getenv("LLM_PROMPT_TOKEN_BUDGET", "3000"))
+# USD per 1,000 tokens, for the cost estimate
+INPUT_COST_PER_1K = float(os.getenv("LLM_INPUT_COST_PER_1K", "0.0005"))
+OUTPUT_COST_PER_1K = float(os.getenv("LLM_OUTPUT_COST_PER_1K", "0.0015"))
+
+BATCH_PROMPT = """You are a data quality analyst for FR Y-14Q corporate loan submissions.
+Each numbered record below failed the listed validation checks.
+{instructions}
+{records}
+
+For each record, start a line with "Record <number>:" and explain briefly how to fix each failed field."""
+
+_RECORD_HEADER = re.compile(r"^\W*Record\s+(\d+)\W*:?", re.IGNORECASE | re.MULTILINE)
+# Answers by failure set, so repeated failures (within a run or across files) are asked once
+_ANSWERS = {}
+MAX_ANSWERS = 4096
+_ENCODER = None
+
+
+def count_tokens(text):
+    global _ENCODER
+    if _ENCODER is None:
+        try:
+            import tiktoken
+
+            _ENCODER = tiktoken.get_encoding("cl100k_base")
+        except ImportError:
+            _ENCODER = False
+    if _ENCODER:
+        return len(_ENCODER.encode(text))
+    return len(text) // 4 + 1
+
+
+class TokenUsage:
+    """Requests, tokens and estimated cost of one remediation run."""
+
+    def __init__(self):
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.rows = 0
+        self.cached_rows = 0
+
+    def add(self, prompt_tokens, completion_tokens):
+        self.requests += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+
+    @property
+    def cost(self):
+        return (self.prompt_tokens * INPUT_COST_PER_1K + self.completion_tokens * OUTPUT_COST_PER_1K) / 1000
+
+    def as_dict(self):
+        return {"requests": self.requests, "rows": self.rows, "cached_rows": self.cached_rows,
+                "prompt_tokens": self.prompt_tokens, "completion_tokens": self.completion_tokens,
+                "tokens_per_row": (self.prompt_tokens + self.completion_tokens) / self.rows if self.rows else 0.0,
+                "estimated_cost_usd": round(self.cost, 6)}
+
+
+def _field_instructions(index, failures):
+    # {field: instructions text} for the fields in one failure set
+    if index is None:
+        return {}
+    from instructions_index import field_context
+
+    blocks = {}
+    for failure in failures:
+        text = field_context(index, [failure])
+        if text:
+            blocks.setdefault(failure["Field"], text)
+    return blocks
+
+
+def build_prompts(failure_sets, index=None, budget=TOKEN_BUDGET):
+    """
+    Pack failure sets ({key: [failure records]}) into prompts within `budget`
+    tokens. Returns [(prompt, [keys in record order])]; a set too large for
+    the budget on its own still gets a prompt of its own.
+    """
+    base = count_tokens(BATCH_PROMPT.format(instructions="", records=""))
+    batches, keys, records, instructions, used = [], [], [], {}, base
+
+    def flush():
+        if keys:
+            context = ""
+            if instructions:
+                context = "\nFR Y-14Q instructions:\n" + "\n".join(instructions.values()) + "\n"
+            batches.append((BATCH_PROMPT.format(instructions=context, records="\n".join(records)), list(keys)))
+
+    for key, failures in failure_sets.items():
+        record = f"Record {len(keys) + 1}:\n" + "\n".join(describe_failure(f) for f in failures)
+        new = {field: text for field, text in _field_instructions(index, failures).items() if field not in instructions}
+        cost = count_tokens(record) + sum(count_tokens(text) for text in new.values())
+        if keys and used + cost > budget:
+            flush()
+            keys, records, instructions, used = [], [], {}, base
+            record = "Record 1:\n" + "\n".join(describe_failure(f) for f in failures)
+            new = _field_instructions(index, failures)
+            cost = count_tokens(record) + sum(count_tokens(text) for text in new.values())
+        keys.append(key)
+        records.append(record)
+        instructions.update(new)
+        used += cost
+    flush()
+    return batches
+
+
+def split_answers(text, count):
+    """The per-record sections of a batched reply, by record number (1-based)."""
+    answers = {}
+    matches = list(_RECORD_HEADER.finditer(text))
+    for match, following in zip(matches, matches[1:] + [None]):
+        number = int(match.group(1))
+        if 1 <= number <= count:
+            answers[number] = text[match.end():following.start() if following else len(text)].strip()
+    return answers
+
+
+def _signature(failures):
+    return "\n".join(describe_failure(f) for f in failures)
+
+
+def remediate(failures_by_row, llm, index=None, budget=TOKEN_BUDGET):
+    """
+    GPT remediation for every row in {row: [failure records]}.
+    Returns ({row: advice}, TokenUsage).
+    """
+    usage = TokenUsage()
+    usage.rows = len(failures_by_row)
+    advice, pending = {}, {}
+    for row, failures in failures_by_row.items():
+        if not failures:
+            advice[row] = "No action needed."
+            continue
+        key = _signature(failures) + ("\n+instructions" if index is not None else "")
+        if key in _ANSWERS:
+            advice[row] = _ANSWERS[key]
+            usage.cached_rows += 1
+        else:
+            pending.setdefault(key, (failures, []))[1].append(row)
+
+    CACHE_LOOKUPS.inc(usage.cached_rows, cache="llm_answer", result="hit")
+    CACHE_LOOKUPS.inc(sum(len(rows) for _, rows in pending.values()), cache="llm_answer", result="miss")
+
+    for prompt, keys in build_prompts({key: failures for key, (failures, _) in pending.items()}, index, budget):
+        with llm_request("remediation"):
+            response = llm.invoke(prompt)
+        text = getattr(response, "content", response)
+        reported = (getattr(response, "response_metadata", None) or {}).get("token_usage") or {}
+        prompt_tokens = reported.get("prompt_tokens") or count_tokens(prompt)
+        completion_tokens = reported.get("completion_tokens") or count_tokens(text)
+        usage.add(prompt_tokens, completion_tokens)
+        LLM_TOKENS.inc(prompt_tokens, kind="prompt")
+        LLM_TOKENS.inc(completion_tokens, kind="completion")
+        LLM_COST.inc((prompt_tokens * INPUT_COST_PER_1K + completion_tokens * OUTPUT_COST_PER_1K) / 1000)
+        answers = split_answers(text, len(keys))
+        for number, key in enumerate(keys, 1):
+            answer = answers.get(number)
+            if answer is not None:
+                # Only answers split out for this record are reused by later runs
+                if len(_ANSWERS) >= MAX_ANSWERS:
+                    _ANSWERS.clear()
+                _ANSWERS[key] = answer
+            elif len(keys) == 1 or not answers:
+                # A reply that doesn't follow the record layout is given to every row of the batch
+                answer = text
+            else:
+                answer = "No suggestion returned."
+            for row in pending[key][1]:
+                advice[row] = answer
+    return advice, usage
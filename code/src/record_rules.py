@@ -0,0 +1,153 @@
+# record_rules.py
+"""
+Low-latency validation of individual records.
+compile_rule() turns a registered rule into a plain-Python predicate over a
+dict record: kernel rules become a precompiled regex or set lookup on the
+value's string form, rules with a `scalar` predicate call it directly, and any
+other rule falls back to running its pandas function on a one-row frame. As in
+apply_rules, each result is written back under the rule's output, so later
+rules see the same values they would in a frame.
+
+MicroBatcher trades a few milliseconds of latency for throughput: it holds
+records for up to max_wait_ms (or max_batch records) and validates them
+together through the vectorized path.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import pandas as pd
+
+from rule_engine import apply_rules, kernel_predicate, passed, runnable_rules
+
+# Compiled predicates per rule function, and rule plans per (rules, record columns)
+_COMPILED = {}
+_PLANS = {}
+MAX_PLANS = 256
+
+
+def _frame_predicate(rule_func):
+    columns, output = list(rule_func.columns), rule_func.output
+
+    def check(record):
+        value = rule_func(pd.DataFrame([{c: record[c] for c in columns}]))[output].iloc[0]
+        return bool(value) if pd.notna(value) else False
+    return check
+
+
+def compile_rule(rule_func):
+    """A record -> bool predicate equivalent to running rule_func on a one-row frame."""
+    compiled = _COMPILED.get(rule_func)
+    if compiled is None:
+        columns = rule_func.columns
+        if rule_func.kernel is not None:
+            check, column = kernel_predicate(rule_func.kernel), columns[0]
+            compiled = lambda record: check(str(record[column]))
+        elif getattr(rule_func, "scalar", None) is not None:
+            scalar = rule_func.scalar
+            compiled = lambda record: bool(scalar(*[record[c] for c in columns]))
+        else:
+            compiled = _frame_predicate(rule_func)
+        _COMPILED[rule_func] = compiled
+    return compiled
+
+
+def compile_rules(rules, columns):
+    """(output, predicate) steps for the rules that apply to records with these columns."""
+    key = (tuple(rules), tuple(columns))
+    plan = _PLANS.get(key)
+    if plan is None:
+        plan = [(r.output, compile_rule(r)) for r in runnable_rules(rules, columns)]
+        if len(_PLANS) >= MAX_PLANS:
+            _PLANS.clear()
+        _PLANS[key] = plan
+    return plan
+
+
+def check_record(record, rules, columns=None):
+    """
+    Validate one record, a dict or (with `columns`) a tuple of values.
+    Returns {"valid": bool, "failures": [rule outputs that failed]}.
+    """
+    values = dict(zip(columns, record)) if columns is not None else dict(record)
+    outputs = {}
+    for output, check in compile_rules(rules, values):
+        ok = check(values)
+        values[output] = ok
+        outputs[output] = ok
+    failures = [name for name, ok in outputs.items() if not ok]
+    return {"valid": not failures, "failures": failures}
+
+
+def validate_frame(df, rules):
+    """Vectorized path: one {"row", "valid", "failures"} dict per row of df."""
+    df = apply_rules(df, rules)
+    outputs = [col for col in dict.fromkeys(r.output for r in rules) if col in df.columns]
+    results = passed(df[outputs]).to_numpy()
+    records = []
+    for row, ok in zip(df.index, results):
+        failures = [outputs[i] for i in (~ok).nonzero()[0]]
+        records.append({"row": int(row), "valid": not failures, "failures": failures})
+    return records
+
+
+class MicroBatcher:
+    """
+    Collects submitted records into batches and validates each batch with
+    validate_batch(df) (e.g. validate_frame), on a background thread.
+    """
+
+    def __init__(self, validate_batch, max_batch=256, max_wait_ms=5.0):
+        self.validate_batch = validate_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def submit(self, record):
+        """Queue a record; returns a Future resolving to its {"valid", "failures"} result."""
+        future = Future()
+        self._queue.put((record, future))
+        return future
+
+    def validate(self, record, timeout=None):
+        return self.submit(record).result(timeout)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    # Finish this batch, then stop
+                    self._queue.put(None)
+                    break
+                batch.append(item)
+            self._flush(batch)
+
+    def _flush(self, batch):
+        try:
+            results = self.validate_batch(pd.DataFrame([record for record, _ in batch]))
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            result.pop("row", None)
+            future.set_result(result)
+
+    def close(self):
+        self._queue.put(None)
+        self._worker.join()
@@ -0,0 +1,48 @@
+# reference_data.py
+"""
+Reference code lists for the currency, country and industry rules, read from
+the files bundled in reference/:
+    iso4217.csv    ISO 4217 currency codes (without the XTS test and XXX no-currency codes)
+    iso3166.csv    ISO 3166-1 alpha-2 country codes
+    naics2022.csv  2022 NAICS sectors, subsectors and industries (2 to 6 digits)
+Each list is read once per process into a frozenset, which the rules use as an
+`isin` kernel (a hash lookup per distinct value, or Arrow's is_in). The NAICS
+hierarchy also gives the sector of any industry code, for roll-ups.
+"""
+import csv
+import functools
+import os
+
+import pandas as pd
+
+REFERENCE_DIR = os.path.join(os.path.dirname(__file__), "reference")
+
+# NAICS sectors that span several two-digit prefixes
+_COMBINED_SECTORS = {"31": "31-33", "32": "31-33", "33": "31-33",
+                     "44": "44-45", "45": "44-45", "48": "48-49", "49": "48-49"}
+
+
+@functools.lru_cache(maxsize=None)
+def load_codes(filename):
+    """{code: name} from a bundled reference file."""
+    with open(os.path.join(REFERENCE_DIR, filename), newline="", encoding="utf-8") as f:
+        return {code: name for code, name in csv.reader(f) if code != "code"}
+
+
+CURRENCY_CODES = frozenset(load_codes("iso4217.csv"))
+COUNTRY_CODES = frozenset(load_codes("iso3166.csv"))
+# Industry-level NAICS codes, as accepted in the 4 to 6 digit industry code fields
+NAICS_CODES = frozenset(code for code in load_codes("naics2022.csv") if code.isdigit() and len(code) >= 4)
+
+
+def naics_title(code):
+    return load_codes("naics2022.csv").get(str(code).strip(), "")
+
+
+def naics_sector(values):
+    """NAICS sector code (e.g. '54', '31-33') of each value, NaN where there is none."""
+    titles = load_codes("naics2022.csv")
+    prefixes = pd.Series(values).astype(str).str.strip().str[:2]
+    sectors = prefixes.replace(_COMBINED_SECTORS)
+    return sectors.where(sectors.isin(titles.keys()))
+
@@ -4,17 +4,20 @@ Module to generate remediation messages based on validation failures and risk sc
 Can be adapted for more advanced recommendation engines or compliance workflows.
 """
 
+# Fix for each failed result column, in the order they are reported
+REMEDIES = {
+    "Valid_Currency": "Fix currency format to ISO 4217.",
+    "Valid_Transaction": "Adjust Transaction_Amount to match Reported_Amount.",
+    "Valid_Transaction_Date": "Correct the Transaction_Date (can't be in future).",
+}
+
 def suggest_remediation(df):
     def get_remedy(row):
-        if not row.get("Valid_Currency", True):
-            return "Fix currency format to ISO 4217."
-        elif not row.get("Valid_Transaction", True):
-            return "Adjust Transaction_Amount to match Reported_Amount."
-        elif not row.get("Valid_Transaction_Date", True):
-            return "Correct the Transaction_Date (can't be in future)."
-        elif row.get("Risk_Score") == "HIGH":
-            return "Manual audit required due to high amount."
-        return "No action needed."
+        # Every failed check gets its fix, not just the first one found
+        remedies = [fix for field, fix in REMEDIES.items() if not row.get(field, True)]
+        if row.get("Risk_Score") == "HIGH":
+            remedies.append("Manual audit required due to high amount.")
+        return " ".join(remedies) or "No action needed."
 
     df["Remediation"] = df.apply(get_remedy, axis=1)
     return df
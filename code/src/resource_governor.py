@@ -0,0 +1,193 @@
+# resource_governor.py
+"""
+Runtime sizing of validation chunks and worker counts under a memory ceiling.
+
+plan_workers() validates a small probe chunk of the largest file in-process to
+measure what a row costs in memory once it has been through the pipeline,
+then runs as many workers as fit under the ceiling (at most one per core).
+That count is where a batch run starts; batch_validation runs one worker fewer
+whenever a part still went over its budget (a "shrink" decision below).
+Within each worker a ResourceGovernor picks the size of every next chunk:
+it doubles the chunk while rows/sec keeps improving and the chunk fits the
+worker's share of the ceiling, falls back when throughput drops, and halves
+it whenever the process RSS goes over its share.
+
+The ceiling is VALIDATION_MEMORY_LIMIT_MB, or 75% of physical memory.
+Memory is read with psutil when installed, else from /proc.
+Every decision is kept in `decisions` for the run report.
+"""
+import os
+
+import pandas as pd
+
+MEMORY_LIMIT_MB = int(os.getenv("VALIDATION_MEMORY_LIMIT_MB", "0"))
+MIN_CHUNK = 1_000
+MAX_CHUNK = 1_000_000
+START_CHUNK = 10_000
+PROBE_ROWS = 2_000
+# Share of a worker's budget its chunks may take; the rest absorbs allocator slack and output buffers
+HEADROOM = 0.6
+# A chunk size counts as faster than another when it is at least this much faster
+MIN_SPEEDUP = 1.05
+# A validated row is held as the input chunk, a raw copy and the result frame
+PIPELINE_COPIES = 3
+
+DECISION_COLUMNS = ["File", "Chunk", "Rows", "Rows_Per_Sec", "RSS_MB", "Bytes_Per_Row", "Next_Chunk_Size",
+                    "Workers", "Decision", "Reason"]
+
+
+def rss_bytes():
+    """Resident set size of this process."""
+    try:
+        import psutil
+
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+
+        # Peak rather than current, in KiB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def total_memory_bytes():
+    try:
+        import psutil
+
+        return psutil.virtual_memory().total
+    except ImportError:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+
+
+def memory_limit_bytes():
+    if MEMORY_LIMIT_MB:
+        return MEMORY_LIMIT_MB * 1024 * 1024
+    return int(total_memory_bytes() * 0.75)
+
+
+def frame_bytes_per_row(df):
+    """Lower bound on a row's pipeline cost, from the frame's own size."""
+    return PIPELINE_COPIES * df.memory_usage(deep=True).sum() / max(len(df), 1)
+
+
+class ResourceGovernor:
+    """
+    Chunk sizes for one worker. Read sizes from chunk_sizes() and report each
+    chunk with record(); decisions are appended to `decisions`. `memory_limit`
+    is checked against this process's RSS; when `sharing` workers (threads)
+    share the process, each sizes its chunks to its share of it.
+    """
+
+    def __init__(self, memory_limit=None, bytes_per_row=None, name="", min_chunk=MIN_CHUNK, max_chunk=MAX_CHUNK,
+                 start_chunk=START_CHUNK, sharing=1):
+        self.limit = memory_limit or memory_limit_bytes()
+        self.sharing = sharing
+        self.name = name
+        self.min_chunk, self.max_chunk = min_chunk, max_chunk
+        self.baseline = rss_bytes()
+        self.bytes_per_row = bytes_per_row
+        self.chunk_size = self._fit(start_chunk)
+        self.growing = True
+        self.best_rate, self.best_size = 0.0, self.chunk_size
+        self.chunks = 0
+        self.decisions = []
+
+    def _ceiling(self):
+        # Largest chunk whose rows fit in this worker's budget above its baseline
+        if not self.bytes_per_row:
+            return self.max_chunk
+        return int(max(self.limit - self.baseline, 0) * HEADROOM / self.sharing / self.bytes_per_row)
+
+    def _fit(self, size):
+        return int(max(self.min_chunk, min(size, self.max_chunk, self._ceiling())))
+
+    def chunk_sizes(self):
+        """Endless sizes for ingestion.read_chunks, each the current decision."""
+        while True:
+            yield self.chunk_size
+
+    def record(self, rows, seconds):
+        """Report a processed chunk (its frames still alive) and decide the next size."""
+        self.chunks += 1
+        rss = rss_bytes()
+        if self.chunks == 1:
+            # Later RSS growth is mostly state kept across chunks (keys, rule memos), which the RSS check covers
+            self.bytes_per_row = max(self.bytes_per_row or 0, max(rss - self.baseline, 0) / max(rows, 1))
+        rate = rows / seconds if seconds > 0 else float("inf")
+
+        size = self.chunk_size
+        if rss > self.limit:
+            decision, reason = "shrink", f"RSS {rss / 2**20:.0f} MB over the {self.limit / 2**20:.0f} MB budget"
+            size, self.growing = size // 2, False
+        elif rows < self.chunk_size:
+            decision, reason = "hold", "last chunk of the file"
+        elif rate >= self.best_rate * MIN_SPEEDUP:
+            self.best_rate, self.best_size = rate, size
+            if self.growing and self._fit(size * 2) > size:
+                decision, reason = "grow", "throughput still improving"
+                size *= 2
+            else:
+                decision, reason = "hold", "at the memory ceiling" if self.growing else "best size found"
+        elif rate * MIN_SPEEDUP < self.best_rate and size != self.best_size:
+            decision, reason = "back off", f"slower than at {self.best_size:,} rows"
+            size, self.growing = self.best_size, False
+        else:
+            decision, reason = "hold", "no faster than before"
+            self.growing = False
+        if self._fit(size) < size and decision != "shrink":
+            decision, reason = "cap", "chunk would exceed the memory ceiling"
+        self.chunk_size = self._fit(size)
+        self.decisions.append({"File": self.name, "Chunk": self.chunks, "Rows": rows, "Rows_Per_Sec": round(rate),
+                               "RSS_MB": round(rss / 2**20), "Bytes_Per_Row": round(self.bytes_per_row),
+                               "Next_Chunk_Size": self.chunk_size, "Workers": None,
+                               "Decision": decision, "Reason": reason})
+        return self.chunk_size
+
+
+def probe_bytes_per_row(path, validate, rows=PROBE_ROWS):
+    """
+    Memory per row of `validate` (a frame -> frame callable) on the first
+    `rows` rows of a CSV, after a small warm-up run for imports and caches.
+    """
+    from ingestion import read_submission
+
+    validate(read_submission(path, nrows=100))
+    frame = read_submission(path, nrows=rows)
+    before = rss_bytes()
+    validated = validate(frame.copy())
+    measured = max(rss_bytes() - before, 0) / max(len(frame), 1)
+    del validated
+    return max(measured, frame_bytes_per_row(frame))
+
+
+def plan_workers(paths, validate, memory_limit=None, max_workers=None):
+    """
+    (workers, per-worker memory budget, bytes per row, decision) for
+    validating `paths`, from a probe of the largest file.
+    """
+    limit = memory_limit or memory_limit_bytes()
+    from ingestion import source_size
+
+    # Not capped by the number of files, which are split across workers when large
+    cpus = max_workers or os.cpu_count() or 1
+    bytes_per_row = probe_bytes_per_row(max(paths, key=source_size), validate)
+    # A spawned worker costs about what this process does after importing the pipeline
+    worker_base = rss_bytes()
+    need = worker_base + MIN_CHUNK * bytes_per_row / HEADROOM
+    workers = int(max(1, min(cpus, limit // need)))
+    reason = (f"{limit / 2**20:,.0f} MB ceiling, ~{worker_base / 2**20:,.0f} MB per worker plus "
+              f"{bytes_per_row:,.0f} bytes per row")
+    if workers < cpus:
+        reason += f"; {cpus} workers would not fit"
+    decision = {"File": "(plan)", "Chunk": 0, "Rows": PROBE_ROWS, "Rows_Per_Sec": None,
+                "RSS_MB": round(worker_base / 2**20), "Bytes_Per_Row": round(bytes_per_row),
+                "Next_Chunk_Size": None, "Workers": workers, "Decision": "workers", "Reason": reason}
+    return workers, limit // workers, bytes_per_row, decision
+
+
+def decision_log(decisions):
+    return pd.DataFrame(decisions, columns=DECISION_COLUMNS)
@@ -0,0 +1,109 @@
+# results_view.py
+"""
+Server-side aggregation and paging of validation results for the UI.
+Everything here works on the boolean result matrix (one column per rule
+output), so the browser only ever receives summary tables and one page of
+failing rows instead of the whole validated frame.
+"""
+import numpy as np
+import pandas as pd
+
+from rule_engine import SKIPPED_COLUMN, passed
+
+DEFAULT_PAGE_SIZE = 50
+
+
+def result_matrix(df, rules):
+    """Boolean frame of rule outputs present in df (True = passed)."""
+    outputs = list(dict.fromkeys(r.output for r in rules if r.output in df.columns))
+    return pd.DataFrame({col: passed(df[col]) for col in outputs}, index=df.index)
+
+
+def skipped_matrix(df, results):
+    """
+    Boolean frame shaped like `results`: True where a short-circuited run
+    skipped the rule for that row (see rule_engine.apply_tiers).
+    """
+    if SKIPPED_COLUMN not in df.columns:
+        return pd.DataFrame(False, index=results.index, columns=results.columns)
+    row_skipped = df[SKIPPED_COLUMN].notna().to_numpy()[:, None]
+    return pd.DataFrame(df[results.columns].isna().to_numpy() & row_skipped,
+                        index=results.index, columns=results.columns)
+
+
+def failure_summary(results, rules, skipped=None):
+    """Failures (and skipped rows) per rule with its MDRM code and severity, worst first."""
+    if skipped is None:
+        skipped = pd.DataFrame(False, index=results.index, columns=results.columns)
+    failures = (~results & ~skipped).sum()
+    meta = {r.output: r for r in rules}
+    summary = pd.DataFrame({
+        "Rule": [meta[col].__name__ for col in results.columns],
+        "Field": results.columns,
+        "MDRM": [meta[col].mdrm or "" for col in results.columns],
+        "Severity": [meta[col].severity for col in results.columns],
+        "Tier": [getattr(meta[col], "tier", "format") for col in results.columns],
+        "Failures": failures.to_numpy(),
+        "Skipped": skipped.sum().to_numpy(),
+    })
+    summary["Failure_Rate"] = summary["Failures"] / max(len(results), 1)
+    return summary.sort_values("Failures", ascending=False, kind="stable").reset_index(drop=True)
+
+
+def failures_by_mdrm(summary):
+    return (summary[summary["MDRM"] != ""].groupby("MDRM", as_index=False)["Failures"].sum()
+            .sort_values("Failures", ascending=False, kind="stable").reset_index(drop=True))
+
+
+def failures_by_risk(results, risk):
+    """Number of rows and failing rows per risk level."""
+    failing = ~results.all(axis=1)
+    return (pd.DataFrame({"Risk_Score": risk.to_numpy(), "Failing": failing.to_numpy()})
+            .groupby("Risk_Score", as_index=False)
+            .agg(Rows=("Failing", "size"), Failing_Rows=("Failing", "sum")))
+
+
+def failures_by_sector(raw, results, column="Industry_Code"):
+    """Number of rows and failing rows per NAICS sector of the raw industry codes."""
+    from reference_data import naics_sector, naics_title
+
+    failing = ~results.all(axis=1)
+    sectors = naics_sector(raw[column].to_numpy()).fillna("Unknown")
+    table = (pd.DataFrame({"Sector": sectors.to_numpy(), "Failing": failing.to_numpy()})
+             .groupby("Sector", as_index=False)
+             .agg(Rows=("Failing", "size"), Failing_Rows=("Failing", "sum")))
+    table.insert(1, "Title", table["Sector"].map(naics_title))
+    return table
+
+
+def failing_rows(results, fields=None):
+    """Positions of rows failing any of `fields` (default: any rule)."""
+    subset = results[fields] if fields else results
+    return np.flatnonzero(~subset.all(axis=1).to_numpy())
+
+
+def page_count(n_rows, page_size=DEFAULT_PAGE_SIZE):
+    return max(1, -(-n_rows // page_size))
+
+
+def failure_page(raw, results, positions, page=1, page_size=DEFAULT_PAGE_SIZE, columns=None, extra=None,
+                 skipped=None):
+    """
+    One page of failing rows: the raw values of `columns` plus a Failed_Fields
+    column listing the rules each row failed, and any `extra` columns (e.g.
+    risk and remediation). Rules in `skipped` are not listed as failed.
+    Only this slice is materialised.
+    """
+    start = (page - 1) * page_size
+    rows = positions[start:start + page_size]
+    page_results = results.iloc[rows].to_numpy()
+    if skipped is not None:
+        page_results = page_results | skipped.iloc[rows].to_numpy()
+    failed = [", ".join(results.columns[~values]) for values in page_results]
+    view = raw.iloc[rows][columns] if columns else raw.iloc[rows]
+    view = view.copy()
+    view.insert(0, "Failed_Fields", failed)
+    if extra is not None:
+        for i, col in enumerate(extra.columns, start=1):
+            view.insert(i, col, extra[col].iloc[rows].to_numpy())
+    return view
@@ -3,6 +3,7 @@
 Module for assigning risk scores based on domain logic.
 Modify this file to adapt scoring for different datasets or use cases.
 """
+from anomaly_detection import ANOMALY_THRESHOLD
 
 def assign_risk_score(df):
     def score(row):
@@ -10,6 +11,8 @@ def assign_risk_score(df):
             return "HIGH"
         elif not row.get("Valid_Transaction", True) or not row.get("Valid_Currency", True):
             return "MEDIUM"
+        elif row.get("Anomaly_Score", 0) > ANOMALY_THRESHOLD:
+            return "MEDIUM"
         return "LOW"
 
     df["Risk_Score"] = df.apply(score, axis=1)
@@ -0,0 +1,285 @@
+# rule_engine.py
+"""
+Shared machinery for running validation rules.
+Rules stay plain df -> df functions; the @rule decorator only attaches metadata
+(required columns, MDRM code, severity) so the engine can skip rules whose
+inputs are missing and later stages can report failures by MDRM code.
+
+Simple single-column rules may also declare a `kernel`, a declarative form of
+the same check that non-pandas backends can run without calling the function:
+    ('match', pattern)   regex matching the whole string, like Series.str.fullmatch
+    ('isin', values)     string membership, like .astype(str).isin(values)
+    ('not_empty',)       .astype(str).str.strip().ne("")
+    ('digits',)          str(x).isdigit()
+The backend is chosen with the VALIDATION_BACKEND environment variable
+("pandas" or "arrow") or per call.
+
+Rules can also carry a `scalar` predicate: the same check over plain Python
+values, called with one value per input column. The record-level path
+(record_rules.py) uses it to validate a single record without building a frame.
+Single-column rules with a kernel or scalar run on categorical (dictionary-
+encoded) columns once per distinct value, and the results are broadcast back
+through the category codes. Other single-column scalar rules are factorized
+the same way, and their scalar results are kept in a bounded per-rule LRU cache
+(RULE_MEMO_SIZE entries) that outlives a call, so chunks of a streaming run
+never re-check a value already seen. Rules whose answer changes over time
+(e.g. "not in the future") opt out with memoize=False. Each rule call is timed
+and the memo hit rates are exported (see metrics.py).
+
+Each rule belongs to a tier, run in this order: structural, format, business,
+cross_field. Multi-column rules default to cross_field, the rest to format.
+With apply_rules(..., short_circuit=True) a tier only runs on rows that passed
+every earlier tier; the rest are reported in the Skipped_From_Tier column.
+"""
+import functools
+import os
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from metrics import CACHE_ENTRIES, CACHE_LOOKUPS, REGISTRY, RULE_SECONDS
+
+SEVERITIES = ("error", "warning", "info")
+KERNELS = ("match", "isin", "not_empty", "digits")
+BACKENDS = ("pandas", "arrow")
+TIERS = ("structural", "format", "business", "cross_field")
+SKIPPED_COLUMN = "Skipped_From_Tier"
+
+VALIDATION_BACKEND = os.getenv("VALIDATION_BACKEND", "pandas")
+RULE_MEMO_SIZE = int(os.getenv("RULE_MEMO_SIZE", "65536"))
+
+# Per-rule LRU-cached scalars, shared by every call in the process
+_MEMOS = {}
+
+
+def _collect_memo_stats():
+    infos = [memo.cache_info() for memo in list(_MEMOS.values())]
+    CACHE_LOOKUPS.set_total(sum(i.hits for i in infos), cache="rule_memo", result="hit")
+    CACHE_LOOKUPS.set_total(sum(i.misses for i in infos), cache="rule_memo", result="miss")
+    CACHE_ENTRIES.set(sum(i.currsize for i in infos), cache="rule_memo")
+
+
+REGISTRY.add_collector(_collect_memo_stats)
+
+
+def rule(columns, mdrm=None, severity="error", output=None, kernel=None, scalar=None, tier=None, expected=None,
+         memoize=True):
+    """
+    Attach metadata to a rule function. `output` defaults to the first input
+    column; `expected` describes a passing value for failure reports (kernel
+    rules can leave it out, see expected_constraint).
+    """
+    if severity not in SEVERITIES:
+        raise ValueError(f"Unknown severity {severity!r}; expected one of {SEVERITIES}")
+    if tier is not None and tier not in TIERS:
+        raise ValueError(f"Unknown tier {tier!r}; expected one of {TIERS}")
+    if kernel is not None and kernel[0] not in KERNELS:
+        raise ValueError(f"Unknown kernel {kernel[0]!r}; expected one of {KERNELS}")
+
+    def decorator(func):
+        func.columns = tuple(columns)
+        func.mdrm = mdrm
+        func.severity = severity
+        func.output = output or func.columns[0]
+        func.kernel = kernel
+        func.scalar = scalar
+        func.tier = tier or ("cross_field" if len(func.columns) > 1 else "format")
+        func.expected = expected
+        func.memoize = memoize
+        return func
+    return decorator
+
+
+def required_columns(rule_func):
+    return getattr(rule_func, "columns", ())
+
+
+def has_required_columns(rule_func, columns):
+    return set(required_columns(rule_func)).issubset(columns)
+
+
+def kernel_predicate(kernel):
+    """Scalar form of a rule kernel, taking the value as a string."""
+    if kernel[0] == "match":
+        fullmatch = re.compile(kernel[1]).fullmatch
+        return lambda s: fullmatch(s) is not None
+    if kernel[0] == "isin":
+        return frozenset(kernel[1]).__contains__
+    if kernel[0] == "not_empty":
+        return lambda s: s.strip() != ""
+    return str.isdigit
+
+
+def scalar_predicate(rule_func):
+    """The rule as a predicate over one value per input column, or None if it has neither kernel nor scalar."""
+    kernel = getattr(rule_func, "kernel", None)
+    if kernel is not None:
+        check = kernel_predicate(kernel)
+        return lambda value: check(str(value))
+    return getattr(rule_func, "scalar", None)
+
+
+def memoized_scalar(rule_func):
+    """rule_func.scalar behind a typed LRU cache (1 and 1.0 are cached separately)."""
+    memo = _MEMOS.get(rule_func)
+    if memo is None:
+        memo = _MEMOS[rule_func] = functools.lru_cache(maxsize=RULE_MEMO_SIZE, typed=True)(rule_func.scalar)
+    return memo
+
+
+def dictionary_mask(values, check):
+    """Evaluate check once per category of a categorical Series and broadcast through the codes."""
+    categories = values.cat.categories
+    results = np.fromiter((bool(check(v)) for v in categories), dtype=bool, count=len(categories))
+    # Code -1 marks a missing value, which indexes the appended last entry
+    results = np.append(results, bool(check(np.nan)))
+    return results[values.cat.codes.to_numpy()]
+
+
+def factorized_mask(values, check):
+    """Evaluate check once per distinct value of a Series and map the results back."""
+    codes, uniques = values.factorize()
+    results = np.fromiter((bool(check(v)) for v in uniques.astype(object)), dtype=bool, count=len(uniques))
+    # Placeholder for code -1; missing values are filled in below
+    mask = np.append(results, False)[codes]
+    missing = np.flatnonzero(codes == -1)
+    if len(missing):
+        # None, NaN and pd.NA all factorize to -1 but a check may treat them differently
+        seen = {}
+        for i, value in zip(missing, values.to_numpy(dtype=object)[missing]):
+            if type(value) not in seen:
+                seen[type(value)] = bool(check(value))
+            mask[i] = seen[type(value)]
+    return mask
+
+
+def _per_distinct_value(df, rule_func):
+    """Mask for a single-column kernel/scalar rule computed per distinct value, or None."""
+    if len(rule_func.columns) != 1:
+        return None
+    values = df[rule_func.columns[0]]
+    scalar = getattr(rule_func, "scalar", None)
+    memoize = scalar is not None and getattr(rule_func, "memoize", True)
+    check = memoized_scalar(rule_func) if memoize else scalar_predicate(rule_func)
+    if check is None:
+        return None
+    if values.dtype.name == "category":
+        return dictionary_mask(values, check)
+    # Object columns holding anything but strings may mix 1, 1.0 and True, which factorize as one value
+    if memoize and (values.dtype != object or pd.api.types.infer_dtype(values, skipna=True) == "string"):
+        return factorized_mask(values, check)
+    return None
+
+
+def expected_constraint(rule_func):
+    """Human-readable description of what the rule accepts."""
+    expected = getattr(rule_func, "expected", None)
+    if expected:
+        return expected
+    kernel = getattr(rule_func, "kernel", None)
+    if kernel is None:
+        return rule_func.__name__
+    if kernel[0] == "match":
+        return f"matches {kernel[1]}"
+    if kernel[0] == "isin":
+        return "one of " + ", ".join(kernel[1])
+    if kernel[0] == "not_empty":
+        return "not empty"
+    return "digits only"
+
+
+def passed(values):
+    """Rule outputs (Series or frame) as bools: truthy and not NA, so skipped rows don't pass."""
+    return values.notna() & values.astype(bool)
+
+
+def rule_tier(rule_func):
+    return getattr(rule_func, "tier", "format")
+
+
+def runnable_rules(rules, columns):
+    """The rules apply_rules would run on these columns, counting outputs of earlier rules."""
+    available = set(columns)
+    runnable = []
+    for rule_func in rules:
+        if has_required_columns(rule_func, available):
+            runnable.append(rule_func)
+            available.add(rule_func.output)
+    return runnable
+
+
+def assign_columns(df, columns):
+    """
+    df with every column in `columns` (name -> values) set at once; one concat
+    instead of a block insert per column, which fragments wide frames.
+    """
+    if not columns:
+        return df
+    order = list(dict.fromkeys([*df.columns, *columns]))
+    new = pd.DataFrame(columns, index=df.index)
+    return pd.concat([df.drop(columns=[c for c in columns if c in df.columns]), new], axis=1)[order]
+
+
+def apply_rules(df, rules, backend=None, short_circuit=False):
+    """
+    Run each rule in order, skipping rules whose input columns are absent.
+    With short_circuit the rules run tier by tier instead (see apply_tiers).
+    """
+    backend = backend or VALIDATION_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown validation backend {backend!r}; expected one of {BACKENDS}")
+    if short_circuit:
+        return apply_tiers(df, rules, backend)
+    if backend == "arrow":
+        from arrow_backend import apply_rules_arrow
+
+        return apply_rules_arrow(df, rules)
+
+    # Masks are held back and assigned together, flushed before any rule that
+    # reads one of them or runs its own body
+    masks = {}
+    for rule_func in rules:
+        if has_required_columns(rule_func, [*df.columns, *masks]):
+            start = time.perf_counter()
+            if masks.keys() & set(rule_func.columns):
+                df, masks = assign_columns(df, masks), {}
+            mask = _per_distinct_value(df, rule_func)
+            if mask is None:
+                df, masks = assign_columns(df, masks), {}
+                df = rule_func(df)
+            else:
+                masks[rule_func.output] = mask
+            RULE_SECONDS.observe(time.perf_counter() - start, rule=rule_func.__name__)
+    return assign_columns(df, masks)
+
+
+def apply_tiers(df, rules, backend=None):
+    """
+    Run rules one tier at a time, each tier only on rows that passed every rule
+    of the earlier tiers. Skipped rows are not counted as passing: their outputs
+    for the skipped rules are NA and SKIPPED_COLUMN names the first tier they
+    skipped (None for rows that ran every tier).
+    """
+    skipped = np.full(len(df), None, dtype=object)
+    active = np.ones(len(df), dtype=bool)
+    ran = active.copy()
+    for tier in TIERS:
+        tier_rules = runnable_rules([r for r in rules if rule_tier(r) == tier], df.columns)
+        if not tier_rules:
+            continue
+        # Rows that failed the previous tier stop here
+        skipped[ran & ~active] = tier
+        ran = active.copy()
+        outputs = list(dict.fromkeys(r.output for r in tier_rules))
+        if active.all():
+            df = apply_rules(df, tier_rules, backend)
+        elif active.any():
+            subset = apply_rules(df[active].copy(), tier_rules, backend)
+            df = assign_columns(df, {col: subset[col].reindex(df.index) for col in outputs})
+        else:
+            df = assign_columns(df, {col: pd.Series(None, index=df.index, dtype=object) for col in outputs})
+        active &= passed(df[outputs]).all(axis=1).to_numpy()
+    df[SKIPPED_COLUMN] = skipped
+    return df
@@ -0,0 +1,210 @@
+# rule_generation.py
+"""
+Turns natural-language rule requests into validation rules via GPT.
+The LLM only returns a small JSON rule spec (never Python). The spec is checked
+against the dataset's columns, compiled into a vectorized pandas check with the
+same df -> df shape as the built-in rules, and cached by prompt hash so the
+same request is only sent to the model once.
+"""
+import hashlib
+import json
+import operator
+import os
+import re
+
+import pandas as pd
+
+import custom_rules
+import rule_engine
+from metrics import CACHE_LOOKUPS, llm_request
+
+RULE_CACHE_DIR = os.getenv("RULE_CACHE_DIR", os.path.join(os.path.dirname(__file__), ".rule_cache"))
+
+CHECKS = {"regex", "allowed_values", "range", "not_empty", "date", "compare"}
+
+COMPARE_OPS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+RULE_PROMPT = """You write data validation rules for a corporate loan dataset.
+Available columns: {columns}
+
+Reply with a single JSON object and nothing else, using this shape:
+{{"name": "<Short_Name>", "column": "<column>", "check": "<check>", ...}}
+
+Allowed checks and their extra keys:
+- "regex": "pattern" (full-match regular expression)
+- "allowed_values": "values" (list of allowed values)
+- "range": "min" and/or "max" (numbers, inclusive)
+- "not_empty": no extra keys
+- "date": "format" (strftime format, default "%Y-%m-%d"), optional "not_future": true
+- "compare": "op" (one of < <= > >= == !=) and "other_column"
+Any check may add "allow_na": true to accept the literal value 'NA'.
+
+Rule request: {request}
+"""
+
+# (spec, compiled rule) by prompt hash, so reruns in the same process skip the disk too
+_RULE_CACHE = {}
+
+
+def prompt_hash(request):
+    normalized = " ".join(request.split()).lower()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def parse_rule_spec(text):
+    """Pull the JSON object out of an LLM reply (which may wrap it in a code fence)."""
+    match = re.search(r"\{.*\}", text, re.DOTALL)
+    if not match:
+        raise ValueError("LLM response does not contain a JSON rule spec")
+    return json.loads(match.group(0))
+
+
+def validate_rule_spec(spec, columns):
+    """
+    Reject specs that reference unknown columns or checks, or whose options
+    don't parse; always with a ValueError naming the field. Returns the spec.
+    """
+    if not isinstance(spec, dict):
+        raise ValueError(f"Rule spec must be a JSON object, got {type(spec).__name__}")
+    columns = set(columns)
+    name = str(spec.get("name", ""))
+    if not re.match(r"^[A-Za-z][A-Za-z0-9_]*$", name):
+        raise ValueError(f"Invalid rule name: {name!r}")
+    check = spec.get("check")
+    if check not in CHECKS:
+        raise ValueError(f"Unknown check {check!r}; expected one of {sorted(CHECKS)}")
+    if spec.get("column") not in columns:
+        raise ValueError(f"Unknown column {spec.get('column')!r}")
+
+    if check == "regex":
+        try:
+            re.compile(spec["pattern"])
+        except KeyError:
+            raise ValueError("regex check needs a 'pattern'") from None
+        except (re.error, TypeError) as e:
+            raise ValueError(f"Invalid 'pattern' {spec['pattern']!r}: {e}") from e
+    elif check == "allowed_values":
+        if not isinstance(spec.get("values"), list) or not spec["values"]:
+            raise ValueError("allowed_values check needs a non-empty 'values' list")
+    elif check == "range":
+        if spec.get("min") is None and spec.get("max") is None:
+            raise ValueError("range check needs 'min' or 'max'")
+        for key in ("min", "max"):
+            if spec.get(key) is not None:
+                try:
+                    float(spec[key])
+                except (TypeError, ValueError) as e:
+                    raise ValueError(f"'{key}' must be a number, got {spec[key]!r}") from e
+    elif check == "date":
+        if not isinstance(spec.get("format", "%Y-%m-%d"), str):
+            raise ValueError(f"'format' must be a strftime string, got {spec['format']!r}")
+    elif check == "compare":
+        if spec.get("op") not in COMPARE_OPS:
+            raise ValueError(f"Unknown comparison operator {spec.get('op')!r}")
+        if spec.get("other_column") not in columns:
+            raise ValueError(f"Unknown column {spec.get('other_column')!r}")
+    return spec
+
+
+def compile_rule(spec):
+    """Build a vectorized rule function from a validated spec."""
+    column = spec["column"]
+    check = spec["check"]
+    output = f"Valid_{spec['name']}"
+
+    def evaluate(df):
+        values = df[column]
+        if check == "regex":
+            return values.astype(str).str.fullmatch(spec["pattern"])
+        if check == "allowed_values":
+            return values.astype(str).str.strip().isin([str(v) for v in spec["values"]])
+        if check == "range":
+            nums = pd.to_numeric(values, errors="coerce")
+            mask = nums.notna()
+            if spec.get("min") is not None:
+                mask &= nums >= float(spec["min"])
+            if spec.get("max") is not None:
+                mask &= nums <= float(spec["max"])
+            return mask
+        if check == "not_empty":
+            return values.notna() & values.astype(str).str.strip().ne("")
+        if check == "date":
+            dates = pd.to_datetime(values.astype(str), format=spec.get("format", "%Y-%m-%d"), errors="coerce")
+            mask = dates.notna()
+            if spec.get("not_future"):
+                mask &= dates <= pd.Timestamp.today()
+            return mask
+        left = pd.to_numeric(values, errors="coerce")
+        right = pd.to_numeric(df[spec["other_column"]], errors="coerce")
+        return COMPARE_OPS[spec["op"]](left, right) & left.notna() & right.notna()
+
+    def rule(df):
+        mask = rule_engine.passed(evaluate(df))
+        if spec.get("allow_na"):
+            mask |= df[column].astype(str).str.strip().str.upper().eq("NA")
+        df[output] = mask
+        return df
+
+    rule.__name__ = f"validate_{spec['name'].lower()}"
+    rule.spec = spec
+    columns = [column] + ([spec["other_column"]] if check == "compare" else [])
+    return rule_engine.rule(columns, severity=spec.get("severity", "error"), output=output)(rule)
+
+
+def _load_cached_spec(key):
+    path = os.path.join(RULE_CACHE_DIR, f"{key}.json")
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            try:
+                return json.load(f)
+            except ValueError:
+                # A truncated or hand-edited file is regenerated
+                return None
+    return None
+
+
+def _store_cached_spec(key, spec):
+    os.makedirs(RULE_CACHE_DIR, exist_ok=True)
+    with open(os.path.join(RULE_CACHE_DIR, f"{key}.json"), "w", encoding="utf-8") as f:
+        json.dump(spec, f, indent=2)
+
+
+def generate_rule(request, llm, columns, register=True):
+    """
+    Return a compiled rule for a natural-language request.
+    The LLM is only called on a cache miss; the result is registered in
+    custom_rules.GENERATED_RULES unless register=False. A cached spec that
+    is not valid for `columns` (e.g. one made for another submission's
+    columns) counts as a miss and is replaced.
+    """
+    key = prompt_hash(request)
+    cached = _RULE_CACHE.get(key)
+    spec = cached[0] if cached else _load_cached_spec(key)
+    if spec is not None:
+        try:
+            validate_rule_spec(spec, columns)
+        except ValueError:
+            spec = cached = None
+    CACHE_LOOKUPS.inc(cache="rule_generation", result="miss" if spec is None else "hit")
+    if spec is None:
+        with llm_request("rule_generation"):
+            response = llm.invoke(RULE_PROMPT.format(columns=", ".join(columns), request=request))
+        spec = parse_rule_spec(getattr(response, "content", response))
+        validate_rule_spec(spec, columns)
+        _store_cached_spec(key, spec)
+    if cached:
+        rule = cached[1]
+    else:
+        rule = compile_rule(spec)
+        _RULE_CACHE[key] = (spec, rule)
+
+    if register:
+        custom_rules.register_generated_rule(rule)
+    return rule
@@ -0,0 +1,243 @@
+# validation_service.py
+"""
+ASGI validation service around the rule engine.
+    POST /validate/record  one JSON record -> its failed fields
+                           (compiled record path, or micro-batched with
+                           SERVICE_RECORD_MODE=batch)
+    POST /validate/bulk    CSV, NDJSON or Arrow IPC stream -> NDJSON results,
+                           streamed back batch by batch as the body arrives.
+                           A bad batch_size or a malformed first batch is a
+                           400; a malformed later batch ends the stream with
+                           an {"error": ...} line
+    GET  /metrics          the metrics registry's run summary (see metrics.py),
+                           including request latency per endpoint and rows
+                           validated by the service
+    GET  /metrics/prometheus  every metric in the Prometheus text format
+Rules are resolved once at startup and batches run in a thread pool, so the
+event loop keeps reading the request while earlier batches validate.
+
+Run with: uvicorn validation_service:app
+"""
+import asyncio
+import io
+import json
+import os
+import time
+
+import anyio
+import pandas as pd
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from corporate_loan_rules import CORPORATE_LOAN_RULES
+from custom_rules import CUSTOM_RULES, GENERATED_RULES
+import record_rules
+from metrics import PROMETHEUS_CONTENT_TYPE, REGISTRY, ROWS, prometheus_text, run_summary
+
+BATCH_SIZE = int(os.getenv("SERVICE_BATCH_SIZE", "5000"))
+MAX_WORKERS = int(os.getenv("SERVICE_WORKERS", str(os.cpu_count() or 2)))
+RECORD_MODE = os.getenv("SERVICE_RECORD_MODE", "compiled")
+MICRO_BATCH_SIZE = int(os.getenv("SERVICE_MICRO_BATCH_SIZE", "256"))
+MICRO_BATCH_WAIT_MS = float(os.getenv("SERVICE_MICRO_BATCH_WAIT_MS", "5"))
+
+REQUEST_SECONDS = REGISTRY.histogram("profiler_service_request_seconds", "Validation service latency per endpoint",
+                                     ["endpoint"])
+
+
+def _observe(endpoint, seconds, rows):
+    REQUEST_SECONDS.observe(seconds, endpoint=endpoint)
+    ROWS.inc(rows, stage="service")
+
+
+RULES = CORPORATE_LOAN_RULES + CUSTOM_RULES
+# Caps how many batches validate at once across all requests
+_LIMITER = anyio.CapacityLimiter(MAX_WORKERS)
+
+
+def validate_frame(df):
+    """Failed result columns per row, as {"row", "valid", "failures"} dicts."""
+    return record_rules.validate_frame(df, RULES + GENERATED_RULES)
+
+
+_BATCHER = (record_rules.MicroBatcher(validate_frame, MICRO_BATCH_SIZE, MICRO_BATCH_WAIT_MS)
+            if RECORD_MODE == "batch" else None)
+
+
+async def _run_batch(df):
+    return await anyio.to_thread.run_sync(validate_frame, df, limiter=_LIMITER)
+
+
+def _bad_request(message):
+    return JSONResponse({"error": message}, status_code=400)
+
+
+async def validate_record(request: Request):
+    start = time.perf_counter()
+    try:
+        record = await request.json()
+    except ValueError as e:
+        return _bad_request(f"Malformed JSON: {e}")
+    if not isinstance(record, dict):
+        return _bad_request("The record must be a JSON object")
+    if _BATCHER is not None:
+        result = await asyncio.wrap_future(_BATCHER.submit(record))
+    else:
+        # Compiled predicates take well under a millisecond, so no thread hop
+        result = record_rules.check_record(record, RULES + GENERATED_RULES)
+    _observe("record", time.perf_counter() - start, 1)
+    return JSONResponse(result)
+
+
+class _RequestBody(io.RawIOBase):
+    """Blocking file-like view of the request body, for a parser running in a worker thread."""
+
+    def __init__(self, request):
+        self._chunks = request.stream()
+        self._pending = b""
+
+    async def _next_chunk(self):
+        return await self._chunks.__anext__()
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self._pending:
+            try:
+                self._pending = anyio.from_thread.run(self._next_chunk)
+            except StopAsyncIteration:
+                return 0
+        n = min(len(buffer), len(self._pending))
+        buffer[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+
+async def _csv_batches(request, batch_size):
+    # pandas parses the stream itself, so quoted fields may span lines; chunks keep running row numbers
+    body = io.BufferedReader(_RequestBody(request))
+    try:
+        reader = await anyio.to_thread.run_sync(lambda: pd.read_csv(body, chunksize=batch_size))
+    except pd.errors.EmptyDataError:
+        return
+    with reader:
+        while (df := await anyio.to_thread.run_sync(next, reader, None)) is not None:
+            yield df
+
+
+def _ndjson_record(line):
+    record = json.loads(line)
+    if not isinstance(record, dict):
+        raise ValueError(f"expected a JSON object per line, got {line[:50]!r}")
+    return record
+
+
+async def _ndjson_batches(request, batch_size):
+    buffer, offset, remainder = [], 0, b""
+    async for chunk in request.stream():
+        lines = (remainder + chunk).split(b"\n")
+        remainder = lines.pop()
+        for line in lines:
+            if line.strip():
+                buffer.append(_ndjson_record(line))
+            if len(buffer) >= batch_size:
+                yield pd.DataFrame(buffer, index=range(offset, offset + len(buffer)))
+                offset += len(buffer)
+                buffer = []
+    if remainder.strip():
+        buffer.append(_ndjson_record(remainder))
+    if buffer:
+        yield pd.DataFrame(buffer, index=range(offset, offset + len(buffer)))
+
+
+async def _arrow_batches(request, batch_size):
+    # Like _csv_batches: the IPC reader pulls the stream from a worker thread, one record batch at a time
+    import pyarrow as pa
+
+    body = io.BufferedReader(_RequestBody(request))
+    reader = await anyio.to_thread.run_sync(pa.ipc.open_stream, body)
+    offset = 0
+    while (batch := await anyio.to_thread.run_sync(next, reader, None)) is not None:
+        for start in range(0, batch.num_rows, batch_size):
+            df = batch.slice(start, batch_size).to_pandas()
+            df.index += offset
+            offset += len(df)
+            yield df
+
+
+PARSERS = {
+    "text/csv": _csv_batches,
+    "application/x-ndjson": _ndjson_batches,
+    "application/vnd.apache.arrow.stream": _arrow_batches,
+}
+
+
+class BulkValidation:
+    """
+    Raw ASGI endpoint: StreamingResponse listens for disconnects by calling
+    receive(), which would steal request body chunks still being parsed, so the
+    request is read and the response written here in the same loop.
+    """
+
+    async def __call__(self, scope, receive, send):
+        request = Request(scope, receive)
+        content_type = request.headers.get("content-type", "text/csv").split(";")[0].strip()
+        parser = PARSERS.get(content_type)
+        if parser is None:
+            response = JSONResponse({"error": f"Unsupported content type {content_type!r}",
+                                     "supported": sorted(PARSERS)}, status_code=415)
+            return await response(scope, receive, send)
+        try:
+            batch_size = int(request.query_params.get("batch_size", BATCH_SIZE))
+        except ValueError:
+            batch_size = 0
+        if batch_size < 1:
+            return await _bad_request("batch_size must be a positive integer")(scope, receive, send)
+
+        batches = parser(request, batch_size)
+        try:
+            # The first batch is parsed before the 200 goes out, so an unreadable body is still a 400
+            try:
+                df = await batches.__anext__()
+            except StopAsyncIteration:
+                df = None
+            except ValueError as e:
+                return await _bad_request(f"Malformed {content_type} body: {e}")(scope, receive, send)
+
+            await send({"type": "http.response.start", "status": 200,
+                        "headers": [(b"content-type", b"application/x-ndjson")]})
+            while df is not None:
+                start = time.perf_counter()
+                records = await _run_batch(df)
+                _observe("bulk_batch", time.perf_counter() - start, len(records))
+                body = "".join(json.dumps(r) + "\n" for r in records).encode("utf-8")
+                await send({"type": "http.response.body", "body": body, "more_body": True})
+                try:
+                    df = await batches.__anext__()
+                except StopAsyncIteration:
+                    df = None
+                except ValueError as e:
+                    error = json.dumps({"error": f"Malformed {content_type} body: {e}"}) + "\n"
+                    await send({"type": "http.response.body", "body": error.encode("utf-8"), "more_body": True})
+                    df = None
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            await batches.aclose()
+
+
+async def metrics(request: Request):
+    return JSONResponse(run_summary())
+
+
+async def prometheus_metrics(request: Request):
+    return Response(prometheus_text(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+app = Starlette(routes=[
+    Route("/validate/record", validate_record, methods=["POST"]),
+    Route("/validate/bulk", BulkValidation(), methods=["POST"]),
+    Route("/metrics", metrics, methods=["GET"]),
+    Route("/metrics/prometheus", prometheus_metrics, methods=["GET"]),
+])
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+from anomaly_detection import score_anomalies, mahalanobis_scores, ANOMALY_THRESHOLD
+
+def _portfolio(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "Industry_Code": ["5412"] * n,
+        "Utilized_Exposure": rng.normal(3_500_000, 100_000, n),
+        "Interest_Rate_Spread": rng.normal(0.015, 0.001, n),
+        "Probability_of_Default": rng.normal(0.01, 0.001, n),
+    })
+
+def test_outlier_scores_above_threshold():
+    df = _portfolio()
+    df.loc[0, "Utilized_Exposure"] = 9_000_000
+    df = score_anomalies(df)
+    assert df.loc[0, "Anomaly_Score"] > ANOMALY_THRESHOLD
+    assert df["Anomaly_Score"].iloc[1:].median() < ANOMALY_THRESHOLD
+
+def test_na_values_and_missing_columns():
+    df = pd.DataFrame({"Industry_Code": ["5412", "5412"], "Probability_of_Default": ["NA", "0.01"]})
+    df = score_anomalies(df)
+    assert df["Anomaly_Score"].notna().all()
+
+def test_groups_scored_independently():
+    a, b = _portfolio(seed=1), _portfolio(seed=2)
+    b["Industry_Code"] = "3361"
+    b["Utilized_Exposure"] *= 100
+    X = pd.concat([a, b])[["Utilized_Exposure", "Interest_Rate_Spread", "Probability_of_Default"]].to_numpy()
+    scores = mahalanobis_scores(X, pd.concat([a, b])["Industry_Code"].to_numpy())
+    assert np.median(scores) < ANOMALY_THRESHOLD
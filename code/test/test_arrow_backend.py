@@ -0,0 +1,47 @@
+import os
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from corporate_loan_rules import CORPORATE_LOAN_RULES, validate_zip_code
+from metrics import RULE_SECONDS
+from rule_engine import apply_rules
+
+def assert_same_results(actual, expected):
+    # Some pandas rules return re.Match objects rather than booleans; compare truthiness
+    assert list(actual.columns) == list(expected.columns)
+    for col in expected.columns:
+        assert actual[col].astype(bool).tolist() == expected[col].astype(bool).tolist(), col
+
+SAMPLE = os.path.join(os.path.dirname(__file__), "..", "assets", "sample_validation_input_10rows.csv")
+
+def test_parity_with_pandas_on_sample():
+    expected = apply_rules(pd.read_csv(SAMPLE), CORPORATE_LOAN_RULES, backend="pandas")
+    actual = apply_rules(pd.read_csv(SAMPLE), CORPORATE_LOAN_RULES, backend="arrow")
+    assert_same_results(actual, expected)
+
+def test_parity_with_pandas_on_bad_values():
+    raw = pd.DataFrame({
+        "Customer_ID": ["C1", "A,B", None, "C1\n"],
+        "TIN": ["123456789\n", "12-3456789", "NA", "NA\n"],
+        "Country": ["US", "usa", "GB", None],
+        "Zip_Code": [10001, 123, 99999, 1234567],
+        "City": ["  ", "Boston", None, "NY"],
+        "Industry_Code_Type": ["1", "4", "3", None],
+        "Net_Sales_Current": ["100", "1.5", "-3", None],
+    })
+    expected = apply_rules(raw.copy(), CORPORATE_LOAN_RULES, backend="pandas")
+    actual = apply_rules(raw.copy(), CORPORATE_LOAN_RULES, backend="arrow")
+    assert_same_results(actual, expected)
+    assert actual["Customer_ID"].tolist() == [True, False, True, False]
+    assert actual["TIN"].tolist() == [False, True, True, False]
+
+def test_arrow_rules_are_timed():
+    before = RULE_SECONDS.count(rule="validate_zip_code")
+    apply_rules(pd.DataFrame({"Zip_Code": ["12345", "1234\n"]}), [validate_zip_code], backend="arrow")
+    assert RULE_SECONDS.count(rule="validate_zip_code") == before + 1
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        apply_rules(pd.DataFrame(), CORPORATE_LOAN_RULES, backend="spark")
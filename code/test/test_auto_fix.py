@@ -0,0 +1,33 @@
+import pandas as pd
+from auto_fix import apply_fixes, revert
+from corporate_loan_rules import CORPORATE_LOAN_RULES
+from custom_rules import CUSTOM_RULES
+
+RULES = CORPORATE_LOAN_RULES + CUSTOM_RULES
+
+
+def _frame():
+    return pd.DataFrame({
+        "Customer_ID": [" CUST1\n", "CUST2", "CUST3"],
+        "Credit_Facility_Currency": ["usd", "EUR", "xyz"],
+        "Origination_Date": ["05/19/2018", "2018-05-19", "13/45/2018"],
+        "Maturity_Date": ["9999-12-31", "9999-01-01", "2030-01-01"],
+        "Committed_Exposure": ["1,250,000.50", 100, "lots"],
+    })
+
+
+def test_fixes_only_mechanical_errors_that_then_pass():
+    df, diff = apply_fixes(_frame(), RULES)
+    assert list(df["Customer_ID"]) == ["CUST1", "CUST2", "CUST3"]
+    assert list(df["Credit_Facility_Currency"]) == ["USD", "EUR", "xyz"]
+    assert list(df["Origination_Date"]) == ["2018-05-19", "2018-05-19", "13/45/2018"]
+    assert list(df["Maturity_Date"]) == ["9999-01-01", "9999-01-01", "2030-01-01"]
+    assert list(df["Committed_Exposure"]) == [1250000.5, 100, "lots"]
+    assert len(diff) == 5 and set(diff["Row"]) == {0}
+    assert diff.set_index("Field").loc["Origination_Date", "Before"] == "05/19/2018"
+
+
+def test_revert_restores_the_original_values():
+    original = _frame()
+    df, diff = apply_fixes(original.copy(), RULES)
+    assert revert(df, diff).astype(str).equals(original.astype(str))
@@ -0,0 +1,94 @@
+import json
+import os
+import shutil
+
+import pandas as pd
+
+from batch_validation import validate_files
+
+SAMPLE = os.path.join(os.path.dirname(__file__), "..", "assets", "sample_validation_input_10rows.csv")
+
+
+def test_files_validated_and_consolidated(tmp_path):
+    first, second = tmp_path / "entity_a.csv", tmp_path / "entity_b.csv"
+    shutil.copy(SAMPLE, first)
+    # The second file repeats two loans of the first and one of its own
+    df = pd.read_csv(SAMPLE)
+    pd.concat([df.head(3), df.iloc[[2]]]).to_csv(second, index=False)
+
+    summary = validate_files([str(first), str(second)], str(tmp_path / "out"), max_workers=2, use_processes=False)
+    files = summary["files"].set_index("File")
+    assert files.loc[str(first), "Rows"] == 10
+    assert files.loc[str(second), "Rows"] == 4
+    assert files.loc[str(second), "Duplicate_Keys"] == 1
+    assert files["Error"].isna().all()
+    assert len(summary["duplicates"]) == files.loc[str(second), "Cross_File_Duplicates"] == 3
+    assert summary["failures"]["Failures"].sum() == files["Failures"].sum()
+    assert os.path.exists(tmp_path / "out" / "entity_b_validated.csv")
+    assert os.path.exists(tmp_path / "out" / "summary.csv")
+    with open(tmp_path / "out" / "metrics.json") as f:
+        assert json.load(f)["rows"] == 14
+
+    # An explicit worker count stands even when the memory plan would run fewer
+    summary = validate_files([str(first), str(second)], str(tmp_path / "out2"), max_workers=2, use_processes=False,
+                             memory_limit=1)
+    assert summary["decisions"].iloc[0]["Workers"] == 2
+
+
+def test_unreadable_file_reported(tmp_path):
+    missing = str(tmp_path / "missing.csv")
+    good = tmp_path / "good.csv"
+    shutil.copy(SAMPLE, good)
+    open(missing, "w").close()
+    summary = validate_files([str(good), missing], str(tmp_path / "out"), use_processes=False)
+    errors = summary["files"].set_index("File")["Error"]
+    assert pd.isna(errors[str(good)]) and errors[missing]
+
+
+def test_same_file_name_in_different_directories(tmp_path):
+    east, west = tmp_path / "east" / "loans.csv", tmp_path / "west" / "loans.csv"
+    for path in (east, west):
+        path.parent.mkdir()
+        shutil.copy(SAMPLE, path)
+    summary = validate_files([str(east), str(west)], str(tmp_path / "out"), use_processes=False)
+    outputs = summary["files"].set_index("File")["Output"]
+    assert outputs[str(east)].endswith("east_loans_validated.csv")
+    assert outputs[str(west)].endswith("west_loans_validated.csv")
+    assert all(os.path.exists(path) for path in outputs)
+    assert set(summary["duplicates"]["Files"]) == {f"{east}, {west}"}
+
+
+
+def test_large_file_split_across_workers(tmp_path, monkeypatch):
+    import batch_validation
+
+    big = tmp_path / "big.csv"
+    df = pd.read_csv(SAMPLE)
+    pd.concat([df, df.head(2)]).to_csv(big, index=False)
+    whole = validate_files([str(big)], str(tmp_path / "whole"), max_workers=1, use_processes=False, auto_fix=True)
+    monkeypatch.setattr(batch_validation, "MIN_PART_ROWS", 4)
+    split = validate_files([str(big)], str(tmp_path / "split"), max_workers=3, use_processes=False, auto_fix=True)
+
+    for column in ("Rows", "Failing_Rows", "Failures", "Duplicate_Keys", "Auto_Fixed"):
+        assert split["files"].loc[0, column] == whole["files"].loc[0, column], column
+    for name in ("big_validated.csv", "big_validated_fixes.csv"):
+        pd.testing.assert_frame_equal(pd.read_csv(tmp_path / "split" / name), pd.read_csv(tmp_path / "whole" / name))
+    assert sorted(os.listdir(tmp_path / "split")) == sorted(os.listdir(tmp_path / "whole"))
+
+
+def test_pool_scales_down_when_workers_run_out_of_memory(tmp_path, monkeypatch):
+    import batch_validation
+    import resource_governor
+
+    big = tmp_path / "big.csv"
+    df = pd.read_csv(SAMPLE)
+    pd.concat([df, df.head(2)]).to_csv(big, index=False)
+    monkeypatch.setattr(batch_validation, "MIN_PART_ROWS", 2)
+    monkeypatch.setattr(resource_governor, "plan_workers",
+                        lambda paths, validate, limit, workers: (2, limit // 2, 1000.0, {"File": "(plan)"}))
+    # Every chunk is over a 1-byte budget, so the first part back drops a worker
+    summary = validate_files([str(big)], str(tmp_path / "out"), use_processes=False, memory_limit=1)
+    scaled = summary["decisions"][(summary["decisions"]["Decision"] == "workers") &
+                                  (summary["decisions"]["File"] == str(big))]
+    assert scaled["Workers"].tolist() == [1]
+    assert summary["files"].loc[0, "Rows"] == 12
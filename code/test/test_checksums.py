@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+
+from checksums import cusip_mask, is_valid_cusip, is_valid_lei, lei_mask
+from corporate_loan_rules import validate_cusip, validate_obligor_lei
+from rule_engine import apply_rules
+
+VALUES = ["HWUPKR0MPOU8FGXBT394", "HWUPKR0MPOU8FGXBT395", "5493001KJTIIGC8Y1R12", "hwupkr0mpou8fgxbt394",
+          "037833100", "037833101", "38259P508", "38259P50", "NA", None, np.nan, 37833100, "ÄBC"]
+
+
+def test_vectorized_checks_match_scalar_checks():
+    assert lei_mask(VALUES).tolist() == [is_valid_lei(v) for v in VALUES]
+    assert cusip_mask(VALUES).tolist() == [is_valid_cusip(v) for v in VALUES]
+    assert lei_mask(VALUES)[:3].tolist() == [True, False, True]
+    assert cusip_mask(VALUES)[4:8].tolist() == [True, False, True, False]
+
+
+def test_identifier_rules_use_check_digits():
+    df = pd.DataFrame({"Obligor_LEI": ["HWUPKR0MPOU8FGXBT394", "HWUPKR0MPOU8FGXBT395", "NA", None],
+                       "CUSIP": ["037833100", "037833101", "ABC000", "NA"]})
+    expected = {"Obligor_LEI": [True, False, True, False], "CUSIP": [True, False, True, True]}
+    out = apply_rules(df.copy(), [validate_obligor_lei, validate_cusip])
+    assert {c: out[c].tolist() for c in expected} == expected
+    # Categoricals are checked per category through the scalar form
+    out = apply_rules(df.astype("category"), [validate_obligor_lei, validate_cusip])
+    assert {c: out[c].tolist() for c in expected} == expected
@@ -0,0 +1,44 @@
+import itertools
+import mmap
+import os
+
+import pandas as pd
+
+from column_store import ColumnStore
+from ingestion import write_store
+
+SAMPLE = os.path.join(os.path.dirname(__file__), "..", "assets", "sample_validation_input_10rows.csv")
+
+
+def _mapped(array):
+    # A view of the file mapping, not a copy of it
+    while array is not None and not isinstance(array, mmap.mmap):
+        array = getattr(array, "base", None)
+    return array is not None
+
+
+def test_read_maps_columns_without_copying(tmp_path):
+    chunks = [pd.DataFrame({"Customer_ID": ["C1", None], "Committed_Exposure": [5, 10], "City": ["Austin", "Austin"]}),
+              pd.DataFrame({"Customer_ID": ["C3", "C4"], "Committed_Exposure": [2.5, 1.0], "City": [None, "Boston"]})]
+    store = ColumnStore.write(str(tmp_path), chunks, dictionary_columns=["City"])
+    df = store.read(start=1, stop=4)
+    assert df.index.tolist() == [1, 2, 3]
+    assert df["Committed_Exposure"].tolist() == [10.0, 2.5, 1.0]
+    assert pd.isna(df.loc[1, "Customer_ID"]) and df.loc[2, "Customer_ID"] == "C3"
+    assert df["City"].cat.categories.tolist() == ["Austin", "Boston"] and pd.isna(df.loc[2, "City"])
+    assert _mapped(df["Committed_Exposure"].to_numpy()) and _mapped(df["City"].cat.codes.to_numpy())
+
+    # Changes to one read reach neither the file nor later reads
+    df.loc[2, "Committed_Exposure"] = -1
+    assert store.read(start=2, stop=3)["Committed_Exposure"].tolist() == [2.5]
+
+
+def test_store_reads_like_the_csv(tmp_path):
+    store = write_store(SAMPLE, str(tmp_path), chunk_size=3)
+    expected = pd.read_csv(SAMPLE)
+    df = store.read()
+    assert df.columns.tolist() == expected.columns.tolist()
+    for column in expected.columns:
+        assert df[column].astype(object).where(df[column].notna(), None).tolist() == \
+            expected[column].astype(object).where(expected[column].notna(), None).tolist(), column
+    assert [len(chunk) for chunk in store.chunks(itertools.repeat(4), start=1)] == [4, 4, 1]
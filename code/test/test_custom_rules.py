@@ -1,5 +1,6 @@
 import pandas as pd
-from custom_rules import validate_transaction_amount, validate_currency_format, validate_transaction_date
+import custom_rules
+from custom_rules import validate_transaction_amount, validate_currency_format, validate_transaction_date, apply_custom_rules
 
 def test_validate_transaction_amount():
     df = pd.DataFrame([{"Transaction_Amount": 100, "Reported_Amount": 101}])
@@ -15,4 +16,34 @@ def test_validate_currency_format():
 def test_validate_transaction_date():
     df = pd.DataFrame([{"Transaction_Date": "2100-01-01"}])
     df = validate_transaction_date(df)
-    assert df.loc[0, "Valid_Transaction_Date"] == False
\ No newline at end of file
+    assert df.loc[0, "Valid_Transaction_Date"] == False
+
+def test_apply_custom_rules_skips_rules_with_missing_columns():
+    df = pd.DataFrame([{"Currency": "USD"}])
+    df = apply_custom_rules(df)
+    assert df.loc[0, "Valid_Currency"] == True
+    assert "Valid_Transaction" not in df.columns
+
+def test_rule_pack_loaded_only_when_columns_present(tmp_path, monkeypatch):
+    (tmp_path / "spread_pack.py").write_text(
+        "from rule_engine import rule\n"
+        "REQUIRED_COLUMNS = ['Interest_Rate_Spread']\n"
+        "LOADED = True\n"
+        "@rule(['Interest_Rate_Spread'], mdrm='CLCOM303', severity='warning', output='Valid_Spread')\n"
+        "def validate_spread(df):\n"
+        "    df['Valid_Spread'] = df['Interest_Rate_Spread'].abs() < 0.1\n"
+        "    return df\n"
+        "RULES = [validate_spread]\n"
+    )
+    monkeypatch.setattr(custom_rules, "RULE_PACKS_DIR", str(tmp_path))
+    # Restored on teardown, so the pack doesn't leak into later tests
+    monkeypatch.setattr(custom_rules, "_RULE_PACKS", None)
+    packs = custom_rules.discover_rule_packs(refresh=True)
+    assert packs[0].required_columns == ("Interest_Rate_Spread",)
+
+    apply_custom_rules(pd.DataFrame([{"Currency": "USD"}]))
+    assert packs[0]._rules is None
+
+    df = apply_custom_rules(pd.DataFrame([{"Interest_Rate_Spread": 0.015}]))
+    assert df.loc[0, "Valid_Spread"] == True
+    assert packs[0].load()[0].severity == "warning"
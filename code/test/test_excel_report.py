@@ -0,0 +1,61 @@
+import pandas as pd
+import pytest
+
+from excel_report import ExcelReport, write_report
+from results_view import result_matrix
+from rule_engine import apply_rules, rule
+
+openpyxl = pytest.importorskip("openpyxl")
+pytest.importorskip("xlsxwriter")
+
+
+@rule(["Amount"], mdrm="TEST0001")
+def positive_amount(df):
+    df["Amount"] = df["Amount"] > 0
+    return df
+
+
+@rule(["Amount", "Limit"], output="Within_Limit")
+def within_limit(df):
+    df["Within_Limit"] = df["Amount"] <= df["Limit"]
+    return df
+
+
+RULES = [within_limit, positive_amount]
+
+
+def _validated(raw):
+    df = apply_rules(raw.copy(), RULES)
+    return result_matrix(df, RULES)
+
+
+def test_failing_cells_are_highlighted_and_summarised(tmp_path):
+    raw = pd.DataFrame({"Amount": [5, -1, 20], "Limit": [10, 10, 10], "Name": ["a", "b", None]})
+    path = tmp_path / "report.xlsx"
+    write_report(path, raw, _validated(raw), RULES)
+
+    book = openpyxl.load_workbook(path)
+    assert book.sheetnames == ["Summary", "Data"]
+    data = book["Data"]
+    assert [c.value for c in data[1]] == ["Amount", "Limit", "Name", "Failed_Checks"]
+    highlighted = {(c.row, c.value) for row in data.iter_rows(min_row=2) for c in row
+                   if c.fill.fgColor.rgb not in (None, "00000000")}
+    # Row 3 fails the positive check on Amount; row 4 fails the limit check on Amount and Limit
+    assert highlighted == {(3, -1), (4, 20), (4, 10)}
+    assert [row[3].value for row in data.iter_rows(min_row=2)] == [0, 1, 1]
+
+    summary = [row for row in book["Summary"].iter_rows(values_only=True)]
+    assert ("within_limit", "Within_Limit", None, "error", 1, 1 / 3) in summary
+    assert ("TEST0001", 1) in [row[:2] for row in summary]
+
+
+def test_rows_continue_on_new_sheets_past_the_row_limit(tmp_path):
+    path = tmp_path / "report.xlsx"
+    with ExcelReport(path, RULES, rows_per_sheet=2) as report:
+        for start in range(0, 5, 2):
+            raw = pd.DataFrame({"Amount": range(start, min(start + 2, 5)), "Limit": 10})
+            report.write(raw, _validated(raw))
+
+    book = openpyxl.load_workbook(path, read_only=True)
+    assert book.sheetnames == ["Summary", "Data", "Data (2)", "Data (3)"]
+    assert [row[0] for row in book["Data (3)"].iter_rows(min_row=2, values_only=True)] == [4]
@@ -0,0 +1,27 @@
+import pandas as pd
+from corporate_loan_rules import CORPORATE_LOAN_RULES
+from failure_records import FAILURE_COLUMNS, failure_table, failure_counts, row_failures
+from llm_client import describe_failure
+from rule_engine import apply_rules
+
+def _table():
+    raw = pd.DataFrame({"Customer_ID": ["C1", "A,B", "C3"], "Country": ["US", "usa", None],
+                        "Industry_Code_Type": ["1", "9", "2"]})
+    df = apply_rules(raw.copy(), CORPORATE_LOAN_RULES)
+    return failure_table(raw, df, CORPORATE_LOAN_RULES)
+
+def test_failure_table_is_long_and_dictionary_encoded():
+    table = _table()
+    assert list(table.columns) == FAILURE_COLUMNS
+    assert all(str(table[c].dtype) == "category" for c in FAILURE_COLUMNS[1:])
+    assert set(zip(table["Row"], table["Field"].astype(str))) == {
+        (1, "Customer_ID"), (1, "Country"), (1, "Industry_Code_Type"), (2, "Country")}
+    counts = failure_counts(table).set_index("Field")["Failures"]
+    assert counts["Country"] == 2 and "City" not in counts.index
+
+def test_row_failures_give_llm_context():
+    failures = row_failures(_table(), 1)
+    country = next(f for f in failures if f["Field"] == "Country")
+    assert country["MDRM"] == "CLCO9031" and country["Observed"] == "usa"
+    assert country["Expected"] == "ISO 3166 alpha-2 country code"
+    assert describe_failure(country) == "- Country (MDRM CLCO9031): got 'usa', expected ISO 3166 alpha-2 country code"
@@ -1,3 +1,4 @@
+import os
 import pandas as pd
 import genai_data_profiling as gp
 
@@ -13,9 +14,40 @@ def test_rules_and_custom_apply():
         "Transaction_Date": ["2020-01-01"]
     })
     # Apply corporate loan rules
-    for rule in gp.CORPORATE_LOAN_RULES[:5]:  # test a subset to avoid requiring full dataset columns
-        df = rule(df)
+    df = gp.apply_rules(df, gp.CORPORATE_LOAN_RULES[:5])  # rules without their columns are skipped
     df = gp.apply_custom_rules(df)
     assert "Valid_Transaction" in df.columns
     assert "Valid_Currency" in df.columns
-    assert "Valid_Transaction_Date" in df.columns
\ No newline at end of file
+    assert "Valid_Transaction_Date" in df.columns
+
+def test_run_pipeline_without_llm():
+    df = pd.read_csv(os.path.join(os.path.dirname(__file__), "..", "assets", "sample_validation_input_10rows.csv"))
+    df = gp.run_pipeline(df)
+    assert "Anomaly_Score" in df.columns
+    assert set(df["Risk_Score"]) <= {"LOW", "MEDIUM", "HIGH"}
+    assert df.loc[0, "Customer_ID"] == True
+
+def test_run_pipeline_short_circuit_reports_skipped_rows():
+    df = pd.read_csv(os.path.join(os.path.dirname(__file__), "..", "assets", "sample_validation_input_10rows.csv"))
+    df.loc[1, "Customer_ID"] = "A,B"
+    df = gp.run_pipeline(df, short_circuit=True)
+    assert df.loc[1, "Skipped_From_Tier"] == "format"
+    assert pd.isna(df.loc[1, "Country"]) and pd.isna(df.loc[1, "Anomaly_Score"])
+    assert df.loc[1, "Remediation"].startswith("⏭ format checks skipped")
+
+def test_validation_is_cached_per_upload_and_options():
+    from types import SimpleNamespace
+
+    st = SimpleNamespace(session_state={})
+    df = pd.read_csv(os.path.join(os.path.dirname(__file__), "..", "assets", "sample_validation_input_10rows.csv"))
+    runs = []
+
+    def build():
+        runs.append(1)
+        return gp.validate_submission(df)
+
+    first = gp.session_cached(st, "validated", ("a.csv", 10, False), build)
+    assert gp.session_cached(st, "validated", ("a.csv", 10, False), build) is first
+    assert "Risk_Score" in first["df"] and "Risk_Score" not in first["raw"]
+    gp.session_cached(st, "validated", ("a.csv", 10, True), build)
+    assert len(runs) == 2
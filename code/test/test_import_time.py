@@ -0,0 +1,29 @@
+import os
+import subprocess
+import sys
+import pytest
+
+SRC_DIR = os.path.join(os.path.dirname(__file__), "..", "src")
+HEAVY_MODULES = ("streamlit", "langchain", "langchain_community", "langchain_core", "openai", "dotenv")
+# Ceiling on a module's cumulative import time (microseconds), pandas included; ~0.6 s today
+IMPORT_BUDGET_US = 1_500_000
+
+def import_times(module):
+    """Run `python -X importtime -c 'import module'` and return {name: cumulative_us}."""
+    env = dict(os.environ, PYTHONPATH=SRC_DIR)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, env=env, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line and "cumulative" not in line:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            times[name.strip()] = int(cumulative)
+    return times
+
+@pytest.mark.parametrize("module", ["corporate_loan_rules", "custom_rules", "risk_scoring",
+                                    "remediation", "genai_data_profiling"])
+def test_library_modules_import_lightweight(module):
+    times = import_times(module)
+    heavy = [name for name in times if name.split(".")[0] in HEAVY_MODULES]
+    assert heavy == []
+    assert times[module] < IMPORT_BUDGET_US
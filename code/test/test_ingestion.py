@@ -0,0 +1,80 @@
+import io
+import os
+import pandas as pd
+from corporate_loan_rules import CORPORATE_LOAN_RULES
+from ingestion import PrefetchReader, dictionary_encode, expand_sources, read_submission
+from rule_engine import apply_rules, rule
+
+SAMPLE = os.path.join(os.path.dirname(__file__), "..", "assets", "sample_validation_input_10rows.csv")
+
+def test_read_submission_encodes_repetitive_columns():
+    df = read_submission(SAMPLE)
+    assert df["City"].dtype.name == "category"
+    assert df["Committed_Exposure"].dtype.name != "category"
+    chunks = list(read_submission(SAMPLE, chunksize=4))
+    assert [len(c) for c in chunks] == [4, 4, 2]
+    assert chunks[0]["Country"].dtype.name == "category"
+
+def test_encoded_columns_give_the_same_results():
+    expected = apply_rules(pd.read_csv(SAMPLE), CORPORATE_LOAN_RULES)
+    actual = apply_rules(read_submission(SAMPLE), CORPORATE_LOAN_RULES)
+    for col in expected.columns:
+        assert actual[col].astype(bool).tolist() == expected[col].astype(bool).tolist(), col
+
+def test_rules_run_once_per_distinct_value():
+    calls = []
+
+    def is_known(x):
+        calls.append(x)
+        return x in ("NY", "LA")
+
+    @rule(["City"], scalar=is_known)
+    def validate_known_city(df):
+        df["City"] = df["City"].apply(is_known)
+        return df
+
+    df = dictionary_encode(pd.DataFrame({"City": ["NY", "LA", "SF", None] * 50}))
+    df = apply_rules(df, [validate_known_city])
+    assert df["City"].tolist()[:4] == [True, True, False, False]
+    assert len(calls) == 4  # three categories plus the missing value
+
+
+def test_compressed_sources_read_like_plain(tmp_path):
+    import gzip
+    import zipfile
+
+    data = open(SAMPLE, "rb").read()
+    (tmp_path / "loans.csv.gz").write_bytes(gzip.compress(data))
+    with zipfile.ZipFile(tmp_path / "bundle.zip", "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("east.csv", data)
+        archive.writestr("west.csv", data)
+    expected = read_submission(SAMPLE)
+
+    # Recognised from the content, whatever the name
+    gzipped = read_submission(io.BytesIO((tmp_path / "loans.csv.gz").read_bytes()))
+    pd.testing.assert_frame_equal(gzipped, expected)
+    assert [len(c) for c in read_submission(str(tmp_path / "loans.csv.gz"), chunksize=4)] == [4, 4, 2]
+    bundle = str(tmp_path / "bundle.zip")
+    assert len(read_submission(bundle)) == 2 * len(expected)
+    assert read_submission(bundle)["City"].dtype.name == "category"
+    assert expand_sources([bundle]) == [f"{bundle}::east.csv", f"{bundle}::west.csv"]
+    assert len(read_submission(f"{bundle}::west.csv", nrows=3)) == 3
+
+
+def test_prefetch_reader_stops_when_closed_early():
+    stream = io.BufferedReader(PrefetchReader(io.BytesIO(b"x" * 10_000), block_size=100, blocks=2))
+    assert stream.read(150) == b"x" * 150
+    stream.close()
+    assert not stream.raw._thread.is_alive()
+
+
+def test_zip_members_are_numbered_on_in_chunks(tmp_path):
+    import zipfile
+
+    data = open(SAMPLE, "rb").read()
+    with zipfile.ZipFile(tmp_path / "bundle.zip", "w") as archive:
+        archive.writestr("east.csv", data)
+        archive.writestr("west.csv", data)
+    chunks = list(read_submission(str(tmp_path / "bundle.zip"), chunksize=4))
+    index = [i for chunk in chunks for i in chunk.index]
+    assert index == list(range(20))
@@ -0,0 +1,59 @@
+import instructions_index
+from instructions_index import InstructionsIndex, field_chunks, field_context, load_index
+import prompt_builder
+from prompt_builder import remediate
+
+HEADER = "Field \nNo. \nField Name; \n(Technical Field \nName) \nMDRM Description Allowable Values \n"
+PAGES = [
+    "Schedule H—Wholesale Risk \nH.1 - Corporate Loan Data Schedule \nGeneral guidance. \n",
+    HEADER + "1 Country \n(Country) \nCLCO9031 Report the domicile of the obligor. \nUse the 2 letter Country Code. \n"
+             "2 DO NOT USE \n"
+             "3 Credit Facility \nCurrency \n(CreditFacilit\nyCurrency) \n Report the currency of the facility. \n"
+             "1 USD \n2 EUR \n",
+    "4 Obligor LEI \n(ObligorLEI) \n Report the Legal Entity Identifier of the obligor, or NA. \n",
+    "Appendix \nNarrative text that is not part of the field table. \n",
+]
+
+
+def test_field_chunks_and_lookup():
+    chunks = field_chunks(PAGES)
+    assert [(c["field"], c["name"], c["technical_name"], c["mdrm"]) for c in chunks] == [
+        (1, "Country", "Country", "CLCO9031"),
+        (3, "Credit Facility Currency", "CreditFacilityCurrency", None),
+        (4, "Obligor LEI", "ObligorLEI", None),
+    ]
+    assert "1 USD" in chunks[1]["text"] and "Narrative" not in chunks[2]["text"]
+    index = InstructionsIndex(chunks)
+    assert index.lookup(mdrm="CLCO9031")["field"] == 1
+    assert index.lookup("Credit_Facility_Currency")["field"] == 3
+    assert index.lookup("Valid_Currency")["field"] == 3
+    assert index.search("legal entity identifier")[0]["field"] == 4
+
+
+def test_index_rebuilt_only_when_pdf_changes(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(instructions_index, "extract_pages", lambda path: calls.append(path) or PAGES)
+    pdf, index_path = tmp_path / "instructions.pdf", str(tmp_path / "index" / "fr_y14q.json")
+    pdf.write_bytes(b"%PDF version 1")
+    assert len(load_index(str(pdf), index_path).chunks) == 3
+    assert load_index(str(pdf), index_path).lookup("Obligor_LEI")["field"] == 4
+    assert len(calls) == 1
+    pdf.write_bytes(b"%PDF version 2")
+    load_index(str(pdf), index_path)
+    assert len(calls) == 2
+
+
+def test_remediation_prompt_gets_only_failed_field_instructions(monkeypatch):
+    monkeypatch.setattr(prompt_builder, "_ANSWERS", {})
+    prompts = []
+
+    class FakeLLM:
+        def invoke(self, prompt):
+            prompts.append(prompt)
+            return "fix it"
+
+    failure = {"Field": "Country", "MDRM": "CLCO9031", "Observed": "usa", "Expected": "ISO code"}
+    remediate({0: [failure]}, FakeLLM(), InstructionsIndex(field_chunks(PAGES)))
+    assert "Report the domicile of the obligor" in prompts[0]
+    assert "Legal Entity Identifier" not in prompts[0]
+    assert field_context(InstructionsIndex(field_chunks(PAGES)), [failure], max_chars=20).endswith("...")
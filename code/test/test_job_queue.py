@@ -0,0 +1,67 @@
+import os
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import job_queue
+from job_queue import JobQueue
+
+SAMPLE = os.path.join(os.path.dirname(__file__), "..", "assets", "sample_validation_input_10rows.csv")
+
+def test_job_runs_in_background_and_persists(tmp_path):
+    queue = JobQueue(str(tmp_path), max_workers=1, use_processes=False, poll_interval=0.05)
+    with open(SAMPLE, "rb") as f:
+        job_id = queue.submit(f.read(), "sample.csv", submitter="alice")
+    job = queue.wait(job_id, timeout=60)
+    queue.shutdown()
+    assert job["status"] == "done", job["error"]
+    assert job["rows_processed"] == job["rows_total"] == 10
+    assert os.path.exists(job["output_path"])
+    # State survives a restart of the queue
+    reopened = JobQueue(str(tmp_path), max_workers=1, use_processes=False)
+    assert reopened.status(job_id)["status"] == "done"
+    reopened.shutdown()
+
+def test_next_job_prefers_idle_submitter(tmp_path):
+    queue = JobQueue(str(tmp_path), use_processes=False, start=False)
+    first = queue.submit(b"a\n1\n", "a.csv", submitter="alice")
+    queue.submit(b"a\n1\n", "b.csv", submitter="alice")
+    bob = queue.submit(b"a\n1\n", "c.csv", submitter="bob")
+    assert queue.next_job() == first
+    job_queue._update(queue.db_path, first, status="running")
+    assert queue.next_job() == bob
+    queue.shutdown()
+
+def test_process_workers_count_rows_from_the_parser(tmp_path):
+    queue = JobQueue(str(tmp_path), max_workers=1, poll_interval=0.05)
+    # A quoted field spanning lines is one row, not two
+    job_id = queue.submit(b'Customer_ID,Obligor_Name\nC1,"Acme\nHoldings"\nC2,Beta\n', "quoted.csv")
+    job = queue.wait(job_id, timeout=120)
+    queue.shutdown()
+    assert job["status"] == "done", job["error"]
+    assert job["rows_processed"] == job["rows_total"] == 2
+
+def test_dead_worker_fails_its_job_and_replaces_the_pool(tmp_path):
+    queue = JobQueue(str(tmp_path), max_workers=1, use_processes=False, start=False)
+    job_id = queue.submit(b"a\n1\n", "a.csv")
+    job_queue._update(queue.db_path, job_id, status="running")
+    dead = Future()
+    dead.set_exception(BrokenProcessPool("worker killed"))
+    queue._running[job_id] = dead
+    executor = queue._executor
+    queue.dispatch()
+    job = queue.status(job_id)
+    assert job["status"] == "failed" and "Worker process died" in job["error"]
+    assert queue._executor is not executor and not queue._running
+    queue.shutdown()
+
+def test_stage_follows_each_chunk(tmp_path, monkeypatch):
+    queue = JobQueue(str(tmp_path), use_processes=False, start=False)
+    with open(SAMPLE, "rb") as f:
+        job_id = queue.submit(f.read(), "sample.csv")
+    stages = []
+    update = job_queue._update
+    monkeypatch.setattr(job_queue, "_update", lambda db, job, **fields: (stages.append(fields.get("stage")),
+                                                                        update(db, job, **fields)))
+    job_queue.run_job(queue.db_path, job_id, chunk_size=6)
+    queue.shutdown()
+    assert stages == ["read"] + ["rules", "remediation", "write", "read"] * 2 + ["finished"]
@@ -0,0 +1,60 @@
+import json
+import os
+import urllib.request
+
+import pandas as pd
+
+from corporate_loan_rules import CORPORATE_LOAN_RULES
+from genai_data_profiling import run_pipeline
+from metrics import REGISTRY, Registry, diff_states, merge_states, prometheus_text, run_summary, serve
+from results_view import result_matrix
+
+SAMPLE = os.path.join(os.path.dirname(__file__), "..", "assets", "sample_validation_input_10rows.csv")
+
+
+def test_pipeline_run_summary_and_merge():
+    before = REGISTRY.state()
+    df = run_pipeline(pd.read_csv(SAMPLE))
+    run = diff_states(REGISTRY.state(), before)
+    summary = run_summary(state=run, seconds=1.0)
+    assert summary["rows"] == 10
+    assert set(summary["stages"]) >= {"pipeline", "anomaly", "rules", "risk"}
+    assert summary["stages"]["rules"]["count"] == 1
+    failed = (~result_matrix(df, CORPORATE_LOAN_RULES)).sum()
+    assert all(summary["rules"][field]["failures"] == n for field, n in failed.items())
+    assert summary["caches"]["rule_memo"]["hit"] + summary["caches"]["rule_memo"]["miss"] > 0
+
+    # Two workers' states add up
+    merged = run_summary(state=merge_states([run, run]), seconds=1.0)
+    assert merged["rows"] == 20 and merged["stages"]["rules"]["count"] == 2
+
+
+def test_local_scrape():
+    registry = Registry()
+    latency = registry.histogram("test_seconds", "Test latency", ["op"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 2.0):
+        latency.observe(value, op="read")
+    registry.counter("test_rows_total", "Rows").inc(7)
+    text = prometheus_text(registry)
+    assert 'test_seconds_bucket{op="read",le="0.1"} 1' in text
+    assert 'test_seconds_bucket{op="read",le="+Inf"} 4' in text
+    assert "test_rows_total 7" in text
+    assert 0.1 < latency.quantile(0.5, op="read") <= 1.0
+
+    run_pipeline(pd.read_csv(SAMPLE))
+    server = serve(port=0)
+    try:
+        base = f"http://127.0.0.1:{server.server_port}"
+        with urllib.request.urlopen(f"{base}/metrics") as response:
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            scraped = response.read().decode()
+        with urllib.request.urlopen(f"{base}/metrics.json") as response:
+            summary = json.load(response)
+    finally:
+        server.shutdown()
+        server.server_close()
+    samples = dict(line.rsplit(" ", 1) for line in scraped.splitlines() if not line.startswith("#"))
+    assert float(samples['profiler_rows_total{stage="pipeline"}']) >= 10
+    assert samples['profiler_stage_seconds_count{stage="rules"}'] == samples[
+        'profiler_stage_seconds_bucket{stage="rules",le="+Inf"}']
+    assert summary["rows"] >= 10 and summary["stages"]["pipeline"]["p50_ms"] is not None
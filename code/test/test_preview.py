@@ -0,0 +1,37 @@
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+import preview as pv
+
+SAMPLE = os.path.join(os.path.dirname(__file__), "..", "assets", "sample_validation_input_10rows.csv")
+
+
+def _portfolio(rows=20000):
+    df = pd.concat([pd.read_csv(SAMPLE)] * (rows // 10), ignore_index=True)
+    rng = np.random.default_rng(7)
+    df["Line_of_Business"] = rng.choice(["Corporate", "Municipal", "Small Business"], len(df), p=[0.8, 0.15, 0.05])
+    df["Credit_Facility_Currency"] = np.where(rng.random(len(df)) < 0.1, "usd", "USD")
+    return df
+
+
+def test_stratified_sample_keeps_every_stratum():
+    df = _portfolio()
+    sample, counts = pv.stratified_sample(df, size=200)
+    assert counts.sum() == len(df)
+    assert set(pv.strata_keys(sample)) == set(counts.index)
+    assert abs(len(sample) - 200) <= len(counts)
+
+
+def test_estimates_cover_the_true_rate_from_a_stream_and_by_byte_offset():
+    df = _portfolio()
+    true_rate = (df["Credit_Facility_Currency"] == "usd").mean()
+    buffer = io.BytesIO(df.to_csv(index=False).encode())
+    for sample, counts in [pv.reservoir_sample([df.iloc[:7000], df.iloc[7000:]], size=2000),
+                           pv.line_sample(buffer, size=2000)]:
+        estimates = pv.estimate_failure_rates(sample, counts).set_index("Field")
+        row = estimates.loc["Credit_Facility_Currency"]
+        assert row["CI_Low"] <= true_rate <= row["CI_High"]
+        assert abs(counts.sum() - len(df)) < 0.05 * len(df)
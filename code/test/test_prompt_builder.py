@@ -0,0 +1,55 @@
+import prompt_builder
+from instructions_index import InstructionsIndex
+from prompt_builder import build_prompts, count_tokens, remediate
+
+INDEX = InstructionsIndex([{"schedule": "H.1", "field": 6, "name": "Country", "technical_name": "Country",
+                            "mdrm": "CLCO9031", "page": 168, "text": "Report the domicile of the obligor."}])
+
+
+def _failure(field, observed, mdrm=None):
+    return {"Field": field, "MDRM": mdrm, "Observed": observed, "Expected": "a valid value"}
+
+
+class FakeLLM:
+    def __init__(self):
+        self.prompts = []
+
+    def invoke(self, prompt):
+        self.prompts.append(prompt)
+        return "\n".join(f"Record {n}: fix record {n}" for n in range(1, prompt.count("\nRecord ") + 1))
+
+
+def test_prompts_packed_within_budget_with_shared_instructions():
+    sets = {i: [_failure("Country", f"X{i}", "CLCO9031"), _failure("City", "")] for i in range(40)}
+    batches = build_prompts(sets, INDEX, budget=400)
+    assert len(batches) > 1
+    assert [key for _, keys in batches for key in keys] == list(range(40))
+    for prompt, keys in batches:
+        assert count_tokens(prompt) <= 400
+        assert prompt.count("Report the domicile") == 1
+
+
+def test_identical_failures_asked_once_and_answers_split(monkeypatch):
+    monkeypatch.setattr(prompt_builder, "_ANSWERS", {})
+    llm = FakeLLM()
+    failures = {0: [_failure("Country", "usa")], 1: [_failure("Country", "usa")], 2: [_failure("City", "")], 3: []}
+    advice, usage = remediate(failures, llm)
+    assert len(llm.prompts) == 1 and llm.prompts[0].count("\nRecord ") == 2
+    assert advice[0] == advice[1] == "fix record 1" and advice[2] == "fix record 2"
+    assert advice[3] == "No action needed."
+    assert usage.requests == 1 and usage.prompt_tokens > 0 and usage.as_dict()["estimated_cost_usd"] > 0
+    # A later run (another chunk or file) reuses the answers
+    advice, usage = remediate({7: [_failure("City", "")]}, llm)
+    assert advice[7] == "fix record 2" and usage.requests == 0 and usage.cached_rows == 1
+
+
+def test_unsplit_replies_are_not_cached(monkeypatch):
+    monkeypatch.setattr(prompt_builder, "_ANSWERS", {})
+    llm = FakeLLM()
+    llm.invoke = lambda prompt: llm.prompts.append(prompt) or "Check both fields."
+    failures = {0: [_failure("Country", "usa")], 1: [_failure("City", "")]}
+    advice, _ = remediate(failures, llm)
+    assert advice == {0: "Check both fields.", 1: "Check both fields."}
+    assert prompt_builder._ANSWERS == {}
+    remediate(failures, llm)
+    assert len(llm.prompts) == 2
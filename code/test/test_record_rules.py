@@ -0,0 +1,57 @@
+import os
+import pandas as pd
+
+from corporate_loan_rules import CORPORATE_LOAN_RULES, validate_date_financials, validate_date_last_audit
+from custom_rules import CUSTOM_RULES, validate_transaction_date
+from record_rules import MicroBatcher, check_record, validate_frame
+from rule_engine import apply_rules, rule
+
+RULES = CORPORATE_LOAN_RULES + CUSTOM_RULES
+SAMPLE = os.path.join(os.path.dirname(__file__), "..", "assets", "sample_validation_input_10rows.csv")
+
+def frame_result(record, rules):
+    result = validate_frame(pd.DataFrame([record]), rules)[0]
+    del result["row"]
+    return result
+
+def test_record_path_matches_one_row_frames():
+    records = pd.read_csv(SAMPLE).to_dict("records")
+    records.append({"Customer_ID": "A,B", "Country": "usa", "Date_Financials": "9999-12-31",
+                    "Credit_Facility_Type": "0", "Other_Credit_Facility_Type_Description": " ",
+                    "LOCOM": 4, "Obligor_LEI": "NA", "Transaction_Date": "2999-01-01"})
+    for record in records:
+        assert check_record(record, RULES) == frame_result(record, RULES)
+
+def test_date_rules_agree_on_mixed_formats():
+    values = ["05-19-2018", "2020-01-01", "2020-02-03", "2020-02-30", " 2020-01-01", "2020-01-01 00:00:00",
+              "9999-12-31", "", None, 20200101, pd.Timestamp("2021-06-30")]
+    for date_rule in [validate_date_financials, validate_date_last_audit, validate_transaction_date]:
+        column, output = date_rule.columns[0], date_rule.output
+        df = pd.DataFrame({column: pd.Series(values, dtype=object)})
+        expected = date_rule(df.copy())[output].tolist()
+        assert expected[:4] == [False, True, True, False]
+        assert apply_rules(df.copy(), [date_rule])[output].tolist() == expected
+        assert [check_record({column: v}, [date_rule])["valid"] for v in values] == expected
+
+def test_tuple_records_and_frame_fallback():
+    @rule(["Amount"], output="Amount_Is_Even")
+    def validate_even(df):
+        df["Amount_Is_Even"] = df["Amount"] % 2 == 0
+        return df
+
+    assert check_record((4, "US"), [validate_even], columns=("Amount", "Country")) == {"valid": True, "failures": []}
+    assert check_record({"Amount": 3}, [validate_even]) == {"valid": False, "failures": ["Amount_Is_Even"]}
+
+def test_micro_batcher_validates_records_together():
+    sizes = []
+
+    def validate_batch(df):
+        sizes.append(len(df))
+        return validate_frame(df, RULES)
+
+    batcher = MicroBatcher(validate_batch, max_batch=3, max_wait_ms=1000)
+    futures = [batcher.submit({"Country": c}) for c in ["US", "USA", "GB"]]
+    assert [f.result(5)["valid"] for f in futures] == [True, False, True]
+    assert batcher.validate({"Country": "FR"}, timeout=5) == {"valid": True, "failures": []}
+    batcher.close()
+    assert sizes == [3, 1]
@@ -0,0 +1,36 @@
+import pandas as pd
+
+from corporate_loan_rules import validate_country, validate_credit_facility_currency, validate_industry_code
+from record_rules import check_record
+from reference_data import naics_sector, NAICS_CODES
+from rule_engine import apply_rules
+from results_view import failures_by_sector
+
+
+def test_codes_checked_against_reference_lists():
+    df = pd.DataFrame({"Country": ["US", "GB", "ZZ", "us"],
+                       "Credit_Facility_Currency": ["USD", "EUR", "ABC", None],
+                       "Industry_Code": [541211, "3361", "9999", "54"],
+                       "Industry_Code_Type": ["1", 1, "1", "1"]})
+    df = validate_industry_code(validate_credit_facility_currency(validate_country(df)))
+    assert df["Country"].tolist() == [True, True, False, False]
+    assert df["Credit_Facility_Currency"].tolist() == [True, True, False, False]
+    assert df["Industry_Code"].tolist() == [True, True, False, False]
+
+    # SIC and GICS codes are not in the NAICS list and are only checked by format
+    df = pd.DataFrame({"Industry_Code": ["9999", "4512", "54", "9999"], "Industry_Code_Type": ["2", "3", "2", "1"],
+                       "Credit_Facility_Currency": [" USD", "EUR ", "usd", "USD"]})
+    expected = [True, True, False, False]
+    assert apply_rules(df.copy(), [validate_industry_code])["Industry_Code"].tolist() == expected
+    assert [check_record(r, [validate_industry_code])["valid"] for r in df.to_dict("records")] == expected
+    assert validate_credit_facility_currency(df)["Credit_Facility_Currency"].tolist() == [True, True, False, True]
+
+
+def test_naics_sector_rollup():
+    assert "5412" in NAICS_CODES and "541211" in NAICS_CODES
+    assert naics_sector(["541211", "3361", "4451", "99"]).fillna("-").tolist() == ["54", "31-33", "44-45", "-"]
+    raw = pd.DataFrame({"Industry_Code": ["5412", "5413", "3361"]})
+    results = pd.DataFrame({"Valid": [True, False, False]})
+    table = failures_by_sector(raw, results).set_index("Sector")
+    assert table.loc["54", "Rows"] == 2 and table.loc["54", "Failing_Rows"] == 1
+    assert table.loc["31-33", "Title"] == "Manufacturing"
@@ -9,4 +9,12 @@ def test_remediation_currency():
 def test_remediation_high_risk():
     df = pd.DataFrame([{"Valid_Currency": True, "Valid_Transaction": True, "Valid_Transaction_Date": True, "Risk_Score": "HIGH"}])
     df = suggest_remediation(df)
-    assert "Manual audit required" in df.loc[0, "Remediation"]
\ No newline at end of file
+    assert "Manual audit required" in df.loc[0, "Remediation"]
+
+
+def test_remediation_lists_every_failure():
+    df = pd.DataFrame([{"Valid_Currency": False, "Valid_Transaction": False, "Valid_Transaction_Date": True, "Risk_Score": "HIGH"}])
+    df = suggest_remediation(df)
+    assert "Fix currency format" in df.loc[0, "Remediation"]
+    assert "Adjust Transaction_Amount" in df.loc[0, "Remediation"]
+    assert "Manual audit required" in df.loc[0, "Remediation"]
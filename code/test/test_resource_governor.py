@@ -0,0 +1,44 @@
+import resource_governor as rg
+
+MB = 2 ** 20
+
+
+def _governor(monkeypatch, rss, start_chunk=1_000, **kwargs):
+    monkeypatch.setattr(rg, "rss_bytes", lambda: rss[0])
+    return rg.ResourceGovernor(memory_limit=1000 * MB, min_chunk=100, max_chunk=100_000, start_chunk=start_chunk,
+                               **kwargs)
+
+
+def test_grows_while_faster_then_backs_off(monkeypatch):
+    rss = [100 * MB]
+    governor = _governor(monkeypatch, rss)
+    sizes = governor.chunk_sizes()
+    rss[0] = 110 * MB  # 10 KB per row on the first chunk
+    assert governor.record(next(sizes), 1.0) == 2_000
+    assert governor.record(next(sizes), 1.0) == 4_000
+    # Twice the rows in four times the time: back to the best size, and stay there
+    assert governor.record(next(sizes), 4.0) == 2_000
+    assert governor.record(next(sizes), 1.0) == 2_000
+    assert [d["Decision"] for d in governor.decisions] == ["grow", "grow", "back off", "hold"]
+
+
+def test_chunks_stay_under_the_memory_ceiling(monkeypatch):
+    rss = [100 * MB]
+    governor = _governor(monkeypatch, rss, start_chunk=50_000, bytes_per_row=100 * 1024)
+    # 900 MB above the baseline at 100 KB per row, with headroom
+    ceiling = int(900 * MB * rg.HEADROOM / (100 * 1024))
+    assert governor.chunk_size == ceiling
+    rss[0] = 1200 * MB
+    # Halved, and lower still once the first chunk showed rows cost more than estimated
+    assert governor.record(ceiling, 1.0) <= ceiling // 2
+    assert governor.decisions[-1]["Decision"] == "shrink"
+
+
+def test_threads_split_the_chunk_budget_but_check_the_whole_limit(monkeypatch):
+    rss = [100 * MB]
+    governor = _governor(monkeypatch, rss, start_chunk=50_000, bytes_per_row=100 * 1024, sharing=3)
+    assert governor.chunk_size == int(900 * MB * rg.HEADROOM / 3 / (100 * 1024))
+    # 900 MB of RSS is over a third of the limit but within the limit the threads share
+    rss[0] = 900 * MB
+    governor.record(governor.chunk_size, 1.0)
+    assert governor.decisions[-1]["Decision"] != "shrink"
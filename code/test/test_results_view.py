@@ -0,0 +1,57 @@
+import pandas as pd
+from rule_engine import rule
+from rule_engine import SKIPPED_COLUMN
+from results_view import result_matrix, skipped_matrix, failure_summary, failures_by_mdrm, failures_by_risk, failing_rows, failure_page, page_count
+
+@rule(["Country"], mdrm="CLCO9031")
+def validate_country(df):
+    df["Country"] = df["Country"].astype(str).str.match(r"^[A-Z]{2}$")
+    return df
+
+@rule(["City"], mdrm="CLCO9130")
+def validate_city(df):
+    df["City"] = df["City"].astype(str).str.strip().ne("")
+    return df
+
+RULES = [validate_country, validate_city]
+
+def _validated():
+    raw = pd.DataFrame({"Country": ["US", "USA", "GB", "x"], "City": ["NY", "LA", " ", "SF"]})
+    df = raw.copy()
+    for r in RULES:
+        df = r(df)
+    df["Risk_Score"] = ["LOW", "MEDIUM", "MEDIUM", "LOW"]
+    return raw, df
+
+def test_summaries():
+    raw, df = _validated()
+    results = result_matrix(df, RULES)
+    summary = failure_summary(results, RULES)
+    assert summary.loc[0, "Field"] == "Country" and summary.loc[0, "Failures"] == 2
+    assert failures_by_mdrm(summary).set_index("MDRM").loc["CLCO9130", "Failures"] == 1
+    risk = failures_by_risk(results, df["Risk_Score"]).set_index("Risk_Score")
+    assert risk.loc["MEDIUM", "Failing_Rows"] == 2
+
+def test_paging_and_filter():
+    raw, df = _validated()
+    results = result_matrix(df, RULES)
+    positions = failing_rows(results)
+    assert positions.tolist() == [1, 2, 3]
+    assert failing_rows(results, ["City"]).tolist() == [2]
+    assert page_count(len(positions), 2) == 2
+    page = failure_page(raw, results, positions, page=2, page_size=2, extra=df[["Risk_Score"]])
+    assert page["Country"].tolist() == ["x"]
+    assert page["Failed_Fields"].tolist() == ["Country"]
+    assert page["Risk_Score"].tolist() == ["LOW"]
+
+def test_skipped_cells_are_not_failures():
+    raw, df = _validated()
+    df["City"] = df["City"].astype(object)
+    df.loc[3, "City"] = None
+    df[SKIPPED_COLUMN] = [None, None, None, "format"]
+    results = result_matrix(df, RULES)
+    skipped = skipped_matrix(df, results)
+    summary = failure_summary(results, RULES, skipped).set_index("Field")
+    assert summary.loc["City", "Failures"] == 1 and summary.loc["City", "Skipped"] == 1
+    page = failure_page(raw, results, failing_rows(results), skipped=skipped)
+    assert page["Failed_Fields"].tolist() == ["Country", "City", "Country"]
@@ -14,4 +14,9 @@ def test_medium_risk_invalid_transaction():
 def test_low_risk():
     df = pd.DataFrame([{"Transaction_Amount": 100, "Valid_Transaction": True, "Valid_Currency": True}])
     result = assign_risk_score(df)
-    assert result.loc[0, "Risk_Score"] == "LOW"
\ No newline at end of file
+    assert result.loc[0, "Risk_Score"] == "LOW"
+
+def test_medium_risk_anomaly():
+    df = pd.DataFrame([{"Transaction_Amount": 100, "Valid_Transaction": True, "Valid_Currency": True, "Anomaly_Score": 10.0}])
+    result = assign_risk_score(df)
+    assert result.loc[0, "Risk_Score"] == "MEDIUM"
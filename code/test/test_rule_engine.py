@@ -0,0 +1,69 @@
+import os
+import warnings
+import numpy as np
+import pandas as pd
+from corporate_loan_rules import CORPORATE_LOAN_RULES, validate_customer_id
+from rule_engine import apply_rules, passed, rule, SKIPPED_COLUMN
+
+def test_rule_metadata():
+    assert validate_customer_id.columns == ("Customer_ID",)
+    assert validate_customer_id.mdrm == "CLCOM047"
+    assert validate_customer_id.severity == "error"
+    assert validate_customer_id.tier == "structural"
+    assert all(hasattr(r, "columns") for r in CORPORATE_LOAN_RULES)
+
+def test_apply_rules_skips_missing_columns():
+    df = pd.DataFrame([{"Customer_ID": "ABC123", "Country": "US"}])
+    df = apply_rules(df, CORPORATE_LOAN_RULES)
+    assert df.loc[0, "Customer_ID"] == True
+    assert df.loc[0, "Country"] == True
+
+def test_short_circuit_skips_later_tiers():
+    df = pd.DataFrame({"Customer_ID": ["C1", "A,B", "C3"], "Country": ["US", "US", "usa"],
+                       "Interest_Rate": [0.05, 0.05, 0.05]})
+    df = apply_rules(df, CORPORATE_LOAN_RULES, short_circuit=True)
+    assert df[SKIPPED_COLUMN].tolist() == [None, "format", "business"]
+    # Skipped rules are left as NA for the skipped rows, never as passed
+    assert df.loc[0, "Country"] == True and pd.isna(df.loc[1, "Country"])
+    assert df.loc[0, "Interest_Rate"] == True and pd.isna(df.loc[2, "Interest_Rate"])
+
+def test_short_circuit_on_a_wide_file_raises_no_pandas_warnings():
+    df = pd.read_csv(os.path.join(os.path.dirname(__file__), "..", "assets", "sample_validation_input_10rows.csv"))
+    df.loc[[1, 4], "Customer_ID"] = "A,B"
+    with warnings.catch_warnings():
+        # Fragmented-frame PerformanceWarnings and fillna downcasting FutureWarnings
+        warnings.simplefilter("error")
+        df = apply_rules(df, CORPORATE_LOAN_RULES, short_circuit=True)
+    assert df[SKIPPED_COLUMN].notna().sum() >= 2
+
+def test_scalar_rules_are_memoized_across_chunks():
+    calls = []
+
+    def is_rate(x):
+        calls.append(x)
+        return str(x).upper() == "NA" or isinstance(x, float)
+
+    @rule(["Rate"], scalar=is_rate)
+    def validate_rate(df):
+        df["Rate"] = df["Rate"].apply(is_rate)
+        return df
+
+    chunks = [pd.DataFrame({"Rate": ["NA", "x", "NA", None]}), pd.DataFrame({"Rate": ["x", "NA", np.nan]})]
+    results = [apply_rules(chunk, [validate_rate])["Rate"].tolist() for chunk in chunks]
+    assert results == [[True, False, True, False], [False, True, True]]
+    # Each distinct string is checked once in total; missing values are checked per kind, uncached
+    assert calls.count("NA") == 1 and calls.count("x") == 1
+
+def test_per_value_checks_agree_with_rule_bodies():
+    from custom_rules import CUSTOM_RULES
+
+    sample = pd.read_csv(os.path.join(os.path.dirname(__file__), "..", "assets", "sample_validation_input_10rows.csv"))
+    odd = ["", " ", "NA", "na", "0", "1.5", "-1", "2020-01-01", "05-19-2018", "2020-01-01\n", "US ", "abc", None]
+    for rule_func in CORPORATE_LOAN_RULES + CUSTOM_RULES:
+        if len(rule_func.columns) != 1 or getattr(rule_func, "scalar", getattr(rule_func, "kernel", None)) is None:
+            continue
+        column = rule_func.columns[0]
+        values = list(sample[column].astype(str)) if column in sample else []
+        df = pd.DataFrame({column: pd.Series(values + odd, dtype=object)})
+        body = passed(rule_func(df.copy())[rule_func.output])
+        assert apply_rules(df.copy(), [rule_func])[rule_func.output].tolist() == body.tolist(), rule_func.__name__
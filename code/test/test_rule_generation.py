@@ -0,0 +1,62 @@
+import pandas as pd
+import pytest
+import custom_rules
+import rule_generation
+from rule_generation import generate_rule, compile_rule, validate_rule_spec
+
+class FakeLLM:
+    def __init__(self, reply):
+        self.reply = reply
+        self.calls = 0
+
+    def invoke(self, prompt):
+        self.calls += 1
+        return self.reply
+
+
+def test_generate_rule_compiles_and_caches(tmp_path, monkeypatch):
+    monkeypatch.setattr(rule_generation, "RULE_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(rule_generation, "_RULE_CACHE", {})
+    monkeypatch.setattr(custom_rules, "GENERATED_RULES", [])
+    llm = FakeLLM('```json\n{"name": "PD_Range", "column": "Probability_of_Default", "check": "range", "min": 0, "max": 1, "allow_na": true}\n```')
+    df = pd.DataFrame({"Probability_of_Default": ["0.5", "1.5", "NA", "x"]})
+    rule = generate_rule("PD must be between 0 and 1", llm, list(df.columns))
+    df = rule(df)
+    assert df["Valid_PD_Range"].tolist() == [True, False, True, False]
+    assert rule in custom_rules.GENERATED_RULES
+    assert rule.columns == ("Probability_of_Default",) and rule.output == "Valid_PD_Range"
+
+    # Same prompt (modulo whitespace/case) never reaches the LLM again, even after a restart
+    monkeypatch.setattr(rule_generation, "_RULE_CACHE", {})
+    generate_rule("pd must be between  0 and 1", llm, list(df.columns))
+    assert llm.calls == 1
+
+    # A cached spec that does not fit this submission's columns is regenerated, in memory or on disk
+    for cache in (rule_generation._RULE_CACHE, {}):
+        monkeypatch.setattr(rule_generation, "_RULE_CACHE", cache)
+        other = FakeLLM('{"name": "PD_Range", "column": "PD", "check": "range", "min": 0, "max": 1}')
+        assert generate_rule("PD must be between 0 and 1", other, ["PD"]).columns == ("PD",)
+        assert other.calls == 1
+        generate_rule("PD must be between 0 and 1", llm, list(df.columns))
+
+def test_spec_rejects_unknown_column():
+    with pytest.raises(ValueError):
+        validate_rule_spec({"name": "X", "column": "Nope", "check": "not_empty"}, ["Customer_ID"])
+    with pytest.raises(ValueError):
+        validate_rule_spec({"name": "X", "column": "Customer_ID", "check": "eval"}, ["Customer_ID"])
+
+def test_spec_option_errors_are_value_errors():
+    base = {"name": "X", "column": "Customer_ID"}
+    for options, field in [({"check": "regex", "pattern": "("}, "pattern"), ({"check": "regex"}, "pattern"),
+                           ({"check": "regex", "pattern": 5}, "pattern"), ({"check": "range", "min": "low"}, "min"),
+                           ({"check": "range", "max": [1]}, "max"), ({"check": "date", "format": 1}, "format")]:
+        with pytest.raises(ValueError, match=field):
+            validate_rule_spec({**base, **options}, ["Customer_ID"])
+    with pytest.raises(ValueError):
+        validate_rule_spec(["not", "a", "spec"], ["Customer_ID"])
+
+def test_compare_rule():
+    rule = compile_rule({"name": "Utilized_LE_Committed", "column": "Utilized_Exposure", "check": "compare",
+                         "op": "<=", "other_column": "Committed_Exposure"})
+    df = pd.DataFrame({"Utilized_Exposure": [1, 5], "Committed_Exposure": [2, 4]})
+    assert rule(df)["Valid_Utilized_LE_Committed"].tolist() == [True, False]
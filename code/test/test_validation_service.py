@@ -0,0 +1,76 @@
+import json
+import os
+import pytest
+
+pytest.importorskip("starlette")
+pytest.importorskip("httpx")
+
+from starlette.testclient import TestClient
+from validation_service import app
+
+SAMPLE = os.path.join(os.path.dirname(__file__), "..", "assets", "sample_validation_input_10rows.csv")
+
+def test_single_record():
+    client = TestClient(app)
+    response = client.post("/validate/record", json={"Customer_ID": "A,B", "Country": "US"})
+    assert response.status_code == 200
+    assert response.json() == {"valid": False, "failures": ["Customer_ID"]}
+
+def test_bulk_csv_streams_ndjson():
+    client = TestClient(app)
+    with open(SAMPLE, "rb") as f:
+        body = f.read()
+    chunks = (body[i:i + 97] for i in range(0, len(body), 97))  # split mid-line on purpose
+    response = client.post("/validate/bulk?batch_size=3", content=chunks, headers={"content-type": "text/csv"})
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["row"] for r in rows] == list(range(10))
+    metrics = client.get("/metrics").json()
+    assert metrics["metrics"]["profiler_service_request_seconds"]["values"]["bulk_batch"]["count"] >= 4
+    assert metrics["metrics"]["profiler_rows_total"]["values"]["service"] >= 10
+    scraped = client.get("/metrics/prometheus").text
+    assert 'profiler_service_request_seconds_count{endpoint="bulk_batch"}' in scraped
+
+def test_bulk_ndjson_and_unsupported_type():
+    client = TestClient(app)
+    body = "\n".join(json.dumps({"Country": c}) for c in ["US", "USA"])
+    rows = [json.loads(l) for l in client.post("/validate/bulk", content=body,
+                                                headers={"content-type": "application/x-ndjson"}).text.splitlines()]
+    assert [r["valid"] for r in rows] == [True, False]
+    assert client.post("/validate/bulk", content=b"x", headers={"content-type": "text/plain"}).status_code == 415
+
+def test_bulk_csv_keeps_quoted_newlines_in_one_row():
+    client = TestClient(app)
+    body = b'Customer_ID,Country\nC1,US\n"A\nB",US\nC3,USA\n'
+    response = client.post("/validate/bulk?batch_size=2", content=(body[i:i + 5] for i in range(0, len(body), 5)),
+                           headers={"content-type": "text/csv"})
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [(r["row"], r["valid"]) for r in rows] == [(0, True), (1, False), (2, False)]
+
+def test_bad_requests_are_rejected_before_streaming():
+    client = TestClient(app)
+    ndjson = {"content-type": "application/x-ndjson"}
+    assert client.post("/validate/bulk?batch_size=ten", content=b"a\n1\n").status_code == 400
+    assert client.post("/validate/bulk?batch_size=0", content=b"a\n1\n").status_code == 400
+    assert client.post("/validate/bulk", content=b"{not json}\n", headers=ndjson).status_code == 400
+    assert client.post("/validate/record", content=b"{not json}",
+                       headers={"content-type": "application/json"}).status_code == 400
+    # A malformed line after the first batch has streamed ends the response with an error line
+    body = json.dumps({"Country": "US"}) + "\n[1, 2]\n"
+    response = client.post("/validate/bulk?batch_size=1", content=body, headers=ndjson)
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert response.status_code == 200 and lines[0]["valid"] and "error" in lines[-1]
+
+def test_bulk_arrow_stream_read_as_it_arrives():
+    pa = pytest.importorskip("pyarrow")
+    client = TestClient(app)
+    table = pa.table({"Customer_ID": ["C1", "A,B", "C3"], "Country": ["US", "US", "USA"]})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table, max_chunksize=2)
+    body = sink.getvalue().to_pybytes()
+    response = client.post("/validate/bulk?batch_size=1", content=(body[i:i + 64] for i in range(0, len(body), 64)),
+                           headers={"content-type": "application/vnd.apache.arrow.stream"})
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [(r["row"], r["valid"]) for r in rows] == [(0, True), (1, False), (2, False)]
+    assert client.post("/validate/bulk", content=b"not arrow",
+                       headers={"content-type": "application/vnd.apache.arrow.stream"}).status_code == 400